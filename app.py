@@ -1,23 +1,36 @@
-from flask import Flask, render_template, request, jsonify, send_file
-import sqlite3
-import joblib
+from collections import namedtuple
+
+from flask import (
+    Flask, Response, render_template, request, jsonify, send_file,
+    stream_with_context, url_for
+)
 import pandas as pd
 import os
-
-import matplotlib
-matplotlib.use("Agg")
-
-import seaborn as sns
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from openpyxl import Workbook
+import base64
+import json
+from io import BytesIO
+
+from habitability.cache import PredictionCache
+from habitability.compiled_model import (
+    COMPILED_PATH, MODEL_PATH, THRESHOLD_PATH, load_compiled, load_threshold
+)
+from habitability.dashboard import PlotCache, data_version
+from habitability.db import connection
+from habitability.exports import (
+    NDJSON_MIMETYPE, PDF_MIMETYPE, XLSX_MIMETYPE, ExportCache, render_excel,
+    ranked_chunks, render_pdf, stream_csv, stream_ndjson
+)
+from habitability.metrics import instrument, phase
+from habitability.physics import derive_record
+from habitability.registry import REGISTRY_DIR, ModelRegistry, check_probabilities
 
 
 app = Flask(__name__)
 
+# Per-route phase timings at /metrics (METRICS_ENABLED=0 turns it off)
+metrics = instrument(app)
+
 API_KEY = "SECRET123"
-model = joblib.load("model/habitability_model.pkl")
 
 # 🔴 MUST MATCH MODEL TRAINING FEATURES
 FEATURES = [
@@ -36,10 +49,238 @@ FEATURES = [
     "discoverymethod"
 ]
 
+# Sent by every client; pl_eqt, pl_insol and st_lum are derived from the
+# star and orbit when absent (habitability/physics.py)
+REQUIRED_FEATURES = ["pl_rade", "pl_bmasse", "st_teff", "st_rad", "st_mass", "sy_dist"]
+
+# Sent as strings; every other feature must be a number
+CATEGORICAL_FEATURES = ["st_spectype", "discoverymethod"]
+
+# Used only when a value is neither sent nor derivable
+DEFAULTS = {
+    "pl_orbper": 365,
+    "pl_orbeccen": 0.016,
+    "st_spectype": "G2V",
+    "discoverymethod": "Transit"
+}
+
+# ---------------- MODEL ---------------- #
+
+# Decision threshold until `module4_model_training.py --search` tunes one
+DEFAULT_THRESHOLD = 0.4
+
+# A model and the threshold tuned for it, swapped together
+Served = namedtuple("Served", "model threshold")
+
+# Typical, gappy and unknown-category rows every new version must score
+SMOKE_BATCH = pd.DataFrame([
+    {"pl_orbper": 365.25, "pl_orbeccen": 0.0167, "pl_rade": 1.0, "pl_bmasse": 1.0,
+     "pl_eqt": 255.0, "pl_insol": 1.0, "st_teff": 5772.0, "st_rad": 1.0,
+     "st_mass": 1.0, "st_lum": 0.0, "sy_dist": 10.0,
+     "st_spectype": "G2 V", "discoverymethod": "Transit"},
+    {"pl_orbper": 3.5, "pl_orbeccen": None, "pl_rade": 11.2, "pl_bmasse": 300.0,
+     "pl_eqt": 1400.0, "pl_insol": None, "st_teff": 6100.0, "st_rad": None,
+     "st_mass": 1.2, "st_lum": 0.3, "sy_dist": 120.0,
+     "st_spectype": None, "discoverymethod": "Unknown-method"},
+], columns=FEATURES)
+
+
+def load_model(directory, mmap_mode=None):
+    """Flat NumPy form of habitability_model.pkl (same probabilities)."""
+    pipeline_path = os.path.join(directory, os.path.basename(MODEL_PATH))
+    model = load_compiled(
+        pipeline_path,
+        os.path.join(directory, os.path.basename(COMPILED_PATH)),
+        mmap_mode
+    )
+    threshold = load_threshold(
+        DEFAULT_THRESHOLD,
+        pipeline_path,
+        os.path.join(directory, os.path.basename(THRESHOLD_PATH))
+    )
+    return Served(model, threshold)
+
+
+# Serves model/registry/habitability_model/CURRENT once module4 has
+# published a version, model/ until then; reloaded without a restart
+registry = ModelRegistry(
+    "habitability_model",
+    load_model,
+    lambda served: check_probabilities(served.model, SMOKE_BATCH),
+    primary=os.path.basename(MODEL_PATH),
+    fallback_dir=os.path.dirname(MODEL_PATH),
+    root=REGISTRY_DIR,
+)
+registry.attach(metrics)
+registry.install(app)
+
+# Repeated /predict inputs (after defaults) skip scoring; keyed by version
+prediction_cache = PredictionCache(FEATURES)
+prediction_cache.attach(metrics)
+registry.on_reload(prediction_cache.clear)
+
 # ---------------- DB ---------------- #
 
+# Overridable so benchmarks and tests can point the app at a scratch copy
+DB_PATH = os.environ.get("HABITABILITY_DB", "database.db")
+
+# Hot statements, prepared once per pooled connection
+INSERT_EXOPLANET = """
+    INSERT INTO exoplanets (
+        planet_name,
+        pl_orbper, pl_orbeccen, pl_rade, pl_bmasse, pl_eqt, pl_insol,
+        st_teff, st_rad, st_mass, st_lum,
+        sy_dist,
+        habitability_score
+    ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
+"""
+
+RANKING_QUERY = """
+    SELECT planet_name, habitability_score
+    FROM exoplanets
+    ORDER BY habitability_score DESC, id DESC
+"""
+
+TOP_EXOPLANETS = RANKING_QUERY + " LIMIT ?"
+
+# Same table as init_db.py, so the app also starts on a fresh database
+EXOPLANETS_TABLE = """
+    CREATE TABLE IF NOT EXISTS exoplanets (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        planet_name TEXT,
+        pl_orbper REAL, pl_orbeccen REAL, pl_rade REAL, pl_bmasse REAL,
+        pl_eqt REAL, pl_insol REAL,
+        st_teff REAL, st_rad REAL, st_mass REAL, st_lum REAL,
+        sy_dist REAL,
+        habitability_score REAL
+    )
+"""
+
+# Keyset pages walk idx_exoplanets_rank from the last (score, id) seen,
+# so page N costs the same as page 1. The filter columns are part of the
+# index, so non-matching rows are skipped without touching the table.
+EXOPLANET_INDEXES = (
+    """CREATE INDEX IF NOT EXISTS idx_exoplanets_rank
+       ON exoplanets (habitability_score DESC, id DESC, pl_rade, st_teff)""",
+)
+
+RANKING_PAGE = """
+    SELECT id, planet_name, habitability_score
+    FROM exoplanets
+    WHERE {where}
+    ORDER BY habitability_score DESC, id DESC
+    LIMIT ?
+"""
+
+# Query parameter -> SQL condition for /ranking and /dashboard
+RANKING_FILTERS = {
+    "min_score": "habitability_score >= ?",
+    "max_score": "habitability_score <= ?",
+    "min_radius": "pl_rade >= ?",
+    "max_radius": "pl_rade <= ?",
+    "min_teff": "st_teff >= ?",
+    "max_teff": "st_teff <= ?",
+}
+
+RANKING_PAGE_SIZE = 100
+RANKING_MAX_PAGE_SIZE = 1000
+
+STREAM_COLUMNS = ("rank", "planet_name", "habitability_score")
+
+
 def get_db():
-    return sqlite3.connect("database.db", check_same_thread=False)
+    """Pooled WAL connection; use as `with get_db() as con:`."""
+    return connection(DB_PATH)
+
+def init_schema():
+    """Create the exoplanets table (if missing) and its indexes."""
+    with get_db() as con:
+        con.execute(EXOPLANETS_TABLE)
+        for statement in EXOPLANET_INDEXES:
+            con.execute(statement)
+
+init_schema()
+
+def encode_cursor(score, row_id, rank):
+    raw = json.dumps([score, row_id, rank]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token):
+    raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    score, row_id, rank = json.loads(raw)
+    return float(score), int(row_id), int(rank)
+
+def ranking_page(args):
+    """One keyset page of the ranking for the given query args.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Raises ValueError for malformed filters or cursors.
+    """
+    limit = int(args.get("limit", RANKING_PAGE_SIZE))
+    limit = min(max(limit, 1), RANKING_MAX_PAGE_SIZE)
+
+    where = ["habitability_score IS NOT NULL"]
+    params = []
+
+    for name, condition in RANKING_FILTERS.items():
+        if args.get(name) not in (None, ""):
+            where.append(condition)
+            params.append(float(args[name]))
+
+    rank = 0
+    if args.get("cursor"):
+        try:
+            score, row_id, rank = decode_cursor(args["cursor"])
+        except Exception:
+            raise ValueError("invalid cursor")
+        where.append("(habitability_score, id) < (?, ?)")
+        params += [score, row_id]
+
+    sql = RANKING_PAGE.format(where=" AND ".join(where))
+
+    with phase("sqlite"), get_db() as con:
+        # One extra row tells us whether another page exists
+        rows = con.execute(sql, (*params, limit + 1)).fetchall()
+
+    page = [
+        {
+            "rank": rank + i,
+            "planet_name": name,
+            "habitability_score": score
+        }
+        for i, (_, name, score) in enumerate(rows[:limit], start=1)
+    ]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last_id, _, last_score = rows[limit - 1]
+        next_cursor = encode_cursor(last_score, last_id, rank + limit)
+
+    return page, next_cursor
+
+def load_dashboard_frame():
+    with get_db() as con:
+        return pd.read_sql("SELECT * FROM exoplanets", con)
+
+
+# Versioned plots under static/plots/<count>-<max_id>/
+plot_cache = PlotCache(os.path.join(app.static_folder, "plots"))
+
+
+# Rendered export bytes keyed by (format, data version, limit)
+export_cache = ExportCache()
+
+
+def plot_urls(version):
+    """Static URLs for a plot version; the legacy fixed files before any render."""
+    if version is None:
+        names = ("score_distribution", "top_planets", "correlation_heatmap")
+        return {n: f"/static/plots/{n}.png" for n in names}
+
+    return {
+        name: f"/static/plots/{path}"
+        for name, path in plot_cache.files(version).items()
+    }
 
 def check_key(req):
     return req.headers.get("x-api-key") == API_KEY
@@ -62,31 +303,63 @@ def predict():
     if not check_key(request):
         return jsonify({"error": "Unauthorized"}), 401
 
-    data = request.json
-
-    # ✅ AUTO-FILL REQUIRED FEATURES
-    X = pd.DataFrame([{
-        "pl_orbper": data.get("pl_orbper", 365),
-        "pl_orbeccen": data.get("pl_orbeccen", 0.016),
-        "pl_rade": data["pl_rade"],
-        "pl_bmasse": data["pl_bmasse"],
-        "pl_eqt": data["pl_eqt"],
-        "pl_insol": data.get("pl_insol", 1.0),
-        "st_teff": data["st_teff"],
-        "st_rad": data["st_rad"],
-        "st_mass": data["st_mass"],
-        "st_lum": data["st_lum"],
-        "sy_dist": data["sy_dist"],
-        "st_spectype": data.get("st_spectype", "G2V"),
-        "discoverymethod": data.get("discoverymethod", "Transit")
-    }])[FEATURES]
-
-    score = float(model.predict_proba(X)[0][1])
-
-    return jsonify({
+    with phase("parse"):
+        data = request.json
+
+    try:
+        X = model_input(data)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+
+    served, version = registry.active
+    key = prediction_cache.key(X, version)
+    score = prediction_cache.get(key)
+    if score is None:
+        with phase("model"):
+            score = float(served.model.score_record(X))
+        prediction_cache.put(key, score)
+
+    with phase("serialize"):
+        return jsonify(prediction(score, served.threshold, version))
+
+
+def model_input(data):
+    """Model features of a /predict body, with missing ones derived or defaulted.
+
+    Raises KeyError for a missing required feature and ValueError for a
+    numeric one that is not a number.
+    """
+    missing = [f for f in REQUIRED_FEATURES if data.get(f) is None]
+    if missing:
+        raise KeyError(", ".join(missing))
+
+    record = {f: data.get(f) for f in FEATURES}
+    record["pl_orbsmax"] = data.get("pl_orbsmax")
+    for f, value in record.items():
+        if value is None or f in CATEGORICAL_FEATURES:
+            continue
+        try:
+            record[f] = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Feature '{f}' is not numeric: {value!r}")
+    # A one-year orbit unless the period or the semi-major axis was sent
+    if record["pl_orbper"] is None and record["pl_orbsmax"] is None:
+        record["pl_orbper"] = DEFAULTS["pl_orbper"]
+
+    record = derive_record(record)
+    X = {f: record[f] for f in FEATURES}
+    for f, value in DEFAULTS.items():
+        if X[f] is None:
+            X[f] = value
+    return X
+
+
+def prediction(score, threshold, version):
+    return {
         "habitability_score": round(score, 3),
-        "habitability_prediction": 1 if score >= 0.4 else 0
-    })
+        "habitability_prediction": 1 if score >= threshold else 0,
+        "model_version": version
+    }
 
 # ---------------- STORE ---------------- #
 
@@ -95,34 +368,25 @@ def store():
     if not check_key(request):
         return jsonify({"error": "Unauthorized"}), 401
 
-    data = request.json
+    with phase("parse"):
+        # pl_eqt / pl_insol / st_lum that were not sent are derived
+        data = derive_record(request.json)
 
     # Prepare model input
-    X = pd.DataFrame([data])[FEATURES]
-    score = float(model.predict_proba(X)[0][1])
-
-    con = get_db()
-    cur = con.cursor()
-
-    cur.execute("""
-        INSERT INTO exoplanets (
-            planet_name,
-            pl_orbper, pl_orbeccen, pl_rade, pl_bmasse, pl_eqt, pl_insol,
-            st_teff, st_rad, st_mass, st_lum,
-            sy_dist,
-            habitability_score
-        ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
-    """, (
-        data["planet_name"],
-        data["pl_orbper"], data["pl_orbeccen"], data["pl_rade"],
-        data["pl_bmasse"], data["pl_eqt"], data["pl_insol"],
-        data["st_teff"], data["st_rad"], data["st_mass"], data["st_lum"],
-        data["sy_dist"],
-        score
-    ))
-
-    con.commit()
-    con.close()
+    X = {f: data[f] for f in FEATURES}
+    served, _ = registry.active
+    with phase("model"):
+        score = float(served.model.score_record(X))
+
+    with phase("sqlite"), get_db() as con:
+        con.execute(INSERT_EXOPLANET, (
+            data["planet_name"],
+            data["pl_orbper"], data["pl_orbeccen"], data["pl_rade"],
+            data["pl_bmasse"], data["pl_eqt"], data["pl_insol"],
+            data["st_teff"], data["st_rad"], data["st_mass"], data["st_lum"],
+            data["sy_dist"],
+            score
+        ))
 
     return jsonify({"status": "stored"})
 
@@ -130,169 +394,160 @@ def store():
 
 @app.route("/ranking")
 def ranking():
+    """Ranked planets, one keyset page at a time.
+
+    The body stays a plain JSON list; the cursor for the next page is in
+    the X-Next-Cursor header (and a rel="next" Link header).
+    """
     if not check_key(request):
         return jsonify({"error": "Unauthorized"}), 401
 
-    con = get_db()
-    df = pd.read_sql("""
-        SELECT planet_name, habitability_score
-        FROM exoplanets
-        ORDER BY habitability_score DESC
-    """, con)
-    con.close()
+    try:
+        page, next_cursor = ranking_page(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    with phase("serialize"):
+        res = jsonify(page)
+    if next_cursor:
+        args = {**request.args, "cursor": next_cursor}
+        res.headers["X-Next-Cursor"] = next_cursor
+        res.headers["Link"] = f'<{url_for("ranking", **args)}>; rel="next"'
+    return res
+
+@app.route("/ranking/export")
+def ranking_export():
+    """Stream the full ranking as CSV (default) or NDJSON (?format=ndjson)."""
+    if not check_key(request):
+        return jsonify({"error": "Unauthorized"}), 401
 
-    df["rank"] = df.index + 1
-    return jsonify(df.to_dict(orient="records"))
+    fmt = request.args.get("format", "csv").lower()
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+
+    def chunks():
+        # The pooled connection is held only while the body is streamed;
+        # the query runs lazily, after the first piece has been sent
+        with get_db() as con:
+            yield from ranked_chunks(con.execute(RANKING_QUERY))
+
+    if fmt == "csv":
+        body, mimetype = stream_csv(chunks(), STREAM_COLUMNS), "text/csv"
+    else:
+        body, mimetype = stream_ndjson(chunks(), STREAM_COLUMNS), NDJSON_MIMETYPE
+
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition":
+                f"attachment; filename=habitability_ranking.{fmt}"
+        }
+    )
 
 #---------------dashboard--------------------#
 @app.route("/dashboard")
 def dashboard():
-    con = get_db()
-    df = pd.read_sql("""
-        SELECT planet_name, habitability_score
-        FROM exoplanets
-        ORDER BY habitability_score DESC
-    """, con)
-    con.close()
+    try:
+        ranking, next_cursor = ranking_page(request.args)
+    except ValueError:
+        ranking, next_cursor = ranking_page({})
+
+    with get_db() as con:
+        version = data_version(con)
 
-    df["rank"] = df.index + 1
-    ranking = df.to_dict(orient="records")
+    # Show the newest finished plots; refresh in the background if stale
+    if not plot_cache.is_ready(version) and not version.startswith("0-"):
+        plot_cache.submit(version, load_dashboard_frame)
+
+    next_page = None
+    if next_cursor:
+        next_page = url_for("dashboard", **{**request.args, "cursor": next_cursor})
 
     return render_template(
         "dashboard.html",
-        ranking=ranking
+        ranking=ranking,
+        next_page=next_page,
+        plots=plot_urls(plot_cache.latest())
     )
 
 # ---------------- DASHBOARD ANALYTICS ---------------- #
 
 @app.route("/generate-dashboard")
 def generate_dashboard():
-    con = get_db()
-    df = pd.read_sql("SELECT * FROM exoplanets", con)
-    con.close()
-
-    if df.empty:
-        return "No data available for dashboard"
-
-    os.makedirs("static/plots", exist_ok=True)
-
-    # =============================
-    # 1️⃣ Habitability Score Distribution
-    # =============================
-    plt.figure(figsize=(6,4))
-    sns.histplot(df["habitability_score"], bins=10, kde=True)
-    plt.title("Habitability Score Distribution")
-    plt.xlabel("Habitability Score")
-    plt.ylabel("Number of Planets")
-    plt.tight_layout()
-    plt.savefig("static/plots/score_distribution.png")
-    plt.close()
-
-    # =============================
-    # 2️⃣ Top 10 Habitable Planets
-    # =============================
-    top = df.sort_values("habitability_score", ascending=False).head(10)
-
-    plt.figure(figsize=(6,4))
-    sns.barplot(
-        x=top["habitability_score"],
-        y=top["planet_name"]
-    )
-    plt.title("Top 10 Habitable Exoplanets")
-    plt.xlabel("Habitability Score")
-    plt.ylabel("Planet Name")
-    plt.tight_layout()
-    plt.savefig("static/plots/top_planets.png")
-    plt.close()
-
-    # =============================
-    # 3️⃣ Correlation Heatmap (WORKING)
-    # =============================
-    numeric_df = df.drop(columns=["id", "planet_name"])
-
-    plt.figure(figsize=(10,7))
-    corr = numeric_df.corr()
-
-    sns.heatmap(
-        corr,
-        cmap="coolwarm",
-        linewidths=0.5
-    )
+    with get_db() as con:
+        version = data_version(con)
+
+    if version.startswith("0-"):
+        return jsonify({"status": "empty", "message": "No data available for dashboard"})
+
+    if plot_cache.is_ready(version):
+        return jsonify({
+            "status": "ready",
+            "cache_hit": True,
+            "version": version,
+            "plots": plot_urls(version)
+        })
+
+    future, started = plot_cache.submit(version, load_dashboard_frame)
+
+    # ?wait=1 blocks until the render finishes (scripts, tests)
+    if request.args.get("wait"):
+        future.result()
+        return jsonify({
+            "status": "ready",
+            "cache_hit": False,
+            "version": version,
+            "plots": plot_urls(version)
+        })
 
-    plt.title("Star–Planet Parameter Correlation with Habitability")
-    plt.tight_layout()
-    plt.savefig("static/plots/correlation_heatmap.png")
-    plt.close()
+    return jsonify({
+        "status": "generating",
+        "cache_hit": False,
+        "version": version,
+        "started": started
+    }), 202
+
+# ---------------- EXPORTS ---------------- #
+
+def export_response(kind, render, mimetype, extension):
+    """Serve a cached or freshly rendered ranking export.
+
+    ?limit=N exports the top N (default 10); ?all=1 exports every planet.
+    """
+    full = request.args.get("all", "").lower() in ("1", "true", "yes")
+    limit = None if full else max(request.args.get("limit", 10, type=int), 1)
+
+    with get_db() as con:
+        # One read snapshot for the version check and the rows
+        con.execute("BEGIN")
+        key = (kind, data_version(con), limit)
+        data = export_cache.get(key)
+
+        if data is None:
+            if full:
+                rows = con.execute(RANKING_QUERY)
+            else:
+                rows = con.execute(TOP_EXOPLANETS, (limit,))
+            data = render(rows)
+            export_cache.put(key, data)
+
+    name = "habitability_ranking" if full else "top_exoplanets"
+    return send_file(
+        BytesIO(data),
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=f"{name}.{extension}"
+    )
 
-    return "Dashboard generated successfully"
 
 @app.route("/export/pdf")
 def export_pdf():
-    con = get_db()
-    df = pd.read_sql("""
-        SELECT planet_name, habitability_score
-        FROM exoplanets
-        ORDER BY habitability_score DESC
-        LIMIT 10
-    """, con)
-    con.close()
-
-    file_path = "top_exoplanets.pdf"
-
-    doc = SimpleDocTemplate(file_path)
-    styles = getSampleStyleSheet()
-    elements = []
-
-    elements.append(Paragraph(
-        "Top Candidate Habitable Exoplanets", styles["Title"]
-    ))
-
-    table_data = [["Planet Name", "Habitability Score"]]
-    for _, row in df.iterrows():
-        table_data.append([
-            row["planet_name"],
-            f"{row['habitability_score']:.3f}"
-        ])
-
-    table = Table(table_data)
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0,0), (-1,0), colors.cyan),
-        ("GRID", (0,0), (-1,-1), 1, colors.black),
-        ("ALIGN", (1,1), (-1,-1), "CENTER")
-    ]))
-
-    elements.append(table)
-    doc.build(elements)
-
-    return send_file(file_path, as_attachment=True)
+    return export_response("pdf", render_pdf, PDF_MIMETYPE, "pdf")
 
 @app.route("/export/excel")
 def export_excel():
-    con = get_db()
-    df = pd.read_sql("""
-        SELECT planet_name, habitability_score
-        FROM exoplanets
-        ORDER BY habitability_score DESC
-        LIMIT 10
-    """, con)
-    con.close()
-
-    file_path = "top_exoplanets.xlsx"
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Top Exoplanets"
-
-    ws.append(["Planet Name", "Habitability Score"])
-
-    for _, row in df.iterrows():
-        ws.append([
-            row["planet_name"],
-            round(row["habitability_score"], 3)
-        ])
-
-    wb.save(file_path)
-    return send_file(file_path, as_attachment=True)
+    return export_response("excel", render_excel, XLSX_MIMETYPE, "xlsx")
 
 
 # ---------------- RUN ---------------- #
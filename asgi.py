@@ -0,0 +1,63 @@
+"""
+ASGI entry point for app.py with micro-batched /predict.
+
+Concurrent /predict requests are queued and scored together with one
+predict_proba call on the compiled model (see habitability/batching.py);
+responses are the same as the Flask route's. Every other route is served
+by the Flask app unchanged.
+
+Usage:
+    uvicorn asgi:app --workers 4
+    PREDICT_MAX_BATCH=128 PREDICT_MAX_WAIT_MS=5 uvicorn asgi:app
+"""
+
+from app import (
+    app as flask_app, check_key, metrics, model_input, prediction, prediction_cache,
+    registry
+)
+from habitability.asgi import AsgiApp
+from habitability.batching import MicroBatcher
+from habitability.metrics import phase
+
+
+def score_batch(rows):
+    """One vectorized call for a batch of model_input() dicts."""
+    served, version = registry.active
+    proba = served.model.score_records(rows)
+    return [(float(p), served.threshold, version) for p in proba]
+
+
+batcher = MicroBatcher(score_batch, metrics=metrics, name="predict")
+
+
+async def predict(request):
+    if not check_key(request):
+        return 401, {"error": "Unauthorized"}, {}
+
+    registry.maybe_reload()
+    try:
+        with phase("parse", request.timings):
+            X = model_input(request.json())
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return 400, {"error": f"Invalid request: {e}"}, {}
+
+    served, version = registry.active
+    threshold = served.threshold
+    score = prediction_cache.get(prediction_cache.key(X, version))
+    if score is None:
+        try:
+            with phase("model", request.timings):
+                score, threshold, version = await batcher.submit(X)
+        except Exception as e:
+            return 500, {"error": f"Prediction failed: {e}"}, {}
+        prediction_cache.put(prediction_cache.key(X, version), score)
+
+    return 200, prediction(score, threshold, version), {"X-Model-Version": version}
+
+
+app = AsgiApp(
+    flask_app,
+    {("POST", "/predict"): predict},
+    batchers=[batcher],
+    metrics=metrics,
+)
@@ -1,38 +1,40 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import pandas as pd
-import sqlite3
-import joblib
-import os
+import io
+import math
+
+from config import MODEL_FEATURES
+from database import (
+    get_db,
+    init_db,
+    stale_count,
+    planet_values,
+    insert_planet,
+    insert_planets,
+    RANK_STATS,
+    TOP_PLANETS
+)
+from habitability.metrics import instrument, phase
+from scoring import (
+    complete_row,
+    prediction_cache,
+    registry,
+    score_frame,
+    score_row,
+    scored_values
+)
 
 app = Flask(__name__)
 CORS(app)
 
-# CONFIGURATION
-# -------------------------------------------------
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-DB_PATH = os.path.join(BASE_DIR, "database", "exoplanets.db")
-MODELS_DIR = os.path.join(BASE_DIR, "model")
+# Per-route phase timings at /metrics (METRICS_ENABLED=0 turns it off)
+metrics = instrument(app)
 
-MODEL_FEATURES = [
-    "st_teff",
-    "st_rad",
-    "st_mass",
-    "st_met",
-    "st_luminosity",
-    "pl_orbper",
-    "pl_orbeccen",
-    "pl_insol"
-]
-
-# -------------------------------------------------
-# LOAD MODELS
-# -------------------------------------------------
-
-reg_model = joblib.load(os.path.join(MODELS_DIR, "xgboost_reg.pkl"))
-cls_model = joblib.load(os.path.join(MODELS_DIR, "xgboost_classifier.pkl"))
+# Hot-reloaded classifier; its version is on /metrics and every response
+registry.attach(metrics)
+registry.install(app)
+prediction_cache.attach(metrics)
 
 # -------------------------------------------------
 # FLASK APP
@@ -45,36 +47,15 @@ app.config["DEBUG"] = True
 # DATABASE
 # -------------------------------------------------
 
-def get_db():
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    return sqlite3.connect(DB_PATH)
-
-def init_db():
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS planets (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        planet_name TEXT,
-        st_teff REAL,
-        st_rad REAL,
-        st_mass REAL,
-        st_met REAL,
-        st_luminosity REAL,
-        pl_orbper REAL,
-        pl_orbeccen REAL,
-        pl_insol REAL,
-        source TEXT
-    )
-    """)
-
-    conn.commit()
-    conn.close()
-
 # Initialize DB on startup
 init_db()
 
+with get_db() as _conn:
+    _stale = stale_count(_conn, registry.version)
+if _stale:
+    print(f"⚠️ {_stale} planets have no score for model {registry.version}; "
+          "run `python rescore.py` to refresh /rank")
+
 # -------------------------------------------------
 # HELPER RESPONSE
 # -------------------------------------------------
@@ -97,7 +78,7 @@ def home():
         "Exoplanet Habitability Prediction API",
         {
             "required_features": MODEL_FEATURES,
-            "endpoints": ["/add_planet", "/predict", "/rank"]
+            "endpoints": ["/add_planet", "/predict", "/predict/batch", "/rank"]
         }
     )
 
@@ -109,40 +90,26 @@ def add_planet():
     data = request.get_json()
 
     try:
+        data = complete_row(data)
         planet_name = data.get("planet_name", "Unknown")
 
-        conn = get_db()
-        cur = conn.cursor()
+        # Score at write time so /rank never has to
+        confidence, score, habitability = score_row(data)
+        scores = scored_values([confidence], [score], [habitability])[0]
 
-        # Check duplicate
-        cur.execute(
-            "SELECT 1 FROM planets WHERE planet_name = ? LIMIT 1",
-            (planet_name,)
-        )
-        exists = cur.fetchone() is not None
+        with get_db() as conn:
+            saved = insert_planet(
+                conn,
+                planet_values(planet_name, data, "user", scores)
+            )
 
-        if exists:
-            conn.close()
+        if not saved:
             return response(
                 "success",
                 "Planet already exists",
                 {"planet_saved": False}
             )
 
-        row = {
-            "planet_name": planet_name,
-            **{f: data[f] for f in MODEL_FEATURES},
-            "source": "user"
-        }
-
-        pd.DataFrame([row]).to_sql(
-            "planets",
-            conn,
-            if_exists="append",
-            index=False
-        )
-        conn.close()
-
         return response(
             "success",
             "Planet added successfully",
@@ -157,60 +124,189 @@ def add_planet():
 @app.route("/predict", methods=["POST"])
 @app.route("/predict/", methods=["POST"])
 def predict():
-    data = request.get_json()
+    with phase("parse"):
+        data = request.get_json()
 
     try:
+        data = complete_row(data)
         planet_name = data.get("planet_name", "Unknown")
 
-        # Prepare model input
-        input_df = pd.DataFrame([data])[MODEL_FEATURES]
+        # Prediction (dataframe / predict_proba phases inside)
+        active = registry.active
+        proba, probax, habitability = score_row(data, active)
+
+        # Insert only if new; the unique index answers "exists"
+        scores = scored_values([proba], [probax], [habitability], active.version)[0]
+        with phase("sqlite"), get_db() as conn:
+            exists = not insert_planet(
+                conn,
+                planet_values(planet_name, data, "prediction", scores)
+            )
 
-        # Prediction
-        proba = float(cls_model.predict_proba(input_df)[0][1])
-        probax = proba - 0.1225  # dummy operation
-        habitability = int(proba >= 0.5)
+        with phase("serialize"):
+            return response(
+                "success",
+                "Prediction generated" + (" (planet already exists)" if exists else " and planet saved"),
+                {
+                    "habitability": habitability,
+                    "habitability_score": round(probax, 4),
+                    "confidence": round(proba, 4),
+                    "planet_saved": not exists,
+                    "model_version": active.version
+                }
+            )
 
-        conn = get_db()
-        cur = conn.cursor()
+    except Exception as e:
+        return response("error", str(e)), 400
 
-        # Check duplicate
-        cur.execute(
-            "SELECT 1 FROM planets WHERE planet_name = ? LIMIT 1",
-            (planet_name,)
-        )
-        exists = cur.fetchone() is not None
-
-        # Insert only if new
-        if not exists:
-            row = {
-                "planet_name": planet_name,
-                **{f: data[f] for f in MODEL_FEATURES},
-                "source": "prediction"
-            }
+# ---------------- BATCH PREDICT ----------------
 
-            pd.DataFrame([row]).to_sql(
-                "planets",
-                conn,
-                if_exists="append",
-                index=False
-            )
+# SQLite caps the number of "?" parameters per statement
+SQL_VARIABLE_LIMIT = 500
 
-        conn.close()
 
-        return response(
-            "success",
-            "Prediction generated" + (" (planet already exists)" if exists else " and planet saved"),
-            {
-                "habitability": habitability,
-                "habitability_score": round(probax, 4),
-                "confidence": round(proba, 4),
-                "planet_saved": not exists
-            }
+def read_batch_rows(req):
+    """Return the planets of a batch request as a list of dicts.
+
+    Accepts a JSON array (or {"planets": [...]}), a text/csv body or a
+    CSV file uploaded under the "file" form field.
+    """
+    if "file" in req.files:
+        return csv_records(req.files["file"].read().decode("utf-8"))
+
+    if req.mimetype == "text/csv":
+        return csv_records(req.get_data(as_text=True))
+
+    data = req.get_json()
+    if isinstance(data, dict):
+        data = data.get("planets")
+
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of planets or a CSV body")
+
+    return data
+
+
+def csv_records(text):
+    df = pd.read_csv(io.StringIO(text))
+    # Empty cells become missing keys, like an absent field in JSON
+    return [
+        {k: v for k, v in row.items() if pd.notna(v)}
+        for row in df.to_dict("records")
+    ]
+
+
+def validate_row(row):
+    """Return (planet_name, feature values) or raise ValueError."""
+    if not isinstance(row, dict):
+        raise ValueError("Row must be an object")
+
+    row = complete_row(row)
+    missing = [f for f in MODEL_FEATURES if row.get(f) is None]
+    if missing:
+        raise ValueError("Missing features: " + ", ".join(missing))
+
+    values = []
+    for f in MODEL_FEATURES:
+        try:
+            value = float(row[f])
+        except (TypeError, ValueError):
+            raise ValueError(f"Feature '{f}' is not numeric: {row[f]!r}")
+        # float() also accepts "nan", "inf" and "-inf"
+        if not math.isfinite(value):
+            raise ValueError(f"Feature '{f}' is not a finite number: {row[f]!r}")
+        values.append(value)
+
+    return str(row.get("planet_name", "Unknown")), values
+
+
+def existing_planet_names(cur, names):
+    """Set-based duplicate check, chunked under the SQLite variable limit."""
+    names = list(set(names))
+    found = set()
+
+    for i in range(0, len(names), SQL_VARIABLE_LIMIT):
+        chunk = names[i:i + SQL_VARIABLE_LIMIT]
+        placeholders = ",".join("?" * len(chunk))
+        cur.execute(
+            f"SELECT planet_name FROM planets WHERE planet_name IN ({placeholders})",
+            chunk
         )
+        found.update(r[0] for r in cur.fetchall())
 
+    return found
+
+
+@app.route("/predict/batch", methods=["POST"])
+@app.route("/predict/batch/", methods=["POST"])
+def predict_batch():
+    try:
+        with phase("parse"):
+            rows = read_batch_rows(request)
     except Exception as e:
         return response("error", str(e)), 400
 
+    errors = []
+    valid = []   # (row index, planet_name, feature values)
+
+    for i, row in enumerate(rows):
+        try:
+            planet_name, values = validate_row(row)
+            valid.append((i, planet_name, values))
+        except ValueError as e:
+            name = row.get("planet_name") if isinstance(row, dict) else None
+            errors.append({"row": i, "planet_name": name, "error": str(e)})
+
+    results = []
+
+    if valid:
+        # One vectorized call for the whole batch
+        active = registry.active
+        confidence, score, habitability = score_frame(
+            [v for _, _, v in valid], active
+        )
+        stored = scored_values(confidence, score, habitability, active.version)
+
+        try:
+            with phase("sqlite"), get_db() as conn:
+                cur = conn.cursor()
+
+                # Check and insert inside one write transaction
+                cur.execute("BEGIN IMMEDIATE")
+                existing = existing_planet_names(cur, [n for _, n, _ in valid])
+
+                new_rows = []
+                for (i, planet_name, values), scores in zip(valid, stored):
+                    saved = planet_name not in existing
+                    if saved:
+                        existing.add(planet_name)  # later duplicates in the batch
+                        new_rows.append((planet_name, *values, "prediction", *scores))
+
+                    results.append({
+                        "row": i,
+                        "planet_name": planet_name,
+                        "habitability": scores[2],
+                        "habitability_score": round(scores[0], 4),
+                        "confidence": round(scores[1], 4),
+                        "planet_saved": saved
+                    })
+
+                insert_planets(conn, new_rows)
+        except Exception as e:
+            return response("error", str(e)), 500
+
+    return response(
+        "success",
+        f"Scored {len(results)} of {len(rows)} planets",
+        {
+            "scored_count": len(results),
+            "saved_count": sum(r["planet_saved"] for r in results),
+            "error_count": len(errors),
+            "results": results,
+            "errors": errors
+        }
+    )
+
 # ---------------- RANK ----------------
 
 @app.route("/rank", methods=["GET"])
@@ -218,13 +314,13 @@ def predict():
 def rank():
     top_n = int(request.args.get("top", 10))
 
-    conn = get_db()
-    df = pd.read_sql("SELECT * FROM planets", conn)
-    conn.close()
-
-    total_count = len(df)
+    with phase("sqlite"), get_db() as conn:
+        total_count, habitable_count, average_score = (
+            conn.execute(RANK_STATS).fetchone()
+        )
+        rows = conn.execute(TOP_PLANETS, (top_n,)).fetchall() if total_count else []
 
-    if df.empty:
+    if total_count == 0:
         return response(
             "success",
             "No planets available",
@@ -236,46 +332,29 @@ def rank():
             }
         )
 
-    X = df[MODEL_FEATURES]
-
-    proba = cls_model.predict_proba(X)[:, 1]
-    probax = proba - 0.1225
-
-    df["habitability_score"] = probax
-    df["confidence"] = proba
-    df["habitability"] = (proba >= 0.5).astype(int)
-
-    habitable_count = int(df["habitability"].sum())
-    average_score = float(df["habitability_score"].mean())
-
-    ranked = (
-        df[[
-            "planet_name",
-            "habitability",
-            "habitability_score",
-            "confidence"
-        ]]
-        .drop_duplicates()
-        .sort_values("habitability_score", ascending=False)
-        .head(top_n)
-        .reset_index(drop=True)
-    )
-
-    ranked["rank"] = ranked.index + 1
-    ranked["confidence"] = ranked["confidence"].round(4)
-    ranked["habitability_score"] = ranked["habitability_score"].round(4)
-    ranked["habitability"] = ranked["habitability"].astype(int)
+    with phase("serialize"):
+        ranked = [
+            {
+                "planet_name": name,
+                "habitability": int(habitability),
+                "habitability_score": round(score, 4),
+                "confidence": round(confidence, 4),
+                "rank": i + 1
+            }
+            for i, (name, habitability, score, confidence) in enumerate(rows)
+        ]
 
-    return response(
-        "success",
-        "Ranking generated",
-        {
-            "total_count": total_count,
-            "habitable_count": habitable_count,
-            "average_score": round(average_score, 4),
-            "data": ranked.to_dict("records")
-        }
-    )
+        return response(
+            "success",
+            "Ranking generated",
+            {
+                "total_count": total_count,
+                "habitable_count": int(habitable_count),
+                "average_score": round(average_score or 0, 4),
+                "model_version": registry.version,
+                "data": ranked
+            }
+        )
 
 
 
@@ -0,0 +1,94 @@
+"""
+ASGI entry point for the backend with micro-batched /predict.
+
+Concurrent /predict requests are scored with one predict_proba call and
+stored in one SQLite transaction per batch (see habitability/batching.py);
+responses are the same as the Flask route's. /add_planet, /predict/batch,
+/rank and /metrics are served by the Flask app unchanged.
+
+Usage (from backend/):
+    uvicorn asgi:app --workers 4
+"""
+
+from app import app as flask_app, metrics, validate_row
+from config import MODEL_FEATURES
+from database import get_db, insert_planet, planet_values
+from habitability.asgi import AsgiApp
+from habitability.batching import MicroBatcher
+from habitability.metrics import phase
+from scoring import prediction_cache, registry, score_frame, scored_values
+
+
+def predict_batch(rows):
+    """Score and store a batch of (planet_name, data) in one go.
+
+    Returns (scores, saved) per row, scores as from scored_values().
+    """
+    active = registry.active
+    keys = [prediction_cache.key(data, active.version) for _, data in rows]
+    results = [prediction_cache.get(key) for key in keys]
+
+    # One vectorized call for the rows not seen before
+    todo = [i for i, result in enumerate(results) if result is None]
+    if todo:
+        confidence, score, habitability = score_frame(
+            [[rows[i][1][f] for f in MODEL_FEATURES] for i in todo], active
+        )
+        for i, c, s, h in zip(todo, confidence, score, habitability):
+            results[i] = float(c), float(s), int(h)
+            prediction_cache.put(keys[i], results[i])
+
+    stored = scored_values(*zip(*results), active.version)
+
+    with get_db() as conn:
+        saved = [
+            insert_planet(conn, planet_values(name, data, "prediction", scores))
+            for (name, data), scores in zip(rows, stored)
+        ]
+    return list(zip(stored, saved))
+
+
+batcher = MicroBatcher(predict_batch, metrics=metrics, name="predict")
+
+
+def response(status, message, data=None):
+    return {"status": status, "message": message, "data": data}
+
+
+async def predict(request):
+    registry.maybe_reload()
+    try:
+        # Same checks as /predict/batch: every row reaches the batch as floats
+        with phase("parse", request.timings):
+            planet_name, values = validate_row(request.json())
+    except ValueError as e:
+        return 400, response("error", str(e)), {}
+
+    data = dict(zip(MODEL_FEATURES, values))
+    try:
+        with phase("model", request.timings):
+            scores, saved = await batcher.submit((planet_name, data))
+    except Exception as e:
+        # Scoring or SQLite failed: not the client's fault
+        return 500, response("error", str(e)), {}
+
+    habitability_score, confidence, habitability, version = scores
+    return 200, response(
+        "success",
+        "Prediction generated" + (" and planet saved" if saved else " (planet already exists)"),
+        {
+            "habitability": habitability,
+            "habitability_score": round(habitability_score, 4),
+            "confidence": round(confidence, 4),
+            "planet_saved": saved,
+            "model_version": version
+        }
+    ), {"X-Model-Version": version}
+
+
+app = AsgiApp(
+    flask_app,
+    {("POST", "/predict"): predict, ("POST", "/predict/"): predict},
+    batchers=[batcher],
+    metrics=metrics,
+)
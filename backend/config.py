@@ -1,10 +1,21 @@
 import os
+import sys
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-DB_PATH = os.path.join(BASE_DIR, "database", "exoplanets.db")
+# Shared library code (habitability/) lives in the repository root
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+DB_PATH = os.environ.get(
+    "EXOPLANETS_DB", os.path.join(BASE_DIR, "database", "exoplanets.db")
+)
 MODELS_DIR = os.path.join(BASE_DIR, "model")
 
+CLASSIFIER_PATH = os.path.join(MODELS_DIR, "xgboost_classifier.pkl")
+REGRESSOR_PATH = os.path.join(MODELS_DIR, "xgboost_reg.pkl")
+
 DEBUG = True
 
 # 🔒 Fixed model input schema
@@ -18,3 +29,11 @@ MODEL_FEATURES = [
     "pl_orbeccen",
     "pl_insol"
 ]
+
+# habitability.physics names that differ in this schema; st_luminosity
+# and pl_insol are derived from the star and orbit when not sent
+PHYSICS_NAMES = {"st_lum": "st_luminosity"}
+
+# Classifier probability cut-off and the offset applied to get the score
+HABITABLE_THRESHOLD = 0.5
+SCORE_OFFSET = 0.1225
@@ -0,0 +1,191 @@
+from config import DB_PATH, MODEL_FEATURES
+from habitability.db import connection
+
+# Columns filled in when a row is scored, in insert/update order
+SCORE_COLUMNS = [
+    ("habitability_score", "REAL"),
+    ("confidence", "REAL"),
+    ("habitability", "INTEGER"),
+    ("model_version", "TEXT")
+]
+
+PLANET_COLUMNS = [
+    "planet_name",
+    *MODEL_FEATURES,
+    "source",
+    *[name for name, _ in SCORE_COLUMNS]
+]
+
+# -------------------------------------------------
+# HOT STATEMENTS (prepared once per pooled connection)
+# -------------------------------------------------
+
+# Insert-if-new in one statement; idx_planets_name decides "exists"
+INSERT_PLANET = (
+    f"INSERT INTO planets ({', '.join(PLANET_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(PLANET_COLUMNS))}) "
+    "ON CONFLICT (planet_name) DO NOTHING"
+)
+
+# Totals kept in planet_stats by the triggers below: O(1) per /rank
+RANK_STATS = """
+    SELECT planets, habitable, CASE WHEN scored THEN score_sum / scored END
+    FROM planet_stats
+"""
+
+# Served straight from idx_planets_score
+TOP_PLANETS = """
+    SELECT planet_name, habitability, habitability_score, confidence
+    FROM planets
+    WHERE habitability_score IS NOT NULL
+    ORDER BY habitability_score DESC
+    LIMIT ?
+"""
+
+# -------------------------------------------------
+# CONNECTION
+# -------------------------------------------------
+
+def get_db():
+    """Pooled WAL connection; use as `with get_db() as conn:`."""
+    return connection(DB_PATH)
+
+
+def planet_values(planet_name, data, source, scores):
+    """Parameters for INSERT_PLANET; scores as from scored_values()."""
+    return (planet_name, *[data[f] for f in MODEL_FEATURES], source, *scores)
+
+
+def insert_planet(conn, values):
+    """Insert one planet; False if the name was already stored."""
+    return conn.execute(INSERT_PLANET, values).rowcount == 1
+
+
+def insert_planets(conn, rows):
+    """Bulk insert with executemany; returns the number of new planets."""
+    return conn.executemany(INSERT_PLANET, rows).rowcount
+
+# -------------------------------------------------
+# SCHEMA
+# -------------------------------------------------
+
+def _stats_delta(row, sign):
+    """SET clause adding ("+") or removing ("-") a row's share of planet_stats."""
+    return f"""
+            planets = planets {sign} 1,
+            habitable = habitable {sign} COALESCE({row}.habitability, 0),
+            scored = scored {sign} ({row}.habitability_score IS NOT NULL),
+            score_sum = score_sum {sign} COALESCE({row}.habitability_score, 0)
+    """
+
+
+STATS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS planets_stats_insert AFTER INSERT ON planets
+    BEGIN
+        UPDATE planet_stats SET {_stats_delta("NEW", "+")} WHERE id = 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS planets_stats_delete AFTER DELETE ON planets
+    BEGIN
+        UPDATE planet_stats SET {_stats_delta("OLD", "-")} WHERE id = 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS planets_stats_update
+    AFTER UPDATE OF habitability, habitability_score ON planets
+    BEGIN
+        UPDATE planet_stats SET {_stats_delta("OLD", "-")} WHERE id = 1;
+        UPDATE planet_stats SET {_stats_delta("NEW", "+")} WHERE id = 1;
+    END
+    """,
+]
+
+
+def init_db():
+    with get_db() as conn:
+        cur = conn.cursor()
+
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS planets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            planet_name TEXT,
+            st_teff REAL,
+            st_rad REAL,
+            st_mass REAL,
+            st_met REAL,
+            st_luminosity REAL,
+            pl_orbper REAL,
+            pl_orbeccen REAL,
+            pl_insol REAL,
+            source TEXT
+        )
+        """)
+
+        # Migration: stored scores for databases created before they existed
+        existing = {row[1] for row in cur.execute("PRAGMA table_info(planets)")}
+        for name, sql_type in SCORE_COLUMNS:
+            if name not in existing:
+                cur.execute(f"ALTER TABLE planets ADD COLUMN {name} {sql_type}")
+
+        cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_planets_score
+        ON planets (habitability_score DESC)
+        """)
+
+        # Migration: one row per planet name, enforced by the schema.
+        # Older databases relied on check-then-insert; keep the first row
+        # and move the later duplicates to planets_duplicates
+        has_unique = cur.execute(
+            "SELECT 1 FROM sqlite_master "
+            "WHERE type = 'index' AND name = 'idx_planets_name'"
+        ).fetchone()
+        if not has_unique:
+            duplicates = """
+            FROM planets
+            WHERE planet_name IS NOT NULL
+              AND id NOT IN (SELECT MIN(id) FROM planets GROUP BY planet_name)
+            """
+            cur.execute(
+                "CREATE TABLE IF NOT EXISTS planets_duplicates AS "
+                "SELECT * FROM planets WHERE 0"
+            )
+            cur.execute(f"INSERT INTO planets_duplicates SELECT * {duplicates}")
+            moved = cur.execute(f"DELETE {duplicates}").rowcount
+            if moved:
+                print(f"⚠️ Moved {moved} duplicate planet rows to planets_duplicates "
+                      "(the first row of each name was kept)")
+            cur.execute("""
+            CREATE UNIQUE INDEX idx_planets_name ON planets (planet_name)
+            """)
+
+        # /rank totals, maintained on every insert / update / delete
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS planet_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            planets INTEGER NOT NULL,
+            habitable INTEGER NOT NULL,
+            scored INTEGER NOT NULL,
+            score_sum REAL NOT NULL
+        )
+        """)
+        for statement in STATS_TRIGGERS:
+            cur.execute(statement)
+
+        # Recounted at start-up: covers older databases and float drift
+        cur.execute("""
+        INSERT OR REPLACE INTO planet_stats
+        SELECT 1, COUNT(*), COALESCE(SUM(habitability), 0),
+               COUNT(habitability_score), COALESCE(SUM(habitability_score), 0)
+        FROM planets
+        """)
+
+
+def stale_count(conn, version):
+    """Number of rows not scored with the given model version."""
+    return conn.execute(
+        "SELECT COUNT(*) FROM planets "
+        "WHERE model_version IS NULL OR model_version != ?",
+        (version,)
+    ).fetchone()[0]
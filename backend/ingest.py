@@ -0,0 +1,216 @@
+"""
+Stream a planet catalog CSV into the planets table.
+
+The CSV is read in chunks, its columns are mapped onto MODEL_FEATURES,
+each chunk is scored with one vectorized call and written with
+executemany in a single transaction together with a progress
+checkpoint, so an interrupted run resumes where it stopped.
+
+Usage (from the backend directory):
+    python ingest.py ../modules/data/raw/Exopl-habit.csv
+    python ingest.py PS_2024.csv --preset nasa --chunksize 100000
+"""
+
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from config import MODEL_FEATURES, PHYSICS_NAMES
+from database import get_db, init_db, insert_planets
+from habitability.physics import derive
+from scoring import score_frame, scored_values
+
+CHUNK_SIZE = 50_000
+
+# Source column -> planets column, per known catalog layout
+PRESETS = {
+    # modules/data/raw/Exopl-habit.csv
+    "exopl-habit": {
+        "Planet_name": "planet_name",
+        "Effective_temp": "st_teff",
+        "Stellar_radius": "st_rad",
+        "Stellar_mass": "st_mass",
+        "Stellar_luminosity": "st_luminosity",
+        "Orbit_period": "pl_orbper",
+        "Eccentricity": "pl_orbeccen",
+        "Insolation_flux": "pl_insol"
+    },
+    # NASA Exoplanet Archive (PS / PSCompPars tables)
+    "nasa": {
+        "pl_name": "planet_name",
+        "st_teff": "st_teff",
+        "st_rad": "st_rad",
+        "st_mass": "st_mass",
+        "st_met": "st_met",
+        "st_lum": "st_luminosity",
+        "pl_orbper": "pl_orbper",
+        "pl_orbeccen": "pl_orbeccen",
+        "pl_insol": "pl_insol"
+    }
+}
+
+# -------------------------------------------------
+# PROGRESS CHECKPOINTS
+# -------------------------------------------------
+
+def init_progress(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS ingest_progress (
+        source TEXT PRIMARY KEY,
+        rows_done INTEGER NOT NULL,
+        rows_inserted INTEGER NOT NULL
+    )
+    """)
+
+
+def source_key(path):
+    """Identify a catalog file; a changed file starts from scratch."""
+    st = os.stat(path)
+    return f"{os.path.abspath(path)}:{st.st_size}:{int(st.st_mtime)}"
+
+
+def load_progress(conn, key):
+    row = conn.execute(
+        "SELECT rows_done, rows_inserted FROM ingest_progress WHERE source = ?",
+        (key,)
+    ).fetchone()
+    return row or (0, 0)
+
+
+def save_progress(conn, key, rows_done, rows_inserted):
+    conn.execute("""
+        INSERT INTO ingest_progress (source, rows_done, rows_inserted)
+        VALUES (?, ?, ?)
+        ON CONFLICT (source) DO UPDATE SET
+            rows_done = excluded.rows_done,
+            rows_inserted = excluded.rows_inserted
+    """, (key, rows_done, rows_inserted))
+
+# -------------------------------------------------
+# COLUMN MAPPING
+# -------------------------------------------------
+
+def read_header(path):
+    return list(pd.read_csv(path, comment="#", nrows=0).columns)
+
+
+def detect_preset(columns):
+    """Preset whose source columns best match the CSV header."""
+    scores = {
+        name: len(set(mapping) & set(columns))
+        for name, mapping in PRESETS.items()
+    }
+    best = max(scores, key=scores.get)
+    if scores[best] == 0:
+        raise ValueError("Could not recognise the catalog columns; use --preset")
+    return best
+
+
+def to_planets(chunk, mapping):
+    """Rename a raw chunk to planet_name + MODEL_FEATURES (floats)."""
+    df = chunk.rename(columns=mapping)
+
+    out = pd.DataFrame(index=df.index)
+    out["planet_name"] = df["planet_name"].astype("string").str.strip()
+    for f in MODEL_FEATURES:
+        out[f] = (
+            pd.to_numeric(df[f], errors="coerce") if f in df
+            else float("nan")
+        )
+    # Luminosity / insolation the catalog lacks, from the star and orbit
+    derive(out, PHYSICS_NAMES)
+
+    return out[out["planet_name"].notna() & (out["planet_name"] != "")]
+
+# -------------------------------------------------
+# INGESTION
+# -------------------------------------------------
+
+def ingest(path, preset=None, chunk_size=CHUNK_SIZE, restart=False, source="ingest"):
+    init_db()
+
+    columns = read_header(path)
+    preset = preset or detect_preset(columns)
+    mapping = {k: v for k, v in PRESETS[preset].items() if k in columns}
+    if "planet_name" not in mapping.values():
+        raise ValueError("The catalog has no planet name column")
+
+    key = source_key(path)
+
+    with get_db() as conn:
+        init_progress(conn)
+        if restart:
+            conn.execute("DELETE FROM ingest_progress WHERE source = ?", (key,))
+        rows_done, rows_inserted = load_progress(conn, key)
+
+    if rows_done:
+        print(f"↻ Resuming after {rows_done} rows")
+
+    reader = pd.read_csv(
+        path,
+        comment="#",
+        usecols=list(mapping),
+        chunksize=chunk_size
+    )
+
+    start = time.perf_counter()
+    seen = 0
+    processed = 0
+
+    with get_db() as conn:
+        for chunk in reader:
+            seen += len(chunk)
+            if seen <= rows_done:
+                continue
+            if seen - len(chunk) < rows_done:
+                # Partially done chunk from a different chunk size
+                chunk = chunk.iloc[rows_done - (seen - len(chunk)):]
+
+            planets = to_planets(chunk, mapping)
+            scores = scored_values(*score_frame(planets[MODEL_FEATURES]))
+
+            rows = [
+                (name, *features, source, *s)
+                for name, *features, s in zip(
+                    planets["planet_name"].tolist(),
+                    *[planets[f].tolist() for f in MODEL_FEATURES],
+                    scores
+                )
+            ]
+
+            # One transaction per chunk, checkpoint included
+            with conn:
+                rows_inserted += insert_planets(conn, rows)
+                save_progress(conn, key, seen, rows_inserted)
+
+            processed += len(chunk)
+            elapsed = time.perf_counter() - start
+            print(f"  {seen:>10,} rows read | {rows_inserted:>10,} new planets | "
+                  f"{processed / elapsed:>10,.0f} rows/s")
+
+    return {
+        "preset": preset,
+        "rows_read": seen,
+        "rows_processed": processed,
+        "planets_inserted": rows_inserted,
+        "seconds": time.perf_counter() - start
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("csv", help="catalog CSV to load")
+    parser.add_argument("--preset", choices=sorted(PRESETS),
+                        help="column layout (detected from the header by default)")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore any saved progress for this file")
+    args = parser.parse_args()
+
+    stats = ingest(args.csv, args.preset, args.chunksize, args.restart)
+    rate = stats["rows_processed"] / max(stats["seconds"], 1e-9)
+    print(f"\n✅ Ingested {stats['rows_read']:,} rows ({stats['preset']}) → "
+          f"{stats['planets_inserted']:,} new planets in {stats['seconds']:.2f}s "
+          f"({rate:,.0f} rows/s)")
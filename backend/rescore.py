@@ -0,0 +1,75 @@
+"""
+Refresh the stored habitability scores after the classifier changes.
+
+Rows whose model_version differs from the current model file are
+re-scored in chunks and updated in one transaction per chunk.
+
+Usage (from the backend directory):
+    python rescore.py            # only stale rows
+    python rescore.py --all      # every row
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from config import MODEL_FEATURES
+from database import get_db, init_db, SCORE_COLUMNS
+from scoring import registry, score_frame, scored_values
+
+CHUNK_SIZE = 5000
+
+
+def rescore(rescore_all=False, chunk_size=CHUNK_SIZE):
+    init_db()
+
+    where = "" if rescore_all else (
+        "AND (model_version IS NULL OR model_version != ?)"
+    )
+    params = () if rescore_all else (registry.version,)
+
+    assignments = ", ".join(f"{name} = ?" for name, _ in SCORE_COLUMNS)
+    update_sql = f"UPDATE planets SET {assignments} WHERE id = ?"
+
+    last_id = 0
+    updated = 0
+    start = time.perf_counter()
+
+    with get_db() as conn:
+        while True:
+            chunk = pd.read_sql(
+                f"SELECT id, {', '.join(MODEL_FEATURES)} FROM planets "
+                f"WHERE id > ? {where} ORDER BY id LIMIT ?",
+                conn,
+                params=(last_id, *params, chunk_size)
+            )
+            if chunk.empty:
+                break
+
+            values = scored_values(*score_frame(chunk[MODEL_FEATURES]))
+
+            with conn:
+                conn.executemany(
+                    update_sql,
+                    [(*v, int(i)) for v, i in zip(values, chunk["id"])]
+                )
+
+            updated += len(chunk)
+            last_id = int(chunk["id"].iloc[-1])
+
+    return updated, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="re-score every row, not only rows from another model version"
+    )
+    args = parser.parse_args()
+
+    updated, elapsed = rescore(rescore_all=args.all)
+    print(f"✅ Re-scored {updated} planets with model {registry.version} "
+          f"in {elapsed:.2f}s")
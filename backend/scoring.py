@@ -0,0 +1,111 @@
+import os
+
+import pandas as pd
+
+from config import (
+    CLASSIFIER_PATH,
+    REGRESSOR_PATH,
+    MODELS_DIR,
+    MODEL_FEATURES,
+    PHYSICS_NAMES,
+    HABITABLE_THRESHOLD,
+    SCORE_OFFSET
+)
+from habitability.cache import PredictionCache
+from habitability.metrics import phase
+from habitability.physics import derive_record
+from habitability.registry import ModelRegistry, check_probabilities
+from habitability.tree_model import load_model
+
+# -------------------------------------------------
+# LOAD MODELS
+# -------------------------------------------------
+
+# Exported NumPy trees (python -m habitability.tree_model) for small
+# batches, xgboost for large ones when installed
+reg_model = load_model(REGRESSOR_PATH)
+
+
+def load_classifier(directory, mmap_mode=None):
+    path = os.path.join(directory, os.path.basename(CLASSIFIER_PATH))
+    return load_model(path, mmap_mode)
+
+
+# Sun-like, hot-Jupiter and all-missing rows every new version must score
+SMOKE_BATCH = pd.DataFrame([
+    [5772.0, 1.0, 1.0, 0.0, 0.0, 365.25, 0.0167, 1.0],
+    [6100.0, 1.3, 1.2, 0.1, 0.4, 3.5, 0.0, 1200.0],
+    [None] * len(MODEL_FEATURES),
+], columns=MODEL_FEATURES, dtype=float)
+
+# The classifier's version is the short content hash of its pickle,
+# stored with every score. Serves model/registry/xgboost_classifier/CURRENT
+# once a version is published, the flat model/ directory until then.
+registry = ModelRegistry(
+    "xgboost_classifier",
+    load_classifier,
+    lambda model: check_probabilities(model, SMOKE_BATCH),
+    primary=os.path.basename(CLASSIFIER_PATH),
+    fallback_dir=MODELS_DIR,
+    root=os.path.join(MODELS_DIR, "registry"),
+)
+
+# Single-planet scores by (version, rounded features); the apps attach it
+# to their /metrics
+prediction_cache = PredictionCache(MODEL_FEATURES)
+registry.on_reload(prediction_cache.clear)
+
+# -------------------------------------------------
+# SCORING
+# -------------------------------------------------
+
+def score_frame(X, active=None):
+    """Score a feature frame (or 2-D array) in one vectorized call.
+
+    Returns float arrays (confidence, habitability_score) and the int
+    habitability flag, aligned with the input rows. `active` pins the
+    (model, version) pair; the registry's current one by default.
+    """
+    model = (active or registry.active).model
+
+    if not isinstance(X, pd.DataFrame):
+        with phase("dataframe"):
+            X = pd.DataFrame(X, columns=MODEL_FEATURES)
+
+    with phase("predict_proba"):
+        confidence = model.predict_proba(X[MODEL_FEATURES])[:, 1].astype(float)
+    score = confidence - SCORE_OFFSET
+    habitability = (confidence >= HABITABLE_THRESHOLD).astype(int)
+
+    return confidence, score, habitability
+
+
+def complete_row(data):
+    """Copy of a planet dict with missing st_luminosity / pl_insol derived."""
+    return derive_record(data, PHYSICS_NAMES)
+
+
+def score_row(data, active=None):
+    """Score a single planet dict; returns (confidence, score, habitability)."""
+    active = active or registry.active
+    key = prediction_cache.key(data, active.version)
+    cached = prediction_cache.get(key)
+    if cached is not None:
+        return cached
+
+    with phase("dataframe"):
+        X = pd.DataFrame([data])[MODEL_FEATURES]
+    confidence, score, habitability = score_frame(X, active)
+    result = float(confidence[0]), float(score[0]), int(habitability[0])
+    prediction_cache.put(key, result)
+    return result
+
+
+def scored_values(confidence, score, habitability, version=None):
+    """Row tuples for the planets score columns (see SCORE_COLUMNS)."""
+    version = version or registry.version
+    return [
+        (float(s), float(c), int(h), version)
+        for c, s, h in zip(confidence, score, habitability)
+    ]
+
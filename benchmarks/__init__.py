@@ -0,0 +1,5 @@
+"""
+Performance checks for the models, apps and pipeline.
+
+Run from the repository root, e.g. python -m benchmarks.compiled_model
+"""
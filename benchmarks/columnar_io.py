@@ -0,0 +1,90 @@
+"""
+Load time and file size of the pipeline hand-off formats: CSV (the old
+stage outputs) against Parquet and Feather via habitability.io.
+
+By default a synthetic table shaped like
+cleaned_feature_engineered_dataset (float features plus bool one-hot
+spectral types) is used; pass --table to measure a real stage output.
+
+Usage:
+    python -m benchmarks.columnar_io [--rows 200000] [--table outputs/x.parquet]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from habitability.io import read_table, write_table
+
+NUMERIC = [
+    "pl_orbper", "pl_rade", "pl_bmasse", "pl_orbeccen",
+    "pl_insol", "pl_eqt", "st_teff", "st_mass",
+    "habitability_score", "stellar_compatibility",
+]
+
+# Columns a downstream reader typically needs (projection case)
+PROJECTION = ["pl_rade", "pl_eqt", "pl_insol"]
+
+
+def synthetic_cleaned(n, seed=42):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.random(n) for col in NUMERIC})
+
+    spectypes = [f"st_spectype_{c}{i} V" for c in "FGKM" for i in range(10)]
+    picked = rng.integers(0, len(spectypes), n)
+    for i, col in enumerate(spectypes):
+        df[col] = picked == i
+
+    return df
+
+
+def best_time(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(rows, table):
+    df = read_table(table) if table else synthetic_cleaned(rows)
+    columns = [c for c in PROJECTION if c in df.columns] or list(df.columns[:3])
+
+    print(f"Table: {table or 'synthetic'} {df.shape}\n")
+    print(f"{'format':8s} {'size MB':>8s} {'write s':>8s} {'read s':>8s} "
+          f"{'proj s':>8s} {'dtypes kept':>12s}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for ext in ("csv", "parquet", "feather"):
+            path = os.path.join(tmp, f"table.{ext}")
+
+            write_s = best_time(lambda: write_table(df, path, export_csv_copy=False), 3)
+            read_s = best_time(lambda: read_table(path))
+            proj_s = best_time(lambda: read_table(path, columns=columns))
+
+            dtypes_kept = read_table(path).dtypes.equals(df.dtypes)
+            size_mb = os.path.getsize(path) / 2**20
+            results[ext] = (size_mb, read_s)
+
+            print(f"{ext:8s} {size_mb:8.2f} {write_s:8.3f} {read_s:8.3f} "
+                  f"{proj_s:8.3f} {str(dtypes_kept):>12s}")
+
+    csv_size, csv_read = results["csv"]
+    for ext in ("parquet", "feather"):
+        size, read = results[ext]
+        print(f"\n{ext}: {csv_read / read:.1f}x faster full load, "
+              f"{csv_size / size:.1f}x smaller than CSV")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--table", help="existing stage table to measure")
+    args = parser.parse_args()
+    main(args.rows, args.table)
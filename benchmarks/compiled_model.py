@@ -0,0 +1,90 @@
+"""
+Parity and latency of the compiled NumPy scorer against the sklearn
+pipeline in model/habitability_model.pkl.
+
+Usage:
+    python -m benchmarks.compiled_model [--rows 100000]
+"""
+
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from habitability.compiled_model import MODEL_PATH, compile_pipeline, CompiledModel
+
+TOLERANCE = 1e-9
+
+
+def synthetic_planets(pipeline, n, seed=42):
+    """Random inputs around the training medians, with gaps and unknowns."""
+    rng = np.random.default_rng(seed)
+    ct = pipeline.named_steps["preprocessing"]
+    num = ct.named_transformers_["num"]
+    medians = num.named_steps["imputer"].statistics_
+    scales = num.named_steps["scaler"].scale_
+
+    X = {}
+    for col, med, sd in zip(ct.transformers_[0][2], medians, scales):
+        values = med + rng.normal(0, sd, n)
+        values[rng.random(n) < 0.1] = np.nan
+        X[col] = values
+
+    for i, col in enumerate(ct.transformers_[1][2]):
+        cats = ct.named_transformers_["cat"].named_steps["onehot"].categories_[i]
+        values = rng.choice(np.append(cats, ["Unknown-1", "Unknown-2"]), n)
+        values = values.astype(object)
+        values[rng.random(n) < 0.1] = np.nan
+        X[col] = values
+
+    return pd.DataFrame(X)
+
+
+def best_time(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(rows):
+    pipeline = joblib.load(MODEL_PATH)
+    compiled = CompiledModel(compile_pipeline(pipeline))
+    X = synthetic_planets(pipeline, rows)
+
+    # ---- Parity ----
+    expected = pipeline.predict_proba(X)[:, 1]
+    got = compiled.predict_proba(X)[:, 1]
+    diff = float(np.max(np.abs(expected - got)))
+
+    records = X.head(1000).to_dict("records")
+    got_rows = np.array([compiled.score_record(r) for r in records])
+    diff_rows = float(np.max(np.abs(expected[:1000] - got_rows)))
+
+    print(f"Parity (batch) : max |diff| = {diff:.2e}")
+    print(f"Parity (record): max |diff| = {diff_rows:.2e}")
+    assert diff < TOLERANCE and diff_rows < TOLERANCE, "compiled model drifted"
+
+    # ---- Latency ----
+    one = X.head(1)
+    record = records[0]
+    sk_one = best_time(lambda: pipeline.predict_proba(one), repeat=50)
+    np_one = best_time(lambda: compiled.score_record(record), repeat=50)
+    sk_all = best_time(lambda: pipeline.predict_proba(X), repeat=3)
+    np_all = best_time(lambda: compiled.predict_proba(X), repeat=3)
+
+    print(f"\n{'':16s}{'sklearn':>12s}{'compiled':>12s}{'speed-up':>10s}")
+    print(f"{'1 row':16s}{sk_one * 1e6:10.1f}us{np_one * 1e6:10.1f}us"
+          f"{sk_one / np_one:9.1f}x")
+    print(f"{f'{rows} rows':16s}{sk_all * 1e3:10.1f}ms{np_all * 1e3:10.1f}ms"
+          f"{sk_all / np_all:9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    main(parser.parse_args().rows)
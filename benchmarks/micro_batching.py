@@ -0,0 +1,138 @@
+"""
+Throughput of the micro-batched ASGI /predict (asgi.py) under concurrent
+load, against the same server scoring one request at a time, plus parity
+of its responses with the Flask route.
+
+The ASGI app is driven in-process (no sockets), so the numbers isolate
+queueing and scoring from HTTP parsing.
+
+Usage:
+    python -m benchmarks.micro_batching [--clients 64] [--requests 4000]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.run import ROOT_PAYLOAD, load_apps
+from habitability.batching import MAX_BATCH, MAX_WAIT_MS, MicroBatcher
+
+HEADERS = [(b"content-type", b"application/json"), (b"x-api-key", b"SECRET123")]
+
+
+async def call(app, method, path, body=b"", headers=HEADERS):
+    """One request through the ASGI app; returns (status, headers, body)."""
+    scope = {"type": "http", "method": method, "path": path,
+             "headers": headers, "query_string": b""}
+    sent = iter([{"type": "http.request", "body": body, "more_body": False}])
+    out = {"body": b""}
+
+    async def receive():
+        return next(sent, {"type": "http.disconnect"})
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            out["status"] = message["status"]
+            out["headers"] = dict(message["headers"])
+        else:
+            out["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return out["status"], out["headers"], out["body"]
+
+
+def payloads(n, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(n):
+        row = dict(ROOT_PAYLOAD)
+        row["pl_rade"] = float(rng.uniform(0.5, 3))
+        row["pl_insol"] = float(rng.uniform(0.1, 3))
+        row["pl_eqt"] = float(rng.uniform(150, 400))
+        rows.append(row)
+    return rows
+
+
+async def load(app, bodies, clients):
+    """`clients` concurrent callers sharing `bodies`; returns requests/s."""
+    queue = iter(bodies)
+
+    async def client():
+        for body in queue:
+            status, _, text = await call(app, "POST", "/predict", body)
+            assert status == 200, text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return len(bodies) / (time.perf_counter() - start)
+
+
+async def run(module, bodies, clients, max_batch):
+    module.batcher = MicroBatcher(module.score_batch, max_batch=max_batch,
+                                  metrics=None, name="bench")
+    module.app.batchers = [module.batcher]
+    await load(module.app, bodies[:200], clients)  # warm-up
+    sizes = []
+    module.batcher._record = lambda batch, start, end: sizes.append(len(batch))
+    rps = await load(module.app, bodies, clients)
+    await module.batcher.stop()
+    return rps, float(np.mean(sizes))
+
+
+async def parity(module, client, rows):
+    worst = 0.0
+    for row in rows:
+        flask = client.post("/predict", json=row, headers={"x-api-key": "SECRET123"}).get_json()
+        status, _, body = await call(module.app, "POST", "/predict", json.dumps(row).encode())
+        got = json.loads(body)
+        assert status == 200 and got["habitability_prediction"] == flask["habitability_prediction"]
+        assert got["model_version"] == flask["model_version"]
+        worst = max(worst, abs(got["habitability_score"] - flask["habitability_score"]))
+    return worst
+
+
+def main(clients, requests):
+    with tempfile.TemporaryDirectory() as tmp:
+        root_client, _ = load_apps(tmp)
+        with contextlib.redirect_stdout(io.StringIO()):
+            module = importlib.import_module("asgi")
+        # Every run replays the same bodies: measure scoring, not cache hits
+        module.prediction_cache.maxsize = 0
+
+        rows = payloads(requests)
+        bodies = [json.dumps(r).encode() for r in rows]
+
+        diff = asyncio.run(parity(module, root_client, rows[:200]))
+        print(f"Parity with Flask /predict: max |score diff| = {diff:.1e}")
+        assert diff == 0.0, "ASGI /predict drifted from Flask"
+
+        # Flask, one request at a time (the current deployment)
+        start = time.perf_counter()
+        for row in rows:
+            root_client.post("/predict", json=row, headers={"x-api-key": "SECRET123"})
+        flask_rps = requests / (time.perf_counter() - start)
+
+        single, _ = asyncio.run(run(module, bodies, clients, 1))
+        batched, mean_batch = asyncio.run(run(module, bodies, clients, MAX_BATCH))
+
+    print(f"\n{requests} requests, {clients} concurrent clients, "
+          f"max_batch={MAX_BATCH}, max_wait={MAX_WAIT_MS}ms")
+    print(f"  Flask test client (sequential) : {flask_rps:8.0f} req/s")
+    print(f"  ASGI, max_batch=1              : {single:8.0f} req/s")
+    print(f"  ASGI, micro-batched            : {batched:8.0f} req/s  "
+          f"(mean batch {mean_batch:.1f}, {batched / single:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=4000)
+    args = parser.parse_args()
+    main(args.clients, args.requests)
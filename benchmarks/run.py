@@ -0,0 +1,478 @@
+"""
+Performance suite for the serving and training paths, with a saved
+baseline and a regression gate.
+
+Groups (all run by default, pick some with --only):
+
+    predict   single-row POST /predict latency in app.py and backend/app.py
+    batch     predict_proba throughput of habitability_model.pkl and
+              xgboost_classifier.pkl (and the exported forms the apps load)
+    rank      backend GET /rank latency with 1k / 10k / 100k stored planets
+    pipeline  wall time and peak RSS of every module1 → module4 stage on
+              the bundled modules/data CSVs scaled up synthetically
+
+The apps run against scratch databases (HABITABILITY_DB / EXOPLANETS_DB)
+so the checked-in .db files are never written. Baselines are specific to
+the machine they were recorded on and are not committed.
+
+Usage:
+    python -m benchmarks.run                       # measure and print
+    python -m benchmarks.run --save                # record benchmarks/baseline.json
+    python -m benchmarks.run --check               # exit 1 on >15% regressions
+    python -m benchmarks.run --check --tolerance 25 --only predict rank
+"""
+
+import argparse
+import contextlib
+import importlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
+
+BASELINE_PATH = os.path.join(ROOT_DIR, "benchmarks", "baseline.json")
+TOLERANCE = 15.0
+
+GROUPS = ("predict", "batch", "rank", "pipeline")
+
+# better: "lower" / "higher" is gated against the baseline, None is informational
+Metric = namedtuple("Metric", "value unit better")
+
+REQUESTS = 300
+WARMUP = 20
+BATCH_ROWS = 100_000
+RANK_SIZES = (1_000, 10_000, 100_000)
+PIPELINE_ROWS = 100_000
+
+ROOT_PAYLOAD = {
+    "pl_orbper": 365.25, "pl_orbeccen": 0.0167, "pl_rade": 1.0,
+    "pl_bmasse": 1.0, "pl_eqt": 255.0, "pl_insol": 1.0,
+    "st_teff": 5772.0, "st_rad": 1.0, "st_mass": 1.0, "st_lum": 0.0,
+    "sy_dist": 10.0, "st_spectype": "G2 V", "discoverymethod": "Transit",
+}
+
+BACKEND_PAYLOAD = {
+    "planet_name": "Benchmark-1 b",
+    "st_teff": 5772.0, "st_rad": 1.0, "st_mass": 1.0, "st_met": 0.0,
+    "st_luminosity": 0.0, "pl_orbper": 365.25, "pl_orbeccen": 0.0167,
+    "pl_insol": 1.0,
+}
+
+
+# ---------------- timing ---------------- #
+
+def latency(call, n=REQUESTS, warmup=WARMUP):
+    """p50 / p95 milliseconds of `call()` over `n` runs."""
+    for _ in range(warmup):
+        call()
+
+    times = np.empty(n)
+    for i in range(n):
+        start = time.perf_counter()
+        call()
+        times[i] = time.perf_counter() - start
+
+    p50, p95 = np.percentile(times * 1000, [50, 95])
+    return p50, p95
+
+
+def best_time(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def add_latency(results, name, call):
+    p50, p95 = latency(call)
+    results[f"{name}.p50_ms"] = Metric(p50, "ms", "lower")
+    results[f"{name}.p95_ms"] = Metric(p95, "ms", None)
+
+
+# ---------------- apps ---------------- #
+
+def load_apps(tmp):
+    """Import both Flask apps against scratch copies of their databases."""
+    root_db = os.path.join(tmp, "database.db")
+    shutil.copy(os.path.join(ROOT_DIR, "database.db"), root_db)
+    os.environ["HABITABILITY_DB"] = root_db
+    os.environ["EXOPLANETS_DB"] = os.path.join(tmp, "backend.db")
+
+    # Both apps are called app.py; the backend one imports its siblings
+    # (config, database, scoring) by plain name, which the root lacks
+    if BACKEND_DIR not in sys.path:
+        sys.path.append(BACKEND_DIR)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        root = importlib.import_module("app")
+        spec = importlib.util.spec_from_file_location(
+            "backend_app", os.path.join(BACKEND_DIR, "app.py")
+        )
+        backend = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(backend)
+
+    return root.app.test_client(), backend.app.test_client()
+
+
+def bench_predict(root_client, backend_client):
+    results = {}
+    headers = {"x-api-key": "SECRET123"}
+
+    def root_call():
+        r = root_client.post("/predict", json=ROOT_PAYLOAD, headers=headers)
+        assert r.status_code == 200, r.get_data(as_text=True)
+
+    def backend_call():
+        r = backend_client.post("/predict", json=BACKEND_PAYLOAD)
+        assert r.status_code == 200, r.get_data(as_text=True)
+
+    add_latency(results, "predict.root", root_call)
+    add_latency(results, "predict.backend", backend_call)
+    return results
+
+
+def fill_planets(path, n, start):
+    """Insert synthetic, scored planets start..n-1 into the backend DB."""
+    from benchmarks.tree_model import synthetic_planets
+    from database import insert_planets, planet_values
+    from habitability.db import connection
+    from scoring import score_frame, scored_values
+
+    X = synthetic_planets(n - start, seed=start)
+    confidence, score, habitability = score_frame(X)
+    scores = scored_values(confidence, score, habitability)
+
+    records = X.astype(object).where(X.notna(), None).to_dict("records")
+    rows = [
+        planet_values(f"Synthetic-{start + i} b", record, "benchmark", s)
+        for i, (record, s) in enumerate(zip(records, scores))
+    ]
+    with connection(path) as conn:
+        insert_planets(conn, rows)
+
+
+def bench_rank(backend_client, tmp):
+    database = sys.modules["database"]
+    path = os.path.join(tmp, "rank.db")
+
+    # /rank reads whatever get_db() opens; point it at the growing table
+    saved, database.DB_PATH = database.DB_PATH, path
+    try:
+        database.init_db()
+        results, stored = {}, 0
+        for size in RANK_SIZES:
+            fill_planets(path, size, stored)
+            stored = size
+
+            def call():
+                r = backend_client.get("/rank?top=10")
+                assert r.status_code == 200, r.get_data(as_text=True)
+
+            add_latency(results, f"rank.{size}", call)
+        return results
+    finally:
+        database.DB_PATH = saved
+
+
+# ---------------- batch scoring ---------------- #
+
+def bench_batch():
+    from benchmarks import compiled_model, tree_model
+    from habitability.compiled_model import MODEL_PATH, load_compiled
+    from habitability.tree_model import load_trees
+
+    results = {}
+
+    def throughput(name, model, X):
+        seconds = best_time(lambda: model.predict_proba(X))
+        results[f"batch.{name}.rows_per_s"] = Metric(len(X) / seconds, "rows/s", "higher")
+
+    pipeline = joblib.load(MODEL_PATH)
+    X = compiled_model.synthetic_planets(pipeline, BATCH_ROWS)
+    throughput("habitability_model", pipeline, X)
+    throughput("habitability_model_compiled", load_compiled(MODEL_PATH), X)
+
+    classifier_path = os.path.join(BACKEND_DIR, "model", "xgboost_classifier.pkl")
+    X = tree_model.synthetic_planets(BATCH_ROWS)
+    try:
+        throughput("xgboost_classifier", joblib.load(classifier_path), X)
+    except ImportError:
+        print("⚠️ xgboost not installed; skipping xgboost_classifier.pkl")
+    throughput("xgboost_classifier_trees", load_trees(classifier_path), X)
+    return results
+
+
+# ---------------- pipeline ---------------- #
+
+SPECTRAL_CLASSES = [(30000, "O"), (10000, "B"), (7500, "A"), (6000, "F"),
+                    (5200, "G"), (3700, "K"), (0, "M")]
+
+EARTH_RADII_PER_JUPITER = 11.209
+EARTH_MASSES_PER_JUPITER = 317.83
+
+
+def spectral_type(teff, seed=0):
+    """Main-sequence type from effective temperature (catalogs lack it)."""
+    digits = np.random.default_rng(seed).integers(0, 10, len(teff))
+    labels = np.full(len(teff), None, dtype=object)
+    for lower, letter in reversed(SPECTRAL_CLASSES):
+        hot = teff >= lower
+        labels[hot] = [f"{letter}{d} V" for d in digits[hot]]
+    return labels
+
+
+def bundled_catalogs():
+    """modules/data catalogs mapped onto module1's column names."""
+    habit = pd.read_csv(os.path.join(ROOT_DIR, "modules", "data", "raw", "Exopl-habit.csv"))
+    nasa = pd.DataFrame({
+        "pl_orbper": habit["Orbit_period"],
+        "pl_rade": habit["Radius (EU)"],
+        "pl_bmasse": habit["Mass (EU)"],
+        "pl_orbeccen": habit["Eccentricity"],
+        "pl_insol": habit["Insolation_flux"],
+        "pl_eqt": habit["Eqilibrium_temp"],
+        "st_teff": habit["Effective_temp"],
+        "st_mass": habit["Stellar_mass"],
+    })
+
+    scrap = pd.read_csv(os.path.join(ROOT_DIR, "modules", "data", "scrap", "Exoplanet_dataset.csv"))
+    other = pd.DataFrame({
+        "pl_orbper": scrap["PeriodDays"],
+        "pl_rade": scrap["RadiusJpt"] * EARTH_RADII_PER_JUPITER,
+        "pl_bmasse": scrap["PlanetaryMassJpt"] * EARTH_MASSES_PER_JUPITER,
+        "pl_orbeccen": scrap["Eccentricity"],
+        "pl_insol": np.nan,
+        "pl_eqt": scrap["SurfaceTempK"],
+        "st_teff": scrap["HostStarTempK"],
+        "st_mass": scrap["HostStarMassSlrMass"],
+    })
+
+    for df in (nasa, other):
+        df["st_spectype"] = spectral_type(df["st_teff"].to_numpy())
+    return nasa, other
+
+
+def scale_up(df, n, seed):
+    """`n` rows resampled from `df` with ±2% jitter, so none are duplicates."""
+    rng = np.random.default_rng(seed)
+    out = df.iloc[rng.integers(0, len(df), n)].reset_index(drop=True)
+    numeric = out.columns.drop("st_spectype")
+    out[numeric] = out[numeric] * rng.lognormal(0, 0.02, (n, len(numeric)))
+    return out
+
+
+# Runs `python <args>` and writes the process's own peak RSS (VmHWM, KiB)
+# to $PEAK_RSS_FILE at exit. The ru_maxrss os.wait4 reports for a child
+# starts from the parent's RSS at fork, i.e. this whole benchmark process.
+PEAK_RSS_WRAPPER = """
+import atexit, os, resource, runpy, sys
+
+def peak():
+    try:
+        with open("/proc/self/status") as f:
+            kib = next(int(l.split()[1]) for l in f if l.startswith("VmHWM:"))
+    except OSError:
+        kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        kib //= 1024 if sys.platform == "darwin" else 1
+    with open(os.environ["PEAK_RSS_FILE"], "w") as f:
+        f.write(str(kib))
+
+atexit.register(peak)
+mode, target, *rest = sys.argv[1:]
+if mode == "-m":
+    sys.argv = [target, *rest]
+    runpy.run_module(target, run_name="__main__", alter_sys=True)
+elif mode == "-c":
+    sys.argv = ["-c", *rest]
+    exec(compile(target, "<string>", "exec"), {"__name__": "__main__"})
+else:
+    sys.argv = [mode, target, *rest]
+    runpy.run_path(mode, run_name="__main__")
+"""
+
+
+def measure_process(args, **popen):
+    """(seconds, peak RSS MB, exit code) of `python <args>` in a fresh process.
+
+    `args` starts with "-m module", "-c code" or a script path.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        peak_path = os.path.join(tmp, "peak_rss")
+        env = dict(popen.pop("env", os.environ), PEAK_RSS_FILE=peak_path)
+
+        start = time.perf_counter()
+        returncode = subprocess.call(
+            [sys.executable, "-W", "ignore", "-c", PEAK_RSS_WRAPPER, *args],
+            env=env, **popen
+        )
+        seconds = time.perf_counter() - start
+
+        peak = None
+        if os.path.exists(peak_path):
+            with open(peak_path) as f:
+                peak = int(f.read()) / 2**10
+    return seconds, peak, returncode
+
+
+def run_stage(module, workspace):
+    """(seconds, peak RSS MB) of `python -m module` in a fresh process."""
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR, MPLBACKEND="Agg")
+    log_path = os.path.join(workspace, f"{module}.log")
+
+    with open(log_path, "w") as log:
+        seconds, peak, returncode = measure_process(
+            ["-m", module], cwd=workspace, env=env,
+            stdout=log, stderr=subprocess.STDOUT
+        )
+
+    if returncode:
+        with open(log_path) as f:
+            tail = f.read()[-2000:]
+        raise RuntimeError(f"{module} failed:\n{tail}")
+    return seconds, peak
+
+
+def bench_pipeline(tmp, rows=PIPELINE_ROWS):
+    from pipeline import STAGES
+
+    workspace = os.path.join(tmp, "pipeline")
+    for sub in ("data", "outputs", "model"):
+        os.makedirs(os.path.join(workspace, sub))
+
+    nasa, other = bundled_catalogs()
+    share = len(nasa) / (len(nasa) + len(other))
+    first = int(rows * share)
+    scale_up(nasa, first, 1).to_csv(
+        os.path.join(workspace, "data", "nasa_exoplanets.csv"), index=False
+    )
+    scale_up(other, rows - first, 2).to_csv(
+        os.path.join(workspace, "data", "exoplanets_dataset.csv"), index=False
+    )
+
+    results = {}
+    for stage in STAGES:
+        seconds, peak = run_stage(stage.module, workspace)
+        results[f"pipeline.{stage.name}.seconds"] = Metric(seconds, "s", "lower")
+        results[f"pipeline.{stage.name}.peak_rss_mb"] = Metric(peak, "MB", "lower")
+    return results
+
+
+# ---------------- baseline ---------------- #
+
+def machine():
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save_baseline(results, path):
+    data = {
+        "machine": machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "metrics": {name: m._asdict() for name, m in results.items()},
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def change_percent(metric, base):
+    """Positive when `metric` is worse than `base` by that many percent."""
+    if not base:
+        return 0.0
+    if metric.better == "higher":
+        return (base - metric.value) / base * 100
+    return (metric.value - base) / base * 100
+
+
+def check_baseline(results, path, tolerance):
+    """Print the comparison; return the names that regressed past `tolerance`."""
+    with open(path) as f:
+        baseline = json.load(f)
+
+    if baseline.get("machine") != machine():
+        print(f"⚠️ Baseline was recorded on {baseline.get('machine')}; numbers may not compare")
+
+    regressions = []
+    print(f"\n{'metric':48s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, metric in results.items():
+        base = baseline["metrics"].get(name)
+        if base is None:
+            print(f"{name:48s} {'-':>12s} {metric.value:12.2f} {'new':>8s}")
+            continue
+
+        worse = change_percent(metric, base["value"])
+        flag = ""
+        if metric.better and worse > tolerance:
+            regressions.append(name)
+            flag = " ❌"
+        print(f"{name:48s} {base['value']:12.2f} {metric.value:12.2f} {-worse:+7.1f}%{flag}")
+
+    return regressions
+
+
+# ---------------- main ---------------- #
+
+def main(args):
+    os.chdir(ROOT_DIR)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if {"predict", "rank"} & set(args.only):
+            root_client, backend_client = load_apps(tmp)
+            if "predict" in args.only:
+                results.update(bench_predict(root_client, backend_client))
+            if "rank" in args.only:
+                results.update(bench_rank(backend_client, tmp))
+        if "batch" in args.only:
+            results.update(bench_batch())
+        if "pipeline" in args.only:
+            results.update(bench_pipeline(tmp, args.pipeline_rows))
+
+    print(f"\n{'metric':48s} {'value':>12s}  unit")
+    for name, metric in results.items():
+        print(f"{name:48s} {metric.value:12.2f}  {metric.unit}")
+
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"\n✅ Baseline saved: {args.baseline}")
+
+    if args.check:
+        regressions = check_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) past {args.tolerance}%: "
+                  + ", ".join(regressions))
+            return 1
+        print(f"\n✅ No regressions past {args.tolerance}%")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--save", action="store_true", help="write the baseline file")
+    parser.add_argument("--check", action="store_true", help="compare against the baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--tolerance", type=float, default=TOLERANCE,
+        help="allowed slowdown in percent before --check fails"
+    )
+    parser.add_argument("--pipeline-rows", type=int, default=PIPELINE_ROWS)
+    sys.exit(main(parser.parse_args()))
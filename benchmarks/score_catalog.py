@@ -0,0 +1,123 @@
+"""
+Peak memory and throughput of score_catalog.py against scoring the whole
+catalog in memory and sorting it (module4's ranking step), plus parity of
+their top K.
+
+A synthetic Parquet catalog is written chunk by chunk (never held whole),
+each run is a fresh process, and peak RSS is the VmHWM it reports at exit
+(benchmarks/run.py measure_process).
+
+Usage:
+    python -m benchmarks.score_catalog [--rows 10000000] [--baseline-rows 1000000]
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+
+import joblib
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from benchmarks.compiled_model import synthetic_planets
+from benchmarks.run import measure_process
+from habitability.compiled_model import MODEL_PATH
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHUNK = 500_000
+TOP_K = 1000
+
+# module4's approach: everything in memory, then a full sort
+IN_MEMORY = """
+import sys
+from habitability.io import read_table, write_table
+from score_catalog import load_model, model_dir
+df = read_table(sys.argv[1])
+model = load_model(model_dir())
+df["habitability_score"] = model.predict_proba(df)[:, 1]
+ranked = df.sort_values("habitability_score", ascending=False, kind="stable")
+write_table(ranked.head(int(sys.argv[3])), sys.argv[2])
+"""
+
+
+def write_catalog(path, rows, pipeline):
+    writer = None
+    for start in range(0, rows, CHUNK):
+        n = min(CHUNK, rows - start)
+        df = synthetic_planets(pipeline, n, seed=start)
+        df.insert(0, "planet_id", range(start, start + n))
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(path, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+def measure(args):
+    """(seconds, peak RSS MB) of a fresh Python process."""
+    seconds, peak, returncode = measure_process(
+        args, cwd=ROOT_DIR, env=dict(os.environ, PYTHONPATH=ROOT_DIR),
+        stdout=subprocess.DEVNULL
+    )
+    if returncode:
+        raise RuntimeError(f"{' '.join(args)} failed")
+    return seconds, peak
+
+
+def streamed(catalog, out, workers):
+    return measure([
+        "score_catalog.py", catalog, "--top", str(TOP_K), "--out", out,
+        "--workers", str(workers)
+    ])
+
+
+def main(rows, baseline_rows, workers):
+    pipeline = joblib.load(MODEL_PATH)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        small = os.path.join(tmp, "small.parquet")
+        write_catalog(small, baseline_rows, pipeline)
+
+        # ---- Parity on the smaller catalog ----
+        mem_out = os.path.join(tmp, "in_memory.parquet")
+        stream_out = os.path.join(tmp, "streamed.parquet")
+        results = [
+            (f"in memory + sort, {baseline_rows:,}", measure(
+                ["-c", IN_MEMORY, small, mem_out, str(TOP_K)]
+            )),
+            (f"score_catalog,    {baseline_rows:,}", streamed(small, stream_out, workers)),
+        ]
+
+        expected = pd.read_parquet(mem_out)
+        got = pd.read_parquet(stream_out)
+        same_ids = (expected["planet_id"].to_numpy() == got["planet_id"].to_numpy()).all()
+        diff = (expected["habitability_score"] - got["habitability_score"]).abs().max()
+        print(f"Top {TOP_K} parity: same planets in order = {same_ids}, "
+              f"max |score diff| = {diff:.1e}")
+        assert same_ids and diff == 0.0, "streamed top K differs from the full sort"
+
+        # ---- Full size, streamed only ----
+        if rows > baseline_rows:
+            large = os.path.join(tmp, "large.parquet")
+            start = time.perf_counter()
+            write_catalog(large, rows, pipeline)
+            print(f"Wrote {rows:,} synthetic planets in {time.perf_counter() - start:.0f}s "
+                  f"({os.path.getsize(large) / 2**20:.0f} MB Parquet)")
+            results.append((f"score_catalog,    {rows:,}", streamed(large, stream_out, workers)))
+
+    print(f"\n{'':36s}{'seconds':>10s}{'rows/s':>12s}{'peak RSS':>12s}")
+    for label, (seconds, peak) in results:
+        n = int(label.rsplit(" ", 1)[1].replace(",", ""))
+        print(f"{label:36s}{seconds:10.1f}{n / seconds:12,.0f}{peak:9.0f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--baseline-rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    main(args.rows, args.baseline_rows, args.workers)
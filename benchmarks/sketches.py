@@ -0,0 +1,138 @@
+"""
+Accuracy of the streaming-sketch statistics (habitability/sketches.py)
+against exact pandas / NumPy ones on the bundled datasets, and the cost
+of fitting CleaningTransformer both ways on a scaled-up catalog.
+
+Every table is sketched in small chunks that are merged afterwards, as a
+catalog too large for memory would be. Errors are reported as rank error
+(how far the sketch's median is from the 50th percentile of the exact
+data) and relative to each column's IQR (how much a capping bound moves).
+
+Usage:
+    python -m benchmarks.sketches [--chunk-rows 500] [--rows 2000000] [--workers 2]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from habitability.cleaning import CleaningTransformer
+from habitability.sketches import HEAVY_HITTERS, QUANTILE_K, sketch_table
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASETS = [
+    os.path.join(ROOT_DIR, "modules", "data", "raw", "Exopl-habit.csv"),
+    os.path.join(ROOT_DIR, "modules", "data", "scrap", "Exoplanet_dataset.csv"),
+]
+
+# Worst acceptable rank error of a median (the sketch promises ~2/k)
+RANK_TOLERANCE = 4 / QUANTILE_K
+
+
+def chunked(df, rows):
+    for start in range(0, len(df), rows):
+        yield df.iloc[start:start + rows]
+
+
+def rank_error(values, estimate, q):
+    """Distance from q to the exact rank range of `estimate` in `values`."""
+    values = np.sort(values[~np.isnan(values)])
+    lo = np.searchsorted(values, estimate, side="left") / len(values)
+    hi = np.searchsorted(values, estimate, side="right") / len(values)
+    return max(0.0, lo - q, q - hi)
+
+
+def bounds_error(df, exact, approx):
+    """Largest shift of a capping bound, as a fraction of the IQR of the
+    values seen (the imputed IQR is 0 for columns mostly missing)."""
+    q1, q3 = np.nanquantile(df[exact.numeric].to_numpy(dtype=np.float64), [0.25, 0.75], axis=0)
+    shift = np.maximum(np.abs(exact.lower - approx.lower), np.abs(exact.upper - approx.upper))
+    return np.nanmax(shift / np.where(q3 > q1, q3 - q1, np.nan))
+
+
+def bundled(chunk_rows):
+    print(f"Bundled datasets, sketched in {chunk_rows}-row chunks and merged "
+          f"(k={QUANTILE_K})\n")
+    print(f"{'dataset':28s}{'column':24s}{'exact':>12s}{'sketch':>12s}{'rank err':>10s}")
+
+    worst = 0.0
+    for path in DATASETS:
+        df = pd.read_csv(path, low_memory=False)
+        exact = CleaningTransformer().fit(df)
+        approx = CleaningTransformer().fit_chunks(chunked(df, chunk_rows), workers=1)
+
+        name = os.path.basename(path)
+        for i, col in enumerate(exact.numeric):
+            err = rank_error(df[col].to_numpy(dtype=np.float64), approx.medians[i], 0.5)
+            worst = max(worst, err)
+            print(f"{name:28s}{col[:23]:24s}{exact.medians[i]:12.4g}"
+                  f"{approx.medians[i]:12.4g}{err:10.2%}")
+            name = ""
+
+        # Identifier-like columns (every value unique) have no heavy hitter
+        tracked = [c for c in exact.categorical if df[c].nunique() <= HEAVY_HITTERS]
+        for col in exact.categorical:
+            mode = "(unique)" if col not in tracked else approx.modes[col]
+            print(f"{name:28s}{col[:23]:24s}{str(exact.modes[col])[:11]:>12s}"
+                  f"{str(mode)[:11]:>12s}{'(mode)':>10s}")
+        print(f"{name:28s}{'max IQR-bound shift':24s}"
+              f"{bounds_error(df, exact, approx):22.2%} of IQR\n")
+        assert all(exact.modes[c] == approx.modes[c] for c in tracked), \
+            "heavy-hitter modes differ from Series.mode"
+
+    print(f"Worst median rank error: {worst:.2%} (tolerance {RANK_TOLERANCE:.2%})")
+    assert worst <= RANK_TOLERANCE, "sketch medians outside the error bound"
+
+
+def scaled(rows, chunk_rows, workers):
+    """Bundled numeric columns resampled (with jitter) to `rows` rows."""
+    rng = np.random.default_rng(0)
+    base = pd.read_csv(DATASETS[1], low_memory=False)
+    numeric = base.select_dtypes(include="float64")
+    picks = rng.integers(len(base), size=rows)
+    df = pd.DataFrame({
+        col: values[picks] * rng.lognormal(0, 0.05, rows)
+        for col, values in numeric.items() for values in [values.to_numpy()]
+    })
+    df["DiscoveryMethod"] = base["DiscoveryMethod"].to_numpy()[picks]
+
+    start = time.perf_counter()
+    exact = CleaningTransformer().fit(df)
+    exact_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    approx = CleaningTransformer().fit_chunks(chunked(df, chunk_rows), workers=workers)
+    sketch_seconds = time.perf_counter() - start
+
+    sketch = sketch_table(chunked(df, chunk_rows), exact.numeric, exact.categorical, workers=1)
+    retained = sum(q.size for q in sketch.quantiles.values()) * 8
+    worst = max(
+        rank_error(df[col].to_numpy(), approx.medians[i], 0.5)
+        for i, col in enumerate(exact.numeric)
+    )
+
+    print(f"\n{rows:,} rows x {len(exact.numeric)} numeric columns, "
+          f"{chunk_rows:,}-row chunks, {workers} worker(s)")
+    print(f"  exact fit (whole table)  : {exact_seconds:6.2f}s, needs "
+          f"{df[exact.numeric].memory_usage().sum() / 2**20:,.0f} MB resident")
+    print(f"  sketch fit (chunked)     : {sketch_seconds:6.2f}s, keeps "
+          f"{retained / 2**10:,.0f} KB of sketches")
+    print(f"  worst median rank error  : {worst:.3%}")
+    print(f"  max IQR-bound shift      : {bounds_error(df, exact, approx):.3%} of IQR")
+    print(f"  modes identical          : {exact.modes == approx.modes}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunk-rows", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=2_000_000,
+                        help="scaled-up catalog size (0 skips it)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    bundled(args.chunk_rows)
+    if args.rows:
+        scaled(args.rows, 100_000, args.workers)
@@ -0,0 +1,127 @@
+"""
+Bit-for-bit agreement and latency of the exported NumPy tree evaluator
+against the original xgboost pickles in backend/model, and of what the
+backend serves (load_model: trees up to TREES_MAX_ROWS rows, xgboost
+above), including rescore.py's 5,000-row chunks.
+
+Usage:
+    python -m benchmarks.tree_model [--rows 20000]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from habitability.tree_model import TREES_MAX_ROWS, export_booster, load_model, TreeEnsemble
+
+MODELS_DIR = os.path.join("backend", "model")
+MODELS = ["xgboost_classifier.pkl", "xgboost_reg.pkl"]
+
+FEATURES = [
+    "st_teff", "st_rad", "st_mass", "st_met",
+    "st_luminosity", "pl_orbper", "pl_orbeccen", "pl_insol"
+]
+
+
+def synthetic_planets(n, seed=42):
+    """Log-uniform-ish inputs covering the split ranges, with gaps."""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "st_teff": rng.uniform(2500, 10000, n),
+        "st_rad": rng.lognormal(0, 0.6, n),
+        "st_mass": rng.lognormal(0, 0.4, n),
+        "st_met": rng.normal(0, 0.3, n),
+        "st_luminosity": rng.normal(0, 1, n),
+        "pl_orbper": rng.lognormal(3, 2, n),
+        "pl_orbeccen": rng.beta(1, 5, n),
+        "pl_insol": rng.lognormal(2, 3, n)
+    })
+    X = X.mask(rng.random(X.shape) < 0.05)
+    return X[FEATURES]
+
+
+def best_time(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def cold_start(statement):
+    """Seconds for a fresh interpreter to import and load a model."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-W", "ignore", "-c", statement], check=True)
+    return time.perf_counter() - start
+
+
+def main(rows):
+    X = synthetic_planets(rows)
+    ok = True
+
+    for name in MODELS:
+        path = os.path.join(MODELS_DIR, name)
+        model = joblib.load(path)
+        trees = TreeEnsemble(export_booster(model))
+        served = load_model(path)
+
+        # ---- Agreement ----
+        expected_margin = model.predict(X, output_margin=True)
+        expected = model.predict_proba(X)
+        got_margin = trees.predict_margin(X)
+        got = trees.predict_proba(X)
+
+        margin_equal = np.array_equal(expected_margin, got_margin)
+        proba_equal = np.array_equal(expected, got)
+        ok &= margin_equal and proba_equal
+
+        print(f"\n{name}")
+        print(f"  margins identical      : {margin_equal} "
+              f"(max |diff| {np.max(np.abs(expected_margin - got_margin)):.1e})")
+        print(f"  probabilities identical: {proba_equal} "
+              f"(max |diff| {np.max(np.abs(expected - got)):.1e})")
+
+        served_equal = np.array_equal(expected, served.predict_proba(X))
+        ok &= served_equal
+        print(f"  served model identical : {served_equal} ({type(served).__name__})")
+
+        # ---- Latency ----
+        print(f"  {'':14s}{'xgboost':>12s}{'numpy':>12s}{'served':>12s}")
+        # X.head() clamps to the rows generated: no repeated sizes
+        for n in sorted({min(n, rows) for n in (1, TREES_MAX_ROWS, 100, 5_000, 20_000)} | {rows}):
+            batch = X.head(n)
+            repeat = 50 if n <= 100 else 3
+            xgb_t = best_time(lambda: model.predict_proba(batch), repeat)
+            np_t = best_time(lambda: trees.predict_proba(batch), repeat)
+            served_t = best_time(lambda: served.predict_proba(batch), repeat)
+            print(f"  {f'{len(batch)} rows':14s}{xgb_t * 1e3:10.2f}ms{np_t * 1e3:10.2f}ms"
+                  f"{served_t * 1e3:10.2f}ms")
+
+    # ---- Cold start ----
+    path = os.path.join(MODELS_DIR, MODELS[0])
+    xgb_cold = cold_start(f"import joblib; joblib.load({path!r})")
+    np_cold = cold_start(
+        "from habitability.tree_model import load_trees; "
+        f"load_trees({path!r})"
+    )
+    served_cold = cold_start(
+        "from habitability.tree_model import load_model; "
+        f"load_model({path!r})"
+    )
+    print(f"\nCold start (import + load): xgboost {xgb_cold:.2f}s, "
+          f"numpy {np_cold:.2f}s, served {served_cold:.2f}s")
+
+    assert ok, "exported trees disagree with xgboost"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    main(parser.parse_args().rows)
@@ -0,0 +1,3 @@
+"""
+Shared library code for the habitability apps, pipeline and tools.
+"""
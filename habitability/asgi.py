@@ -0,0 +1,190 @@
+"""
+Minimal ASGI front for the Flask apps, without extra dependencies.
+
+AsgiApp serves a few routes with async handlers (the micro-batched
+/predict) and passes every other request to the existing Flask app
+through a WSGI bridge that runs it on a thread pool, so all Flask routes,
+hooks and /metrics keep working unchanged:
+
+    app = AsgiApp(flask_app, {("POST", "/predict"): predict}, batchers=[batcher])
+
+    uvicorn asgi:app --workers 4
+
+A handler takes a Request and returns (status, body dict, headers).
+Its phases (parse, predict, serialize, ...) go into the same /metrics
+store as the Flask routes'. Batchers are started on lifespan startup (or
+on first use) and stopped on shutdown.
+"""
+
+import asyncio
+import json
+import sys
+import time
+import traceback
+from io import BytesIO
+
+from habitability.metrics import ENABLED, phase
+
+JSON_HEADERS = [(b"content-type", b"application/json")]
+
+
+class Request:
+    __slots__ = ("method", "path", "headers", "body", "timings")
+
+    def __init__(self, scope, body):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        self.body = body
+        self.timings = {}
+
+    def json(self):
+        return json.loads(self.body or b"null")
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+# -------------------------------
+# WSGI bridge
+# -------------------------------
+
+def wsgi_environ(scope, body):
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        # PEP 3333: the raw bytes, decoded as latin-1
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": str(client[0]),
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+        elif name != "CONTENT_LENGTH":
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def call_wsgi(wsgi_app, scope, body, send):
+    """Run a WSGI app on the default executor and stream its response."""
+    loop = asyncio.get_running_loop()
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = [
+            (k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers
+        ]
+
+    def first_chunk():
+        result = wsgi_app(wsgi_environ(scope, body), start_response)
+        iterator = iter(result)
+        return result, iterator, next(iterator, None)
+
+    result, iterator, chunk = await loop.run_in_executor(None, first_chunk)
+    try:
+        await send({"type": "http.response.start", "status": started["status"],
+                    "headers": started["headers"]})
+        # Streamed bodies (CSV / NDJSON exports) are pulled chunk by chunk
+        while chunk is not None:
+            if chunk:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            chunk = await loop.run_in_executor(None, next, iterator, None)
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        if hasattr(result, "close"):
+            await loop.run_in_executor(None, result.close)
+
+# -------------------------------
+# App
+# -------------------------------
+
+class AsgiApp:
+    def __init__(self, wsgi_app, routes, batchers=(), metrics=None):
+        self.wsgi_app = wsgi_app
+        self.routes = routes
+        self.batchers = list(batchers)
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+        if scope["type"] != "http":
+            raise ValueError(f"Unsupported ASGI scope: {scope['type']}")
+
+        body = await read_body(receive)
+        handler = self.routes.get((scope["method"], scope["path"]))
+        if handler is None:
+            return await call_wsgi(self.wsgi_app, scope, body, send)
+
+        start = time.perf_counter()
+        request = Request(scope, body)
+        try:
+            status, data, headers = await handler(request)
+        except Exception:
+            # Still answer the client; the traceback goes to the server log
+            traceback.print_exc()
+            status, data, headers = 500, {"error": "Internal server error"}, {}
+
+        with phase("serialize", request.timings):
+            payload = json.dumps(data).encode()
+
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": JSON_HEADERS + [
+                (k.lower().encode("latin-1"), str(v).encode("latin-1"))
+                for k, v in headers.items()
+            ],
+        })
+        await send({"type": "http.response.body", "body": payload})
+        self._record(request, status, time.perf_counter() - start)
+
+    def _record(self, request, status, total):
+        if self.metrics is None or not ENABLED:
+            return
+        timings = request.timings
+        timings["other"] = max(total - sum(timings.values()), 0.0)
+        timings["total"] = total
+        self.metrics.observe(request.path, request.method, timings)
+        self.metrics.inc("requests_total", route=request.path,
+                         method=request.method, status=status)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                for batcher in self.batchers:
+                    batcher.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                for batcher in self.batchers:
+                    await batcher.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
@@ -0,0 +1,156 @@
+"""
+Dynamic micro-batching of concurrent single-row predictions.
+
+Each /predict request submits its row to a MicroBatcher and awaits the
+result. One worker task takes the first queued row, keeps collecting for
+up to max_wait_ms or until max_batch rows are in hand, scores them all
+with one vectorized call on a dedicated thread, and resolves every
+request's future with its own result. While a batch is being scored new
+requests queue up, so batches grow with load and a lone request waits at
+most max_wait_ms.
+
+    batcher = MicroBatcher(score_batch, max_batch=64, max_wait_ms=2)
+    result = await batcher.submit(row)
+
+score_batch(rows) takes the list of submitted rows and returns one result
+per row, in order. If it raises on a batch, each row of that batch is
+scored on its own, so only the requests whose rows fail get the exception.
+
+Environment:
+    PREDICT_MAX_BATCH=64      rows per vectorized call
+    PREDICT_MAX_WAIT_MS=2     how long the first row waits for company; 0
+                              batches only what queued up while the previous
+                              batch was being scored (lowest latency)
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from habitability.metrics import SIZE_BOUNDS
+
+MAX_BATCH = int(os.environ.get("PREDICT_MAX_BATCH", 64))
+MAX_WAIT_MS = float(os.environ.get("PREDICT_MAX_WAIT_MS", 2))
+
+
+class MicroBatcher:
+    def __init__(self, score_batch, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS,
+                 metrics=None, name="predict"):
+        self.score_batch = score_batch
+        self.max_batch = max(int(max_batch), 1)
+        self.max_wait = max(float(max_wait_ms), 0.0) / 1000
+        self.metrics = metrics
+        self.name = name
+
+        self._queue = None
+        self._task = None
+        self._executor = None
+
+    # ---------------- lifecycle ---------------- #
+
+    def start(self):
+        """Start the worker on the running event loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._executor = ThreadPoolExecutor(1, thread_name_prefix=f"{self.name}-batch")
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._executor.shutdown(wait=False)
+
+        # Fail whatever was still waiting instead of hanging the requests
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+
+    async def submit(self, row):
+        """Queue one row and wait for its result."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future, time.perf_counter()))
+        return await future
+
+    # ---------------- worker ---------------- #
+
+    async def _collect(self):
+        """First queued item plus whatever arrives within max_wait."""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            # Take everything already queued without yielding
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            if len(batch) >= self.max_batch:
+                break
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Requests that gave up (client went away) are not scored
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+
+            rows = [row for row, _, _ in batch]
+            start = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self._executor, self.score_batch, rows)
+            except Exception as e:
+                if len(batch) == 1:
+                    self._resolve(batch[0][1], exception=e)
+                else:
+                    # One bad row must not fail the others: score each alone
+                    for row, future, _ in batch:
+                        try:
+                            result, = await loop.run_in_executor(
+                                self._executor, self.score_batch, [row])
+                        except Exception as row_error:
+                            self._resolve(future, exception=row_error)
+                        else:
+                            self._resolve(future, result)
+                continue
+            finally:
+                self._record(batch, start, time.perf_counter())
+
+            for (_, future, _), result in zip(batch, results):
+                self._resolve(future, result)
+
+    @staticmethod
+    def _resolve(future, result=None, exception=None):
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def _record(self, batch, start, end):
+        if self.metrics is None:
+            return
+        self.metrics.summary("batch_size", len(batch), SIZE_BOUNDS, batcher=self.name)
+        self.metrics.summary("batch_seconds", end - start, batcher=self.name)
+        for _, _, queued in batch:
+            self.metrics.summary("batch_queue_seconds", start - queued, batcher=self.name)
+        self.metrics.inc("batched_rows_total", len(batch), batcher=self.name)
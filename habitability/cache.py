@@ -0,0 +1,120 @@
+"""
+Bounded LRU + TTL cache of single-planet predictions.
+
+The same planet is often submitted to /predict again (the frontend, scripts),
+and the root app fills missing fields with fixed defaults, so many requests
+reduce to the same feature vector. Results are cached under
+
+    (model version, canonical feature tuple)
+
+where the canonical tuple has every numeric value rounded to SIGNIFICANT
+digits, None / NaN folded to None and strings kept as they are. A new model version never sees the
+old entries, and the apps also clear the cache when the registry swaps
+models, so stale versions do not take up room.
+
+Entries are evicted least recently used first once there are more than
+`maxsize`, and are dropped when read after `ttl` seconds. Hits, misses
+and evictions are counted on /metrics once attach()ed.
+
+Environment:
+    PREDICT_CACHE_SIZE=4096   entries per process (0 disables the cache)
+    PREDICT_CACHE_TTL=300     seconds an entry stays valid (0 = no expiry)
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_SIZE = int(os.environ.get("PREDICT_CACHE_SIZE", 4096))
+CACHE_TTL = float(os.environ.get("PREDICT_CACHE_TTL", 300))
+
+# Inputs equal to this many significant digits share an entry
+SIGNIFICANT = 6
+
+
+def canonical(value):
+    """Hashable, rounded form of one feature value."""
+    if value is None or isinstance(value, str):
+        # Categories are matched exactly by the models
+        return value
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    if math.isnan(value):
+        return None
+    # +0.0 for -0.0 too, so both share an entry
+    return float(f"{value:.{SIGNIFICANT}g}") + 0.0
+
+
+class PredictionCache:
+    """Thread-safe LRU of predictions with a per-entry time to live."""
+
+    def __init__(self, features, maxsize=CACHE_SIZE, ttl=CACHE_TTL, name="predict"):
+        self.features = list(features)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+
+        self.metrics = None
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()   # key -> (expires, value)
+        self._lock = threading.Lock()
+
+    def key(self, record, version):
+        """Cache key of a feature dict (missing features count as None)."""
+        return version, tuple(canonical(record.get(f)) for f in self.features)
+
+    def get(self, key):
+        """The cached value, or None on a miss."""
+        if not self.maxsize:
+            return None
+
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and self.ttl and item[0] <= time.monotonic():
+                del self._items[key]
+                self._count("evictions_total", reason="ttl")
+                item = None
+
+            if item is None:
+                self.misses += 1
+                self._count("misses_total")
+                return None
+
+            self._items.move_to_end(key)
+            self.hits += 1
+            self._count("hits_total")
+            return item[1]
+
+    def put(self, key, value):
+        if not self.maxsize:
+            return
+
+        expires = time.monotonic() + self.ttl if self.ttl else math.inf
+        with self._lock:
+            self._items[key] = (expires, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                self._count("evictions_total", reason="size")
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+    # ---------------- reporting ---------------- #
+
+    def attach(self, metrics):
+        """Count hits, misses and evictions on /metrics."""
+        self.metrics = metrics
+
+    def _count(self, name, **labels):
+        if self.metrics is not None:
+            self.metrics.inc(f"prediction_cache_{name}", cache=self.name, **labels)
@@ -0,0 +1,302 @@
+"""
+Compile the fitted habitability pipeline into a flat NumPy scorer.
+
+model/habitability_model.pkl is a Pipeline of a ColumnTransformer
+(median/mode imputation, StandardScaler, OneHotEncoder) and a binary
+LogisticRegression. Every step is affine, so the whole thing folds into:
+
+    logit = intercept + fill(x_num, medians) @ weights
+            + sum(table[col][category] for col in categorical)
+
+The compiled artifact is a plain dict of arrays saved with joblib, so
+loading it needs neither sklearn nor pandas dtype inference.
+
+A tuned decision threshold (module4 --search) is stored beside the
+pipeline in model/habitability_threshold.json, tagged with the
+pipeline's hash so a later retrain cannot pick up a stale value.
+
+Usage:
+    python -m habitability.compiled_model        # writes the artifact
+"""
+
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+MODEL_PATH = os.path.join("model", "habitability_model.pkl")
+COMPILED_PATH = os.path.join("model", "habitability_model_compiled.pkl")
+THRESHOLD_PATH = os.path.join("model", "habitability_threshold.json")
+
+ARTIFACT_FORMAT = 1
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+# -------------------------------
+# Compiler
+# -------------------------------
+
+def _step(pipeline, kind):
+    """Return the single step of the given class name (or None)."""
+    steps = [s for _, s in pipeline.steps if type(s).__name__ == kind]
+    if len(steps) > 1:
+        raise ValueError(f"More than one {kind} step is not supported")
+    return steps[0] if steps else None
+
+
+def _check_steps(pipeline, allowed):
+    for name, step in pipeline.steps:
+        if type(step).__name__ not in allowed:
+            raise ValueError(
+                f"Cannot compile step '{name}' ({type(step).__name__})"
+            )
+
+
+def compile_pipeline(pipeline):
+    """Fold a fitted preprocessing + LogisticRegression pipeline into arrays."""
+    preprocessor = pipeline.steps[0][1]
+    classifier = pipeline.steps[-1][1]
+
+    if type(classifier).__name__ != "LogisticRegression":
+        raise ValueError("Only LogisticRegression classifiers can be compiled")
+    if classifier.coef_.shape[0] != 1:
+        raise ValueError("Only binary classifiers can be compiled")
+    if preprocessor.remainder != "drop":
+        raise ValueError("ColumnTransformer remainder must be 'drop'")
+
+    coef = classifier.coef_[0].astype(np.float64)
+    intercept = float(classifier.intercept_[0])
+
+    numeric_features, medians, weights = [], [], []
+    categorical = {}
+
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == "drop" or name == "remainder":
+            continue
+
+        columns = list(columns)
+        w = coef[preprocessor.output_indices_[name]]
+        encoder = _step(transformer, "OneHotEncoder")
+
+        if encoder is None:
+            # Numeric branch: impute -> scale, folded into the weights
+            _check_steps(transformer, {"SimpleImputer", "StandardScaler"})
+            imputer = _step(transformer, "SimpleImputer")
+            scaler = _step(transformer, "StandardScaler")
+
+            fill = (
+                imputer.statistics_.astype(np.float64)
+                if imputer is not None else np.zeros(len(columns))
+            )
+            # mean_ is fitted even with with_mean=False, but not subtracted
+            centred = scaler is not None and scaler.with_mean
+            mean = scaler.mean_ if centred else np.zeros(len(columns))
+            scale = getattr(scaler, "scale_", None)
+            scale = np.ones(len(columns)) if scale is None else scale
+
+            folded = w / scale
+            intercept -= float(np.dot(folded, mean))
+
+            numeric_features += columns
+            medians.append(fill)
+            weights.append(folded)
+        else:
+            # Categorical branch: impute -> one-hot, folded into lookups
+            _check_steps(transformer, {"SimpleImputer", "OneHotEncoder"})
+            if encoder.drop is not None:
+                raise ValueError("OneHotEncoder(drop=...) is not supported")
+            if getattr(encoder, "infrequent_categories_", None) is not None:
+                raise ValueError("Infrequent categories are not supported")
+
+            imputer = _step(transformer, "SimpleImputer")
+            offset = 0
+            for i, col in enumerate(columns):
+                cats = np.asarray(encoder.categories_[i], dtype=object)
+                table = w[offset:offset + len(cats)].astype(np.float64)
+                offset += len(cats)
+
+                fill = imputer.statistics_[i] if imputer is not None else None
+                idx = np.flatnonzero(cats == fill)
+                categorical[col] = {
+                    "categories": cats,
+                    # Unknown categories one-hot to all zeros
+                    "weights": np.append(table, 0.0),
+                    "missing_weight": float(table[idx[0]]) if len(idx) else 0.0
+                }
+
+    return {
+        "format": ARTIFACT_FORMAT,
+        "numeric_features": numeric_features,
+        "medians": np.concatenate(medians) if medians else np.zeros(0),
+        "weights": np.concatenate(weights) if weights else np.zeros(0),
+        "intercept": intercept,
+        "categorical": categorical
+    }
+
+# -------------------------------
+# Scorer
+# -------------------------------
+
+class CompiledModel:
+    """Drop-in replacement for the pipeline's predict_proba."""
+
+    def __init__(self, artifact):
+        if artifact.get("format") != ARTIFACT_FORMAT:
+            raise ValueError("Unsupported compiled model format")
+
+        self.artifact = artifact
+        self.numeric_features = list(artifact["numeric_features"])
+        self.categorical_features = list(artifact["categorical"])
+        self.feature_names_in_ = np.array(
+            self.numeric_features + self.categorical_features, dtype=object
+        )
+        self.medians = np.asarray(artifact["medians"], dtype=np.float64)
+        self.weights = np.asarray(artifact["weights"], dtype=np.float64)
+        self.intercept = float(artifact["intercept"])
+
+        # Per-column category -> weight, both for arrays and single rows
+        self._codes = {}
+        self._lookup = {}
+        for col, spec in artifact["categorical"].items():
+            cats = list(spec["categories"])
+            self._codes[col] = pd.Index(cats)
+            self._lookup[col] = dict(zip(cats, spec["weights"][:-1]))
+
+    def decision_function(self, X):
+        X_num = np.array(
+            X[self.numeric_features], dtype=np.float64, copy=True
+        )
+        nan = np.isnan(X_num)
+        if nan.any():
+            X_num[nan] = np.broadcast_to(self.medians, X_num.shape)[nan]
+
+        logit = X_num @ self.weights
+        logit += self.intercept
+
+        for col, spec in self.artifact["categorical"].items():
+            values = pd.Series(X[col], copy=False)
+            codes = self._codes[col].get_indexer(values)
+            # get_indexer returns -1 for unknowns: the trailing zero weight
+            contrib = spec["weights"][codes]
+            missing = values.isna().to_numpy()
+            if missing.any():
+                contrib[missing] = spec["missing_weight"]
+            logit += contrib
+
+        return logit
+
+    def predict_proba(self, X):
+        p = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - p, p])
+
+    def score_record(self, record):
+        """Probability of habitability for one dict, without building a frame."""
+        x = np.array(
+            [record.get(f, np.nan) for f in self.numeric_features],
+            dtype=np.float64
+        )
+        nan = np.isnan(x)
+        x[nan] = self.medians[nan]
+        logit = self.intercept + float(x @ self.weights)
+
+        for col, spec in self.artifact["categorical"].items():
+            value = record.get(col)
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                logit += spec["missing_weight"]
+            else:
+                logit += self._lookup[col].get(value, 0.0)
+
+        return 1.0 / (1.0 + np.exp(-logit))
+
+    def score_records(self, records):
+        """score_record for a list of dicts in one vectorized pass (micro-batches)."""
+        X_num = np.array(
+            [[r.get(f, np.nan) for f in self.numeric_features] for r in records],
+            dtype=np.float64
+        ).reshape(len(records), len(self.numeric_features))
+        nan = np.isnan(X_num)
+        if nan.any():
+            X_num[nan] = np.broadcast_to(self.medians, X_num.shape)[nan]
+
+        logit = X_num @ self.weights
+        logit += self.intercept
+
+        for col, spec in self.artifact["categorical"].items():
+            lookup = self._lookup[col]
+            missing = spec["missing_weight"]
+            logit += [
+                missing
+                if value is None or (isinstance(value, float) and np.isnan(value))
+                else lookup.get(value, 0.0)
+                for value in (r.get(col) for r in records)
+            ]
+
+        return 1.0 / (1.0 + np.exp(-logit))
+
+# -------------------------------
+# Loading
+# -------------------------------
+
+def save_compiled(pipeline_path=MODEL_PATH, compiled_path=COMPILED_PATH):
+    artifact = compile_pipeline(joblib.load(pipeline_path))
+    artifact["source_sha256"] = file_sha256(pipeline_path)
+    joblib.dump(artifact, compiled_path)
+    return artifact
+
+
+def load_compiled(pipeline_path=MODEL_PATH, compiled_path=COMPILED_PATH, mmap_mode=None):
+    """Load the compiled artifact, recompiling if it is missing or stale."""
+    if os.path.exists(compiled_path):
+        artifact = joblib.load(compiled_path, mmap_mode=mmap_mode)
+        if (
+            not os.path.exists(pipeline_path)
+            or artifact.get("source_sha256") == file_sha256(pipeline_path)
+        ):
+            return CompiledModel(artifact)
+
+    artifact = compile_pipeline(joblib.load(pipeline_path))
+    artifact["source_sha256"] = file_sha256(pipeline_path)
+    return CompiledModel(artifact)
+
+
+def save_threshold(threshold, pipeline_path=MODEL_PATH, path=THRESHOLD_PATH, **info):
+    """Record the decision threshold for the pipeline (None = not tuned)."""
+    data = {
+        "threshold": threshold,
+        "source_sha256": file_sha256(pipeline_path),
+        **info,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+    return data
+
+
+def load_threshold(default, pipeline_path=MODEL_PATH, path=THRESHOLD_PATH):
+    """Tuned threshold for the current pipeline, else `default`."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+    if data.get("threshold") is None:
+        return default
+    if os.path.exists(pipeline_path) and data.get("source_sha256") != file_sha256(pipeline_path):
+        return default
+    return float(data["threshold"])
+
+
+if __name__ == "__main__":
+    artifact = save_compiled()
+    print(f"✅ Compiled {len(artifact['numeric_features'])} numeric and "
+          f"{len(artifact['categorical'])} categorical features "
+          f"to {COMPILED_PATH}")
@@ -0,0 +1,189 @@
+"""
+Versioned, cached plots for the root app's analytics dashboard.
+
+Plots are keyed by a data version (row count + max id of `exoplanets`),
+so unchanged data is served from disk without redrawing. Each version
+is rendered by a single background worker into a temporary directory
+that is renamed into place, so readers never see half-written images
+and concurrent requests for the same version share one render.
+
+Layout under the plot root (static/plots):
+    <count>-<max_id>/score_distribution.png
+    <count>-<max_id>/top_planets.png
+    <count>-<max_id>/correlation_heatmap.png
+    LATEST            newest finished version
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+
+import seaborn as sns
+from matplotlib.figure import Figure
+
+DATA_VERSION_QUERY = "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM exoplanets"
+
+PLOT_FILES = (
+    "score_distribution.png",
+    "top_planets.png",
+    "correlation_heatmap.png",
+)
+
+# Older versions are pruned after each render
+KEEP_VERSIONS = 3
+
+
+def data_version(con):
+    """Cheap change marker for the exoplanets table, e.g. '42-57'."""
+    count, max_id = con.execute(DATA_VERSION_QUERY).fetchone()
+    return f"{count}-{max_id}"
+
+
+def render_plots(df, out_dir):
+    """Draw the three dashboard figures from `df` into `out_dir`.
+
+    Uses Figure objects instead of pyplot so no global figure state is
+    shared between threads.
+    """
+    # =============================
+    # 1️⃣ Habitability Score Distribution
+    # =============================
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    sns.histplot(df["habitability_score"], bins=10, kde=True, ax=ax)
+    ax.set_title("Habitability Score Distribution")
+    ax.set_xlabel("Habitability Score")
+    ax.set_ylabel("Number of Planets")
+    fig.tight_layout()
+    fig.savefig(os.path.join(out_dir, "score_distribution.png"))
+
+    # =============================
+    # 2️⃣ Top 10 Habitable Planets
+    # =============================
+    top = df.nlargest(10, "habitability_score")
+
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    sns.barplot(x=top["habitability_score"], y=top["planet_name"], ax=ax)
+    ax.set_title("Top 10 Habitable Exoplanets")
+    ax.set_xlabel("Habitability Score")
+    ax.set_ylabel("Planet Name")
+    fig.tight_layout()
+    fig.savefig(os.path.join(out_dir, "top_planets.png"))
+
+    # =============================
+    # 3️⃣ Correlation Heatmap
+    # =============================
+    corr = df.drop(columns=["id", "planet_name"]).corr(numeric_only=True)
+
+    fig = Figure(figsize=(10, 7))
+    ax = fig.subplots()
+    sns.heatmap(corr, cmap="coolwarm", linewidths=0.5, ax=ax)
+    ax.set_title("Star–Planet Parameter Correlation with Habitability")
+    fig.tight_layout()
+    fig.savefig(os.path.join(out_dir, "correlation_heatmap.png"))
+
+
+class PlotCache:
+    """Renders plot versions in the background and tracks the latest."""
+
+    def __init__(self, root, keep=KEEP_VERSIONS):
+        self.root = root
+        self.keep = keep
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="dashboard-plots"
+        )
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def path(self, version):
+        return os.path.join(self.root, version)
+
+    def is_ready(self, version):
+        folder = self.path(version)
+        return all(os.path.exists(os.path.join(folder, f)) for f in PLOT_FILES)
+
+    def latest(self):
+        """Newest finished version, or None before the first render."""
+        try:
+            with open(os.path.join(self.root, "LATEST")) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return version if version and self.is_ready(version) else None
+
+    def files(self, version):
+        """Plot paths relative to the plot root, keyed by plot name."""
+        return {
+            os.path.splitext(f)[0]: f"{version}/{f}" for f in PLOT_FILES
+        }
+
+    def submit(self, version, load_frame):
+        """Queue a render of `version` unless one is already running.
+
+        `load_frame` is called on the worker and returns the DataFrame to
+        plot. Returns (future, started).
+        """
+        with self._lock:
+            future = self._pending.get(version)
+            if future is not None:
+                return future, False
+
+            future = self._executor.submit(self._build, version, load_frame)
+            self._pending[version] = future
+
+        future.add_done_callback(lambda f: self._finish(version, f))
+        return future, True
+
+    def _finish(self, version, future):
+        with self._lock:
+            self._pending.pop(version, None)
+
+        if future.exception() is not None:
+            print(f"⚠️ Dashboard plots {version} failed: {future.exception()}")
+
+    def _build(self, version, load_frame):
+        if self.is_ready(version):
+            return version
+
+        df = load_frame()
+        os.makedirs(self.root, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=f".{version}-", dir=self.root)
+        os.chmod(tmp, 0o755)
+
+        try:
+            render_plots(df, tmp)
+            try:
+                os.replace(tmp, self.path(version))
+            except OSError:
+                # Another process finished the same version first
+                if not self.is_ready(version):
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        self._write_latest(version)
+        self._prune(version)
+        return version
+
+    def _write_latest(self, version):
+        tmp = os.path.join(self.root, f".LATEST-{os.getpid()}")
+        with open(tmp, "w") as f:
+            f.write(version)
+        os.replace(tmp, os.path.join(self.root, "LATEST"))
+
+    def _prune(self, current):
+        versions = [
+            d for d in os.listdir(self.root)
+            if not d.startswith(".") and os.path.isdir(self.path(d))
+        ]
+        versions.sort(key=lambda d: os.path.getmtime(self.path(d)), reverse=True)
+
+        for old in versions[self.keep:]:
+            if old != current:
+                shutil.rmtree(self.path(old), ignore_errors=True)
@@ -0,0 +1,140 @@
+"""
+In-memory PDF / Excel ranking exports for the root app.
+
+Documents are rendered into BytesIO buffers (no shared files on disk)
+straight from a cursor of (planet_name, habitability_score) rows, and the
+finished bytes are cached by (format, data version, params) so repeated
+downloads of unchanged data skip rendering entirely.
+
+Full-catalog CSV / NDJSON exports are streamed instead: rows are pulled
+from the cursor with fetchmany() and yielded chunk by chunk, so memory
+stays flat regardless of table size.
+"""
+
+import csv
+import io
+import json
+import threading
+from collections import OrderedDict
+
+from openpyxl import Workbook
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
+
+PDF_MIMETYPE = "application/pdf"
+XLSX_MIMETYPE = (
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+)
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# Rows fetched from the cursor per streamed chunk
+STREAM_CHUNK = 1000
+
+# Upper bound on cached export bytes (least recently used evicted first)
+CACHE_BYTES = 64 * 1024 * 1024
+
+
+def render_pdf(rows, title="Top Candidate Habitable Exoplanets"):
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer)
+    styles = getSampleStyleSheet()
+
+    table_data = [["Planet Name", "Habitability Score"]]
+    table_data.extend(
+        [name, f"{score:.3f}"] for name, score in rows
+    )
+
+    # repeatRows keeps the header on every page of long rankings
+    table = Table(table_data, repeatRows=1)
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0,0), (-1,0), colors.cyan),
+        ("GRID", (0,0), (-1,-1), 1, colors.black),
+        ("ALIGN", (1,1), (-1,-1), "CENTER")
+    ]))
+
+    doc.build([Paragraph(title, styles["Title"]), table])
+    return buffer.getvalue()
+
+
+def render_excel(rows, title="Top Exoplanets"):
+    # Write-only mode streams rows to the zip instead of keeping a cell
+    # object per value, so full-table exports stay small in memory
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+
+    ws.append(["Planet Name", "Habitability Score"])
+    for name, score in rows:
+        ws.append([name, round(score, 3)])
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def ranked_chunks(cursor, size=STREAM_CHUNK):
+    """fetchmany() chunks of an ordered cursor, each row prefixed by its rank."""
+    rank = 1
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield [(rank + i, *row) for i, row in enumerate(rows)]
+        rank += len(rows)
+
+
+def stream_csv(chunks, columns):
+    """Yield CSV text: the header first, then one piece per row chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+def stream_ndjson(chunks, columns):
+    """Yield newline-delimited JSON objects, one piece per row chunk."""
+    for rows in chunks:
+        yield "".join(
+            json.dumps(dict(zip(columns, row))) + "\n" for row in rows
+        )
+
+
+class ExportCache:
+    """Thread-safe LRU of rendered export bytes, bounded by total size."""
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+
+            self._items[key] = data
+            self._size += len(data)
+
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
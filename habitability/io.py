@@ -0,0 +1,118 @@
+"""
+Typed columnar hand-off files between the training pipeline stages.
+
+Stages exchange Parquet (or Feather, by extension) instead of CSV, so
+dtypes survive the round trip (float64 features, str spectral types,
+bool one-hot columns) and readers can load only the columns they use.
+CSV is kept as an optional human-readable export next to each file.
+
+    write_table(df, "outputs/merged_dataset.parquet")
+    df = read_table("outputs/merged_dataset.parquet", columns=["pl_rade"])
+
+    for chunk in iter_table("catalog.csv", chunk_rows=100_000):   # out of core
+        ...
+
+Set EXPORT_CSV=1 to also write a .csv beside every table, or convert a
+file afterwards:
+
+    python -m habitability.io outputs/merged_dataset.parquet
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+# Written beside each table when set (or when export_csv=True)
+EXPORT_CSV_ENV = "EXPORT_CSV"
+
+
+def _format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    if ext in (".feather", ".arrow"):
+        return "feather"
+    if ext == ".csv":
+        return "csv"
+    raise ValueError(f"Unsupported table format: {path}")
+
+
+def csv_path(path):
+    return os.path.splitext(path)[0] + ".csv"
+
+
+def export_csv(path, df=None):
+    """Write the human-readable CSV copy of a stage table."""
+    if df is None:
+        df = read_table(path)
+    df.to_csv(csv_path(path), index=False)
+    return csv_path(path)
+
+
+def write_table(df, path, export_csv_copy=None):
+    """Write `df` to `path` atomically; format follows the extension."""
+    fmt = _format(path)
+    tmp = f"{path}.tmp-{os.getpid()}"
+
+    if fmt == "parquet":
+        df.to_parquet(tmp, index=False)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(tmp)
+    else:
+        df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+    if export_csv_copy is None:
+        export_csv_copy = os.environ.get(EXPORT_CSV_ENV, "") not in ("", "0")
+    if export_csv_copy and fmt != "csv":
+        export_csv(path, df)
+
+    return path
+
+
+def read_table(path, columns=None):
+    """Read a stage table, optionally only `columns`."""
+    fmt = _format(path)
+
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    if fmt == "feather":
+        return pd.read_feather(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def iter_table(path, chunk_rows=100_000, columns=None):
+    """Yield a table as DataFrames of at most `chunk_rows` rows (out of core)."""
+    fmt = _format(path)
+
+    if fmt == "csv":
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_rows)
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if fmt == "parquet":
+        # pre_buffer keeps every row group read so far: memory grows with the file
+        batches = pq.ParquetFile(path, pre_buffer=False).iter_batches(
+            batch_size=chunk_rows, columns=columns
+        )
+    else:
+        reader = pa.ipc.open_file(path)
+        batches = (
+            reader.get_batch(i).select(columns) if columns else reader.get_batch(i)
+            for i in range(reader.num_record_batches)
+        )
+
+    for batch in batches:
+        for start in range(0, batch.num_rows, chunk_rows):
+            yield batch.slice(start, chunk_rows).to_pandas()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python -m habitability.io <table.parquet> [...]")
+
+    for table in sys.argv[1:]:
+        print("✅ CSV written:", export_csv(table))
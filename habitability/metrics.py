@@ -0,0 +1,253 @@
+"""
+Per-request phase timings for the Flask apps, exported at /metrics.
+
+instrument(app) times every request and records, per route, the total
+and each named phase into fixed log-spaced histograms; /metrics serves
+them in Prometheus text format as summaries (p50 / p95 / p99, sum and
+count) plus a request counter by status. Views mark their phases with:
+
+    with phase("sqlite"):
+        rows = conn.execute(TOP_PLANETS, (top_n,)).fetchall()
+
+Time not covered by any phase is recorded as "other". phase() is a
+no-op outside a request or when metrics are off, so shared scoring code
+can be marked too.
+
+Environment:
+    METRICS_ENABLED=0        no hooks, no /metrics, phase() does nothing
+    SLOW_REQUEST_MS=250      log requests slower than this with their phases
+"""
+
+import bisect
+import math
+import os
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+
+ENABLED = os.environ.get("METRICS_ENABLED", "1") not in ("0", "false", "no")
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS") or 0)
+
+PREFIX = "habitability"
+QUANTILES = (0.5, 0.95, 0.99)
+
+# 20 buckets per decade from 1 µs to 100 s: quantiles within ~12%
+BUCKETS_PER_DECADE = 20
+BOUNDS = [10 ** (-6 + i / BUCKETS_PER_DECADE) for i in range(8 * BUCKETS_PER_DECADE + 1)]
+
+# Exact up to 16, then powers of two: for counts such as batch sizes
+SIZE_BOUNDS = list(range(1, 17)) + [2 ** i for i in range(5, 17)]
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ---------------- histograms ---------------- #
+
+class Histogram:
+    """Fixed-size histogram, of durations in seconds unless given bounds."""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, bounds=BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        if not self.count:
+            return math.nan
+
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                # Interpolate inside the bucket, clamped to what was observed
+                value = lower + (upper - lower) * (rank - seen) / n
+                return min(max(value, self.min), self.max)
+            seen += n
+        return self.max
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return ",".join(f'{k}="{escape(v)}"' for k, v in labels.items())
+
+
+class Metrics:
+    """Thread-safe store of phase histograms, summaries, counters and gauges."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.phases = {}     # (route, method, phase) -> Histogram
+        self.counters = {}   # (name, labels) -> value
+        self.gauges = {}     # (name, labels) -> value
+        self.summaries = {}  # (name, labels) -> Histogram
+
+    def observe(self, route, method, timings):
+        with self.lock:
+            for name, seconds in timings.items():
+                key = (route, method, name)
+                hist = self.phases.get(key)
+                if hist is None:
+                    hist = self.phases[key] = Histogram()
+                hist.observe(seconds)
+
+    def summary(self, name, value, bounds=BOUNDS, **labels):
+        """Record `value` in the p50/p95/p99 summary `name`."""
+        key = (name, tuple(labels.items()))
+        with self.lock:
+            hist = self.summaries.get(key)
+            if hist is None:
+                hist = self.summaries[key] = Histogram(bounds)
+            hist.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(labels.items()))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.gauges[(name, tuple(labels.items()))] = value
+
+    def clear(self, name, **labels):
+        """Drop the gauges `name` whose labels include `labels`."""
+        match = set(labels.items())
+        with self.lock:
+            for key in [k for k in self.gauges if k[0] == name and match <= set(k[1])]:
+                del self.gauges[key]
+
+    def render(self):
+        """Prometheus text exposition of everything recorded so far."""
+        name = f"{PREFIX}_request_phase_seconds"
+        lines = [
+            f"# HELP {name} Time spent in each phase of a request",
+            f"# TYPE {name} summary",
+        ]
+
+        with self.lock:
+            for (route, method, phase_name), hist in sorted(self.phases.items()):
+                labels = _labels(route=route, method=method, phase=phase_name)
+                for q in QUANTILES:
+                    lines.append(f'{name}{{{labels},quantile="{q}"}} {hist.quantile(q):.9f}')
+                lines.append(f"{name}_sum{{{labels}}} {hist.sum:.9f}")
+                lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+            typed = set()
+            for (metric, labels), hist in sorted(self.summaries.items()):
+                full = f"{PREFIX}_{metric}"
+                if full not in typed:
+                    lines.append(f"# TYPE {full} summary")
+                    typed.add(full)
+                labels = _labels(**dict(labels))
+                sep = "," if labels else ""
+                for q in QUANTILES:
+                    lines.append(f'{full}{{{labels}{sep}quantile="{q}"}} {hist.quantile(q):.9g}')
+                lines.append(f"{full}_sum{{{labels}}} {hist.sum:.9g}")
+                lines.append(f"{full}_count{{{labels}}} {hist.count}")
+
+            for kind, values in (("counter", self.counters), ("gauge", self.gauges)):
+                typed = set()
+                for (metric, labels), value in sorted(values.items()):
+                    full = f"{PREFIX}_{metric}"
+                    if full not in typed:
+                        lines.append(f"# TYPE {full} {kind}")
+                        typed.add(full)
+                    lines.append(f"{full}{{{_labels(**dict(labels))}}} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+# ---------------- request phases ---------------- #
+
+def _timings():
+    if not ENABLED or not has_request_context():
+        return None
+    return g.get("_metrics_phases")
+
+
+class phase:
+    """Time a block as a named phase of the current request.
+
+    Outside Flask (the ASGI handlers) pass the request's `timings` dict.
+    """
+
+    __slots__ = ("name", "start", "timings")
+
+    def __init__(self, name, timings=None):
+        self.name = name
+        self.timings = timings
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        timings = self.timings if self.timings is not None else _timings()
+        if timings is not None and ENABLED:
+            elapsed = time.perf_counter() - self.start
+            timings[self.name] = timings.get(self.name, 0.0) + elapsed
+        return False
+
+
+# ---------------- Flask wiring ---------------- #
+
+def instrument(app, metrics=None):
+    """Time every request of `app` and serve /metrics; returns the store."""
+    metrics = metrics or Metrics()
+    app.extensions["metrics"] = metrics
+    if not ENABLED:
+        return metrics
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+        g._metrics_phases = {}
+
+    @app.after_request
+    def _record(response):
+        start = g.pop("_metrics_start", None)
+        timings = g.pop("_metrics_phases", None)
+        if start is None or request.endpoint == "metrics":
+            return response
+
+        total = time.perf_counter() - start
+        timings["other"] = max(total - sum(timings.values()), 0.0)
+        timings["total"] = total
+
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.observe(route, request.method, timings)
+        metrics.inc("requests_total", route=route, method=request.method,
+                    status=response.status_code)
+
+        if SLOW_REQUEST_MS and total * 1000 >= SLOW_REQUEST_MS:
+            breakdown = " ".join(
+                f"{name}={seconds * 1000:.1f}ms"
+                for name, seconds in timings.items() if name != "total"
+            )
+            app.logger.warning(
+                "Slow request %s %s %.1fms: %s",
+                request.method, request.full_path.rstrip("?"), total * 1000, breakdown
+            )
+        return response
+
+    @app.route("/metrics", endpoint="metrics")
+    def _metrics():
+        return Response(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+    return metrics
@@ -0,0 +1,234 @@
+"""
+Physically derived planet and host-star quantities, shared by training
+and serving.
+
+Columns follow the NASA Exoplanet Archive names and units:
+
+    pl_orbper   orbital period [days]       st_teff  effective temperature [K]
+    pl_orbsmax  semi-major axis [AU]        st_rad   stellar radius [R_sun]
+    pl_rade     planet radius [R_earth]     st_mass  stellar mass [M_sun]
+    pl_bmasse   planet mass [M_earth]       st_lum   log10(L / L_sun)
+    pl_dens     planet density [g/cm^3]     pl_insol insolation [S_earth]
+    pl_eqt      equilibrium temperature [K] (zero albedo, full redistribution)
+
+The formulas work on whole columns (float64 buffers updated in place,
+no per-row Python) and on scalars alike. derive() fills the gaps of a
+frame and derive_record() those of one request body; both only replace
+missing values, in DERIVATIONS order, so a value that was sent always
+wins and later formulas can use earlier results:
+
+    derive(df)                                        # NASA names
+    derive(chunk, names={"st_lum": "st_luminosity"})  # backend schema
+    data = derive_record(request.json)
+
+Quantities that cannot be derived stay missing (NaN / None).
+"""
+
+import math
+
+import numpy as np
+
+T_SUN = 5772.0                 # K (IAU nominal)
+R_SUN_AU = 695_700 / 149_597_870.7
+EARTH_DENSITY = 5.514          # g/cm^3
+DAYS_PER_YEAR = 365.25
+
+# Teq of a zero-albedo planet at 1 AU from the Sun (~278 K); Teq = TEQ_1AU * S^(1/4)
+TEQ_1AU = T_SUN * np.sqrt(R_SUN_AU / 2)
+
+# Jupiter units, for catalogs that use them
+EARTH_MASSES_PER_JUPITER = 317.83
+EARTH_RADII_PER_JUPITER = 11.209
+
+
+def _buffer(x):
+    """Fresh float64 copy of `x` to compute in (None -> NaN).
+
+    Scalars stay NumPy scalars: ops on 0-d arrays cost microseconds each.
+    """
+    if np.ndim(x):
+        return np.array(x, dtype=np.float64)
+    return np.float64(np.nan if x is None else x)
+
+
+def _inplace(ufunc, x):
+    return ufunc(x, out=x) if isinstance(x, np.ndarray) else ufunc(x)
+
+# -------------------------------
+# Formulas
+# -------------------------------
+
+def semi_major_axis(pl_orbper, st_mass):
+    """Kepler's third law: a = (M P^2)^(1/3), P in years."""
+    a = _buffer(pl_orbper)
+    a /= DAYS_PER_YEAR
+    a *= a
+    a *= st_mass
+    return _inplace(np.cbrt, a)
+
+
+def orbital_period(pl_orbsmax, st_mass):
+    """Inverse Kepler: P = 365.25 sqrt(a^3 / M) days."""
+    p = _buffer(pl_orbsmax)
+    p **= 3
+    p /= st_mass
+    p = _inplace(np.sqrt, p)
+    p *= DAYS_PER_YEAR
+    return p
+
+
+def luminosity(st_rad, st_teff):
+    """Stefan-Boltzmann: L / L_sun = R^2 (T / 5772)^4."""
+    lum = _buffer(st_teff)
+    lum /= T_SUN
+    lum *= lum
+    lum *= lum
+    lum *= st_rad
+    lum *= st_rad
+    return lum
+
+
+def log_luminosity(st_rad, st_teff):
+    """st_lum as the archives store it: log10(L / L_sun)."""
+    lum = luminosity(st_rad, st_teff)
+    return _inplace(np.log10, lum)
+
+
+def insolation(st_lum, pl_orbsmax):
+    """S / S_earth = L / a^2, from log10 luminosity."""
+    s = np.power(10.0, st_lum)
+    s /= pl_orbsmax
+    s /= pl_orbsmax
+    return s
+
+
+def equilibrium_temp(st_teff, st_rad, pl_orbsmax):
+    """Teq = T sqrt(R / 2a), R converted to AU."""
+    t = _buffer(st_rad)
+    t *= R_SUN_AU / 2
+    t /= pl_orbsmax
+    t = _inplace(np.sqrt, t)
+    t *= st_teff
+    return t
+
+
+def equilibrium_temp_from_insolation(pl_insol):
+    t = _buffer(pl_insol)
+    t = _inplace(np.sqrt, t)
+    t = _inplace(np.sqrt, t)
+    t *= TEQ_1AU
+    return t
+
+
+def insolation_from_equilibrium_temp(pl_eqt):
+    s = _buffer(pl_eqt)
+    s /= TEQ_1AU
+    s *= s
+    s *= s
+    return s
+
+
+def density(pl_bmasse, pl_rade):
+    """Bulk density in g/cm^3 from Earth masses and radii."""
+    rho = _buffer(pl_rade)
+    rho **= 3
+    rho = np.divide(pl_bmasse, rho, out=rho if isinstance(rho, np.ndarray) else None)
+    rho *= EARTH_DENSITY
+    return rho
+
+
+# (target, formula, inputs), tried in order on the values still missing
+DERIVATIONS = [
+    ("pl_orbsmax", semi_major_axis, ("pl_orbper", "st_mass")),
+    ("pl_orbper", orbital_period, ("pl_orbsmax", "st_mass")),
+    ("st_lum", log_luminosity, ("st_rad", "st_teff")),
+    ("pl_insol", insolation, ("st_lum", "pl_orbsmax")),
+    ("pl_eqt", equilibrium_temp, ("st_teff", "st_rad", "pl_orbsmax")),
+    ("pl_eqt", equilibrium_temp_from_insolation, ("pl_insol",)),
+    ("pl_insol", insolation_from_equilibrium_temp, ("pl_eqt",)),
+    ("pl_dens", density, ("pl_bmasse", "pl_rade")),
+]
+
+COLUMNS = sorted({t for t, _, _ in DERIVATIONS} | {c for _, _, i in DERIVATIONS for c in i})
+
+# -------------------------------
+# Filling gaps
+# -------------------------------
+
+def fill(columns, n):
+    """Run DERIVATIONS over a dict of float64 arrays of length n, in place.
+
+    Absent columns are treated as all missing (and added). Returns the
+    number of values filled per column.
+    """
+    filled = {}
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for target, formula, inputs in DERIVATIONS:
+            out = columns.get(target)
+            if out is None:
+                out = columns[target] = np.full(n, np.nan)
+
+            rows = np.flatnonzero(np.isnan(out))
+            if not rows.size or any(c not in columns for c in inputs):
+                continue
+
+            if rows.size == n:
+                values = formula(*(columns[c] for c in inputs))
+            else:
+                values = formula(*(columns[c][rows] for c in inputs))
+            # log10(0), x / 0, sqrt(-x): unknown rather than +-inf
+            values[~np.isfinite(values)] = np.nan
+
+            out[rows] = values
+            filled[target] = filled.get(target, 0) + int(np.count_nonzero(~np.isnan(values)))
+    return filled
+
+
+def derive(df, names=None, add=False):
+    """Fill derivable gaps of `df` in place; returns counts per column.
+
+    `names` maps the NASA names above to the frame's own column names.
+    Only the frame's existing columns are written, unless `add` is set.
+    """
+    names = {c: (names or {}).get(c, c) for c in COLUMNS}
+    columns = {
+        c: df[name].to_numpy(dtype=np.float64, copy=True)
+        for c, name in names.items() if name in df.columns
+    }
+    present = set(columns)
+
+    filled = fill(columns, len(df))
+
+    for c, values in columns.items():
+        if (c in present and filled.get(c)) or (add and c not in present):
+            df[names[c]] = values
+    return {names[c]: k for c, k in filled.items() if k and (add or c in present)}
+
+
+def derive_record(record, names=None):
+    """Copy of a single-planet dict with derivable missing values filled."""
+    names = {c: names.get(c, c) for c in COLUMNS} if names else None
+    values = {}
+    for c in COLUMNS:
+        value = record.get(names[c] if names else c)
+        if value is None:
+            continue
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            # Missing, or not a number: left for validation to report
+            continue
+        if value == value:
+            values[c] = value
+
+    out = dict(record)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for target, formula, inputs in DERIVATIONS:
+            if target in values or any(c not in values for c in inputs):
+                continue
+            value = float(formula(*(values[c] for c in inputs)))
+            if math.isfinite(value):
+                name = names[target] if names else target
+                if out.get(name) is None or out[name] != out[name]:
+                    values[target] = out[name] = value
+    return out
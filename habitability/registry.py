@@ -0,0 +1,296 @@
+"""
+Versioned model artifacts, validated and hot-swapped while serving.
+
+Layout:
+
+    <root>/<name>/<version>/   immutable copies of a model's files
+    <root>/<name>/CURRENT      the version the apps should serve
+
+publish() copies a model's files into a new version directory, named by
+the content hash of its primary file (the same 12-character hash stored
+with every score), repoints CURRENT atomically and prunes old versions.
+When nothing has been published the apps serve the flat model directory
+as before.
+
+ModelRegistry loads the current version, runs it on a smoke-test batch
+and only then swaps it in as one (model, version) pair: a request reads
+`registry.active` once, so a reload mid-request never mixes versions.
+Apps call maybe_reload() per request; at most every RELOAD_SECONDS it
+checks CURRENT on a background thread and swaps when it changed. No
+watcher thread is started at import, so forked workers reload too. A
+version that fails to load or validate is logged and skipped; the
+previous one keeps serving.
+
+Published files are never rewritten, so they are loaded with
+mmap_mode="r": arrays live in the page cache, shared by every worker
+process instead of copied into each one.
+
+Usage:
+    python -m habitability.registry publish <root> <name> <file> [<file> ...]
+    python -m habitability.registry use <root> <name> <version>
+    python -m habitability.registry list <root> <name>
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from habitability.compiled_model import file_sha256
+
+# Where the root app and module4 keep published versions
+REGISTRY_DIR = os.path.join("model", "registry")
+
+CURRENT_FILE = "CURRENT"
+KEEP_VERSIONS = 5
+
+# Seconds between checks for a new version (0 = never reload)
+RELOAD_SECONDS = float(os.environ.get("MODEL_RELOAD_SECONDS", 10))
+
+# MODEL_MMAP= (empty) loads published arrays into process memory instead
+MMAP_MODE = os.environ.get("MODEL_MMAP", "r") or None
+
+Active = namedtuple("Active", "model version")
+
+
+def version_of(path):
+    return file_sha256(path)[:12]
+
+# -------------------------------
+# Publishing
+# -------------------------------
+
+def current_version(root, name):
+    try:
+        with open(os.path.join(root, name, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def versions(root, name):
+    """Published versions, oldest first."""
+    model_dir = os.path.join(root, name)
+    if not os.path.isdir(model_dir):
+        return []
+
+    found = [
+        d for d in os.listdir(model_dir)
+        if not d.startswith(".") and os.path.isdir(os.path.join(model_dir, d))
+    ]
+    return sorted(found, key=lambda d: os.path.getmtime(os.path.join(model_dir, d)))
+
+
+def use(root, name, version):
+    """Point CURRENT at an already published version (deploy or roll back)."""
+    model_dir = os.path.join(root, name)
+    if not os.path.isdir(os.path.join(model_dir, version)):
+        raise ValueError(f"{name} has no published version {version}")
+
+    tmp = os.path.join(model_dir, f".{CURRENT_FILE}-{os.getpid()}")
+    with open(tmp, "w") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(model_dir, CURRENT_FILE))
+
+
+def publish(root, name, paths, keep=KEEP_VERSIONS):
+    """Copy `paths` (primary file first) into a new version and make it current."""
+    version = version_of(paths[0])
+    model_dir = os.path.join(root, name)
+    target = os.path.join(model_dir, version)
+
+    if not os.path.isdir(target):
+        os.makedirs(model_dir, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=f".{version}-", dir=model_dir)
+        os.chmod(tmp, 0o755)
+        try:
+            for path in paths:
+                shutil.copy2(path, tmp)
+            os.replace(tmp, target)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(target):
+                raise
+
+    # Newest mtime = most recently published, also when re-publishing
+    os.utime(target)
+    use(root, name, version)
+
+    for old in versions(root, name)[:-keep]:
+        if old != version:
+            shutil.rmtree(os.path.join(model_dir, old), ignore_errors=True)
+    return version
+
+# -------------------------------
+# Validation
+# -------------------------------
+
+def check_probabilities(model, X):
+    """Smoke test: predict_proba on `X` gives finite (n, 2) probabilities."""
+    proba = np.asarray(model.predict_proba(X), dtype=np.float64)
+    if proba.shape != (len(X), 2):
+        raise ValueError(f"predict_proba returned shape {proba.shape}")
+    if not np.all(np.isfinite(proba)) or proba.min() < 0 or proba.max() > 1:
+        raise ValueError("predict_proba returned values outside [0, 1]")
+    if not np.allclose(proba.sum(axis=1), 1.0):
+        raise ValueError("predict_proba rows do not sum to 1")
+
+# -------------------------------
+# Serving
+# -------------------------------
+
+class ModelRegistry:
+    """The active version of one model, reloaded when CURRENT changes.
+
+    loader(directory, mmap_mode) returns the model served from a version
+    directory; smoke_test(model) raises if it must not be served.
+    """
+
+    def __init__(self, name, loader, smoke_test, primary, fallback_dir,
+                 root, reload_seconds=RELOAD_SECONDS):
+        self.name = name
+        self.loader = loader
+        self.smoke_test = smoke_test
+        self.primary = primary
+        self.fallback_dir = fallback_dir
+        self.root = root
+        self.reload_seconds = reload_seconds
+
+        self.metrics = None
+        self.listeners = []
+        self.active = None
+        self._source = None
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+
+        # The first load has nothing to fall back to: errors propagate
+        self.reload()
+
+    @property
+    def version(self):
+        return self.active.version
+
+    def _locate(self):
+        """(directory, version, mmap_mode, source fingerprint) to serve."""
+        version = current_version(self.root, self.name)
+        if version:
+            return os.path.join(self.root, self.name, version), version, MMAP_MODE, version
+
+        # Unpublished flat directory: files may be rewritten in place, so
+        # never map them, and only re-hash when size or mtime change
+        st = os.stat(os.path.join(self.fallback_dir, self.primary))
+        return self.fallback_dir, None, None, (st.st_size, st.st_mtime_ns)
+
+    def reload(self):
+        """Load, validate and swap in the current version; True if swapped."""
+        with self._lock:
+            return self._reload()
+
+    def _reload(self):
+        directory, version, mmap_mode, source = self._locate()
+        if source == self._source:
+            return False
+        if version is None:
+            version = version_of(os.path.join(directory, self.primary))
+
+        if self.active is not None and version == self.active.version:
+            self._source = source
+            return False
+
+        try:
+            model = self.loader(directory, mmap_mode)
+            self.smoke_test(model)
+        except Exception as e:
+            if self.active is None:
+                raise
+            # Remember the broken source so it is not retried every check
+            self._source = source
+            self._count("failed")
+            print(f"⚠️ {self.name} {version} rejected, still serving "
+                  f"{self.active.version}: {e}")
+            return False
+
+        previous = self.active
+        self.active = Active(model, version)
+        self._source = source
+        self._count("ok")
+        self._publish_info()
+        if previous is not None:
+            for listener in self.listeners:
+                listener()
+            print(f"✅ {self.name} reloaded: {previous.version} → {version}")
+        return True
+
+    def maybe_reload(self):
+        """Check for a new version in the background, at most every reload_seconds."""
+        if not self.reload_seconds:
+            return
+
+        now = time.monotonic()
+        if now < self._next_check or not self._lock.acquire(blocking=False):
+            return
+        self._next_check = now + self.reload_seconds
+
+        def run():
+            try:
+                self._reload()
+            except Exception as e:
+                print(f"⚠️ {self.name} reload check failed: {e}")
+            finally:
+                self._lock.release()
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def on_reload(self, listener):
+        """Call listener() after every swap to a new version (e.g. cache.clear)."""
+        self.listeners.append(listener)
+
+    # ---------------- reporting ---------------- #
+
+    def attach(self, metrics):
+        """Report the active version and reload results on /metrics."""
+        self.metrics = metrics
+        self._publish_info()
+
+    def _count(self, result):
+        if self.metrics is not None:
+            self.metrics.inc("model_reloads_total", model=self.name, result=result)
+
+    def _publish_info(self):
+        if self.metrics is not None:
+            self.metrics.clear("model_info", model=self.name)
+            self.metrics.set("model_info", 1, model=self.name, version=self.version)
+
+    def install(self, app):
+        """Reload checks before, and an X-Model-Version header on, every response."""
+        @app.before_request
+        def _check_model():
+            self.maybe_reload()
+
+        @app.after_request
+        def _model_version(response):
+            response.headers["X-Model-Version"] = self.version
+            return response
+
+
+if __name__ == "__main__":
+    commands = {"publish": 4, "use": 4, "list": 3}
+    if len(sys.argv) < 2 or sys.argv[1] not in commands or len(sys.argv) < commands[sys.argv[1]] + 1:
+        sys.exit(__doc__.split("Usage:\n")[1].rstrip())
+
+    command, root, name = sys.argv[1:4]
+    if command == "publish":
+        version = publish(root, name, sys.argv[4:])
+        print(f"✅ Published {name} {version}")
+    elif command == "use":
+        use(root, name, sys.argv[4])
+        print(f"✅ {name} now serves {sys.argv[4]}")
+    else:
+        current = current_version(root, name)
+        for version in versions(root, name):
+            print(("* " if version == current else "  ") + version)
@@ -0,0 +1,372 @@
+"""
+Mergeable streaming sketches for column statistics of large catalogs.
+
+Exact medians, modes and quartiles need the whole column in memory. These
+sketches summarise a column in a fixed amount of memory, can be built on
+separate chunks (in separate processes) and merged afterwards, and give
+the same answer whatever the chunk boundaries, up to their error bound:
+
+    QuantileSketch   KLL-style compactor levels; quantiles within about
+                     2/k of the true rank (k=1000: ~0.2%), exact while
+                     fewer than k values were seen
+    FrequentItems    Misra-Gries heavy hitters; any count is low by at most
+                     n / (capacity + 1), exact while there are no more
+                     than `capacity` distinct values
+    TableSketch      one of the above per numeric / categorical column
+
+    sketch = sketch_table(iter_table("catalog.parquet"), numeric, categorical,
+                          workers=4)
+    sketch.quantiles["pl_rade"].quantile([0.25, 0.5, 0.75])
+    sketch.frequent["st_spectype"].mode()
+
+CleaningTransformer.fit_chunks() turns a TableSketch into the module2
+imputation / capping / scaling parameters. Sketches round-trip through
+JSON (save / load) so a later batch can be merged into a saved one.
+"""
+
+import copy
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+SKETCH_FORMAT = 1
+
+# Accuracy / size trade-off: about 3k retained values per numeric column
+QUANTILE_K = 1000
+# Distinct categories tracked exactly per categorical column
+HEAVY_HITTERS = 1024
+
+# Each level below the top holds 2/3 of the one above it (KLL)
+LEVEL_RATIO = 2 / 3
+
+_EMPTY = np.empty(0)
+
+
+# -------------------------------
+# Quantiles
+# -------------------------------
+
+class QuantileSketch:
+    """KLL quantile sketch: level h keeps sorted-compacted values of weight 2**h."""
+
+    def __init__(self, k=QUANTILE_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.min = np.nan
+        self.max = np.nan
+        self.levels = [_EMPTY]
+        # value -> count added in bulk with add(); never compacted
+        self.repeated = {}
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * LEVEL_RATIO ** depth)))
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if items.size <= self._capacity(h):
+                h += 1
+                continue
+
+            grown = h + 1 == len(self.levels)
+            if grown:
+                self.levels.append(_EMPTY)
+
+            # Every other value of the sorted level moves up with twice the
+            # weight (random offset); an odd one out stays
+            items = np.sort(items)
+            odd = items.size % 2
+            promoted = items[odd + self._rng.integers(2)::2]
+            self.levels[h] = items[:odd]
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+
+            # A new top level shrinks the capacity of every level below it
+            h = 0 if grown else h + 1
+
+    def update(self, values):
+        """Add an array of values (NaN ignored)."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return self
+
+        self.n += values.size
+        self.min = np.fmin(self.min, values.min())
+        self.max = np.fmax(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def add(self, value, count):
+        """Add `count` copies of one value (e.g. the imputed ones) exactly."""
+        if count <= 0 or value != value:
+            return self
+
+        value = float(value)
+        self.n += count
+        self.min = np.fmin(self.min, value)
+        self.max = np.fmax(self.max, value)
+        # Kept as one weighted value: inserting it into the levels would
+        # compact the rest of the sketch for nothing
+        self.repeated[value] = self.repeated.get(value, 0) + int(count)
+        return self
+
+    def merge(self, other):
+        """Fold another sketch of the same quantity into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(_EMPTY)
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        for value, count in other.repeated.items():
+            self.repeated[value] = self.repeated.get(value, 0) + count
+        self.n += other.n
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self._compress()
+        return self
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def _weighted(self):
+        """Sorted (values, weights, repeated?) of everything retained."""
+        items = np.concatenate([*self.levels, list(self.repeated)])
+        weights = np.concatenate([
+            *(np.full(level.size, 2.0 ** h) for h, level in enumerate(self.levels)),
+            np.fromiter(self.repeated.values(), np.float64, len(self.repeated)),
+        ])
+        repeated = np.arange(items.size) >= items.size - len(self.repeated)
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order], repeated[order]
+
+    def quantile(self, q):
+        """Like np.quantile (linear interpolation); exact until compacted."""
+        if not self.n:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+
+        items, weights, repeated = self._weighted()
+        # A compacted value stands at the middle of the ranks it represents;
+        # add()ed copies cover their whole run of ranks
+        cum = np.cumsum(weights)
+        middle = cum - (weights + 1) / 2
+        position = np.concatenate([middle[~repeated], (cum - weights)[repeated],
+                                   (cum - 1)[repeated]])
+        values = np.concatenate([items[~repeated], items[repeated], items[repeated]])
+        order = np.argsort(position, kind="stable")
+        return np.interp(np.asarray(q, dtype=np.float64) * (self.n - 1),
+                         position[order], values[order])
+
+    def rank(self, values):
+        """Estimated fraction of the values <= each of `values`."""
+        items, weights, _ = self._weighted()
+        cum = np.concatenate([[0.0], np.cumsum(weights)])
+        return cum[np.searchsorted(items, values, side="right")] / max(self.n, 1)
+
+    @property
+    def size(self):
+        """Values retained (memory is 8 bytes each)."""
+        return sum(level.size for level in self.levels) + len(self.repeated)
+
+    def to_dict(self):
+        return {
+            "k": self.k,
+            "n": self.n,
+            "min": None if np.isnan(self.min) else float(self.min),
+            "max": None if np.isnan(self.max) else float(self.max),
+            "levels": [level.tolist() for level in self.levels],
+            "repeated": [[v, c] for v, c in self.repeated.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, params, seed=0):
+        self = cls(params["k"], seed)
+        self.n = params["n"]
+        self.min = np.nan if params["min"] is None else params["min"]
+        self.max = np.nan if params["max"] is None else params["max"]
+        self.levels = [np.asarray(level, dtype=np.float64) for level in params["levels"]]
+        self.repeated = {v: c for v, c in params["repeated"]}
+        return self
+
+
+# -------------------------------
+# Heavy hitters
+# -------------------------------
+
+class FrequentItems:
+    """Misra-Gries counts of the most frequent values of a column."""
+
+    def __init__(self, capacity=HEAVY_HITTERS):
+        self.capacity = capacity
+        self.n = 0
+        self.counts = {}
+        # Upper bound on how much any count is underestimated
+        self.error = 0
+
+    def _add_counts(self, counts):
+        for value, count in counts:
+            self.counts[value] = self.counts.get(value, 0) + count
+
+        if len(self.counts) > self.capacity:
+            # Subtract the (capacity + 1)-th largest count from every count
+            cut = sorted(self.counts.values(), reverse=True)[self.capacity]
+            self.counts = {v: c - cut for v, c in self.counts.items() if c > cut}
+            self.error += cut
+
+    def update(self, values):
+        """Add a Series / array of values (missing ones ignored)."""
+        values = pd.Series(values).dropna()
+        self.n += len(values)
+        self._add_counts(values.value_counts(sort=False).items())
+        return self
+
+    def merge(self, other):
+        self.n += other.n
+        self.error += other.error
+        self._add_counts(other.counts.items())
+        return self
+
+    def mode(self):
+        """Most frequent value (the smallest one on ties, like Series.mode)."""
+        if not self.counts:
+            return None
+        return min(self.counts, key=lambda v: (-self.counts[v], v))
+
+    def items(self):
+        """Tracked values, sorted; every value seen when the counts are exact."""
+        return sorted(self.counts)
+
+    @property
+    def exact(self):
+        return self.error == 0
+
+    def to_dict(self):
+        return {
+            "capacity": self.capacity,
+            "n": self.n,
+            "error": self.error,
+            "counts": [[v, int(c)] for v, c in self.counts.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, params):
+        self = cls(params["capacity"])
+        self.n = params["n"]
+        self.error = params["error"]
+        self.counts = {v: c for v, c in params["counts"]}
+        return self
+
+
+# -------------------------------
+# Tables
+# -------------------------------
+
+class TableSketch:
+    """Quantile sketches of numeric columns and heavy hitters of categorical ones."""
+
+    def __init__(self, numeric, categorical=(), k=QUANTILE_K,
+                 capacity=HEAVY_HITTERS, seed=0):
+        self.numeric = list(numeric)
+        self.categorical = list(categorical)
+        self.rows = 0
+        self.quantiles = {c: QuantileSketch(k, seed) for c in self.numeric}
+        self.frequent = {c: FrequentItems(capacity) for c in self.categorical}
+
+    def update(self, df):
+        """Add a chunk (a DataFrame with at least the sketched columns)."""
+        self.rows += len(df)
+        for col, sketch in self.quantiles.items():
+            sketch.update(df[col].to_numpy(dtype=np.float64, na_value=np.nan))
+        for col, sketch in self.frequent.items():
+            sketch.update(df[col])
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        for col, sketch in self.quantiles.items():
+            sketch.merge(other.quantiles[col])
+        for col, sketch in self.frequent.items():
+            sketch.merge(other.frequent[col])
+        return self
+
+    def missing(self, col):
+        """Rows where `col` was missing."""
+        sketch = self.quantiles.get(col) or self.frequent[col]
+        return self.rows - sketch.n
+
+    def to_dict(self):
+        return {
+            "format": SKETCH_FORMAT,
+            "rows": self.rows,
+            "numeric": self.numeric,
+            "categorical": self.categorical,
+            "quantiles": {c: s.to_dict() for c, s in self.quantiles.items()},
+            "frequent": {c: s.to_dict() for c, s in self.frequent.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, params):
+        if params.get("format") != SKETCH_FORMAT:
+            raise ValueError(f"Unsupported sketch format: {params.get('format')}")
+
+        self = cls(params["numeric"], params["categorical"])
+        self.rows = params["rows"]
+        self.quantiles = {
+            c: QuantileSketch.from_dict(s) for c, s in params["quantiles"].items()
+        }
+        self.frequent = {
+            c: FrequentItems.from_dict(s) for c, s in params["frequent"].items()
+        }
+        return self
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def sketch_chunk(chunk, numeric, categorical, k=QUANTILE_K,
+                 capacity=HEAVY_HITTERS, seed=0):
+    """TableSketch of one chunk (process pool entry point)."""
+    return TableSketch(numeric, categorical, k, capacity, seed).update(chunk)
+
+
+def sketch_table(chunks, numeric, categorical=(), workers=None,
+                 k=QUANTILE_K, capacity=HEAVY_HITTERS):
+    """Sketch an iterable of DataFrame chunks, `workers` chunks at a time.
+
+    Chunk sketches are merged in chunk order, so the result does not
+    depend on the number of workers.
+    """
+    workers = os.cpu_count() if workers is None else workers
+    sketch = TableSketch(numeric, categorical, k, capacity)
+    jobs = (
+        (chunk, numeric, categorical, k, capacity, i)
+        for i, chunk in enumerate(chunks)
+    )
+
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            # At most two chunks per worker in flight: bounded memory
+            pending = deque()
+            for job in jobs:
+                pending.append(pool.submit(sketch_chunk, *job))
+                if len(pending) >= 2 * workers:
+                    sketch.merge(pending.popleft().result())
+            for future in pending:
+                sketch.merge(future.result())
+    else:
+        for job in jobs:
+            sketch.merge(sketch_chunk(*job))
+
+    return sketch
@@ -0,0 +1,346 @@
+"""
+Export XGBoost boosters to flat arrays and evaluate them with NumPy.
+
+All trees are concatenated into contiguous node arrays (feature index,
+threshold, left/right child, default direction, leaf value). Leaves
+point to themselves with a NaN threshold, so a batch of rows walks
+every tree at once by stepping max_depth times: no per-tree Python loop
+and no xgboost import at serving time.
+
+That wins on small batches (no DMatrix set-up) but loses to xgboost's
+compiled traversal from about 100 rows on, so load_model() serves the
+trees up to TREES_MAX_ROWS rows and the native booster above it when
+xgboost is installed; without xgboost the trees serve every batch.
+
+Environment:
+    TREES_MAX_ROWS=64   largest batch scored with the NumPy trees
+
+Usage:
+    python -m habitability.tree_model backend/model/xgboost_classifier.pkl ...
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import threading
+
+import joblib
+import numpy as np
+
+from habitability.compiled_model import file_sha256
+
+ARTIFACT_FORMAT = 1
+
+# Rows walked per step; bounds the (rows x trees) index matrices
+CHUNK_ROWS = 512
+
+# Larger batches go to the native booster when there is one
+TREES_MAX_ROWS = int(os.environ.get("TREES_MAX_ROWS", 64))
+
+# glibc's expf (table of 2^(i/32) plus a cubic, all in float64), which
+# xgboost's sigmoid calls; numpy's float32 exp rounds differently
+_EXP_N = 32
+_EXP_TABLE = np.array(
+    [np.float64(2.0 ** (i / _EXP_N)).view(np.uint64) - np.uint64(i << 47)
+     for i in range(_EXP_N)],
+    dtype=np.uint64
+)
+_EXP_INV_LN2_N = float.fromhex("0x1.71547652b82fep+0") * _EXP_N
+_EXP_SHIFT = float.fromhex("0x1.8p+52")
+_EXP_POLY = (
+    float.fromhex("0x1.c6af84b912394p-5") / _EXP_N ** 3,
+    float.fromhex("0x1.ebfce50fac4f3p-3") / _EXP_N ** 2,
+    float.fromhex("0x1.62e42ff0c52d6p-1") / _EXP_N
+)
+
+
+def expf(x):
+    """float32 exp rounded exactly like glibc (|x| < 88.7)."""
+    z = _EXP_INV_LN2_N * np.asarray(x, dtype=np.float32).astype(np.float64)
+    kd = z + _EXP_SHIFT
+    ki = kd.view(np.uint64)
+    r = z - (kd - _EXP_SHIFT)
+    s = (_EXP_TABLE[ki % np.uint64(_EXP_N)] + (ki << np.uint64(47))).view(np.float64)
+    y = (_EXP_POLY[0] * r + _EXP_POLY[1]) * (r * r) + (_EXP_POLY[2] * r + 1)
+    return (y * s).astype(np.float32)
+
+# -------------------------------
+# Exporter
+# -------------------------------
+
+def export_booster(model):
+    """Flatten a fitted XGBClassifier/Booster into a dict of arrays."""
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    raw = json.loads(booster.save_raw("json"))
+    learner = raw["learner"]
+
+    gbm = learner["gradient_booster"]
+    if gbm["name"] != "gbtree":
+        raise ValueError(f"Unsupported booster: {gbm['name']}")
+
+    objective = learner["objective"]["name"]
+    if objective not in ("binary:logistic", "reg:squarederror"):
+        raise ValueError(f"Unsupported objective: {objective}")
+
+    params = learner["learner_model_param"]
+    if int(params.get("num_class", 0)) > 1 or int(params.get("num_target", 1)) > 1:
+        raise ValueError("Only single-output models are supported")
+
+    base_score = np.float32(json.loads(params["base_score"])[0]
+                            if params["base_score"].startswith("[")
+                            else float(params["base_score"]))
+    if objective == "binary:logistic":
+        # Same float32 arithmetic as xgboost's ProbToMargin
+        base_margin = -np.log(np.float32(1) / base_score - np.float32(1))
+    else:
+        base_margin = base_score
+
+    features, thresholds, lefts, rights = [], [], [], []
+    default_left, values, roots = [], [], []
+    max_depth = 0
+    offset = 0
+
+    for tree in gbm["model"]["trees"]:
+        if any(tree["split_type"]):
+            raise ValueError("Categorical splits are not supported")
+
+        left = np.asarray(tree["left_children"], dtype=np.int64)
+        right = np.asarray(tree["right_children"], dtype=np.int64)
+        cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+        n = len(left)
+        node = np.arange(n)
+        leaf = left == -1
+
+        # Leaves loop back onto themselves
+        left = np.where(leaf, node, left) + offset
+        right = np.where(leaf, node, right) + offset
+
+        features.append(np.where(leaf, 0, tree["split_indices"]))
+        thresholds.append(np.where(leaf, np.float32(np.nan), cond))
+        lefts.append(left)
+        rights.append(right)
+        default_left.append(np.asarray(tree["default_left"], dtype=bool) | leaf)
+        # XGBoost keeps the leaf value in split_conditions
+        values.append(np.where(leaf, cond, np.float32(0)))
+        roots.append(offset)
+
+        stack = [(0, 0)]
+        while stack:
+            i, depth = stack.pop()
+            max_depth = max(max_depth, depth)
+            if not leaf[i]:
+                stack.append((tree["left_children"][i], depth + 1))
+                stack.append((tree["right_children"][i], depth + 1))
+        offset += n
+
+    return {
+        "format": ARTIFACT_FORMAT,
+        "objective": objective,
+        "feature_names": list(booster.feature_names or []),
+        "base_margin": np.float32(base_margin),
+        "max_depth": max_depth,
+        "roots": np.asarray(roots, dtype=np.int32),
+        "feature": np.concatenate(features).astype(np.int32),
+        "threshold": np.concatenate(thresholds).astype(np.float32),
+        "left": np.concatenate(lefts).astype(np.int32),
+        "right": np.concatenate(rights).astype(np.int32),
+        "default_left": np.concatenate(default_left),
+        "value": np.concatenate(values).astype(np.float32)
+    }
+
+# -------------------------------
+# Evaluator
+# -------------------------------
+
+class TreeEnsemble:
+    """predict/predict_proba over an exported tree artifact."""
+
+    def __init__(self, artifact):
+        if artifact.get("format") != ARTIFACT_FORMAT:
+            raise ValueError("Unsupported tree model format")
+
+        self.artifact = artifact
+        self.objective = artifact["objective"]
+        self.feature_names_in_ = np.array(artifact["feature_names"], dtype=object)
+        self.base_margin = np.float32(artifact["base_margin"])
+        self.max_depth = int(artifact["max_depth"])
+        self.roots = np.asarray(artifact["roots"], dtype=np.int32)
+        self.value = artifact["value"]
+
+        self.threshold = np.asarray(artifact["threshold"], dtype=np.float32)
+        self.left = np.asarray(artifact["left"], dtype=np.int32)
+        self.right = np.asarray(artifact["right"], dtype=np.int32)
+        self.default_right = ~np.asarray(artifact["default_left"], dtype=bool)
+        feature = np.asarray(artifact["feature"], dtype=np.int32)
+
+        # XGBoost allocates sibling nodes next to each other, so the
+        # right child is left + 1
+        internal = self.left != np.arange(len(self.left))
+        if not np.all(self.right[internal] == self.left[internal] + 1):
+            raise ValueError("Sibling nodes must be stored next to each other")
+
+        # Everything a step needs in one 8-byte word per node, so each
+        # level costs a single gather:
+        #   low 4 bytes : threshold (float32)
+        #   high 4 bytes: left child | default-right bit | feature index
+        self._shift = max(int(feature.max()), 1).bit_length()
+        if len(self.left) >= 1 << (30 - self._shift):
+            raise ValueError("Too many nodes to pack into one word")
+        packed = (
+            (self.left << (self._shift + 1))
+            | (self.default_right.astype(np.int32) << self._shift)
+            | feature
+        )
+        nodes = np.empty(len(feature), dtype=[("threshold", "<f4"), ("packed", "<i4")])
+        nodes["threshold"] = self.threshold
+        nodes["packed"] = packed
+        self._nodes = nodes.view(np.int64)
+
+    def _as_matrix(self, X):
+        if hasattr(X, "columns") and len(self.feature_names_in_):
+            X = X[list(self.feature_names_in_)]
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def _leaves(self, X):
+        """Leaf node index per (row, tree), stepping all trees together."""
+        n_rows, n_features = X.shape
+        n_trees = len(self.roots)
+        node = np.broadcast_to(self.roots, (n_rows, n_trees))
+        row_offset = (np.arange(n_rows, dtype=np.int32) * n_features)[:, None]
+        flat = X.ravel()
+        has_nan = bool(np.isnan(flat).any())
+        feature_mask = np.int32((1 << self._shift) - 1)
+
+        for _ in range(self.max_depth):
+            word = self._nodes[node].view(np.int32).reshape(n_rows, n_trees, 2)
+            threshold = word[..., 0].view(np.float32)
+            packed = word[..., 1]
+
+            x = flat[(packed & feature_mask) + row_offset]
+
+            # False for NaN inputs and for leaves (NaN threshold)
+            go_right = x >= threshold
+            if has_nan:
+                go_right |= np.isnan(x) & ((packed >> self._shift) & 1).astype(bool)
+
+            node = (packed >> (self._shift + 1)) + go_right
+
+        return node
+
+    def predict_margin(self, X):
+        X = self._as_matrix(X)
+        margin = np.empty(len(X), dtype=np.float32)
+
+        for start in range(0, len(X), CHUNK_ROWS):
+            leaf_values = self.value[self._leaves(X[start:start + CHUNK_ROWS])]
+            # Sum tree by tree in float32, the order xgboost uses
+            acc = np.full(len(leaf_values), self.base_margin, dtype=np.float32)
+            for t in range(leaf_values.shape[1]):
+                acc += leaf_values[:, t]
+            margin[start:start + CHUNK_ROWS] = acc
+
+        return margin
+
+    def predict_proba(self, X):
+        if self.objective != "binary:logistic":
+            raise ValueError("predict_proba needs a binary:logistic model")
+
+        # xgboost's float32 sigmoid
+        z = np.minimum(-self.predict_margin(X), np.float32(88.7))
+        p = np.float32(1) / (expf(z) + np.float32(1))
+        return np.column_stack([1.0 - p, p]).astype(np.float32)
+
+    def predict(self, X):
+        if self.objective == "binary:logistic":
+            return (self.predict_proba(X)[:, 1] > 0.5).astype(np.int64)
+        return self.predict_margin(X)
+
+
+class DispatchModel:
+    """NumPy trees for small batches, the native xgboost model for large ones.
+
+    Both give bit-identical outputs, so only the latency depends on the
+    batch size. The xgboost pickle is loaded on the first batch above
+    max_rows, so single-row serving never pays for importing it.
+    """
+
+    def __init__(self, trees, model_path, max_rows=TREES_MAX_ROWS):
+        self.trees = trees
+        self.model_path = model_path
+        self.max_rows = max_rows
+        self.feature_names_in_ = trees.feature_names_in_
+        self._native = None
+        self._lock = threading.Lock()
+
+    @property
+    def native(self):
+        if self._native is None:
+            with self._lock:
+                if self._native is None:
+                    self._native = joblib.load(self.model_path)
+        return self._native
+
+    def _model(self, X):
+        return self.trees if len(X) <= self.max_rows else self.native
+
+    def predict_proba(self, X):
+        return self._model(X).predict_proba(X)
+
+    def predict(self, X):
+        return self._model(X).predict(X)
+
+# -------------------------------
+# Loading
+# -------------------------------
+
+def trees_path(model_path):
+    root, ext = os.path.splitext(model_path)
+    return f"{root}_trees{ext}"
+
+
+def save_trees(model_path):
+    artifact = export_booster(joblib.load(model_path))
+    artifact["source_sha256"] = file_sha256(model_path)
+    joblib.dump(artifact, trees_path(model_path))
+    return artifact
+
+
+def load_trees(model_path, mmap_mode=None):
+    """Load the exported trees for model_path, or None if missing or stale.
+
+    The original pickle may be absent (xgboost not deployed); the
+    artifact is then trusted as is.
+    """
+    path = trees_path(model_path)
+    if not os.path.exists(path):
+        return None
+
+    artifact = joblib.load(path, mmap_mode=mmap_mode)
+    if (
+        os.path.exists(model_path)
+        and artifact.get("source_sha256") != file_sha256(model_path)
+    ):
+        return None
+
+    return TreeEnsemble(artifact)
+
+
+def load_model(model_path, mmap_mode=None, max_rows=TREES_MAX_ROWS):
+    """Serving model for an xgboost pickle: the exported trees, the pickle,
+    or a DispatchModel of both when both are available."""
+    trees = load_trees(model_path, mmap_mode)
+    if trees is None:
+        return joblib.load(model_path)
+
+    if not os.path.exists(model_path) or importlib.util.find_spec("xgboost") is None:
+        return trees
+    return DispatchModel(trees, model_path, max_rows)
+
+
+if __name__ == "__main__":
+    for model_path in sys.argv[1:]:
+        artifact = save_trees(model_path)
+        print(f"✅ Exported {len(artifact['roots'])} trees "
+              f"({len(artifact['value'])} nodes, depth {artifact['max_depth']}) "
+              f"to {trees_path(model_path)}")
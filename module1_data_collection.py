@@ -1,5 +1,17 @@
 import pandas as pd
+import numpy as np
 import os
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+from habitability.io import write_table
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 # -------------------------------
 # Configuration
@@ -10,28 +22,9 @@ OUTPUT_DIR = "outputs"
 FILE_1 = os.path.join(DATA_DIR, "nasa_exoplanets.csv")
 FILE_2 = os.path.join(DATA_DIR, "exoplanets_dataset.csv")
 
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-# -------------------------------
-# Step 1: Load datasets
-# -------------------------------
-print("Loading datasets...\n")
-
-# NASA dataset contains metadata lines starting with '#'
-df1 = pd.read_csv(
-    FILE_1,
-    comment="#",
-    engine="python"
-)
-
-df2 = pd.read_csv(FILE_2)
-
-print("Dataset 1 shape:", df1.shape)
-print("Dataset 2 shape:", df2.shape)
+# Rows parsed per chunk; bounds memory for multi-GB archive dumps
+CHUNK_SIZE = 200_000
 
-# -------------------------------
-# Step 2: Select common features
-# -------------------------------
 COMMON_FEATURES = [
     'pl_orbper',
     'pl_rade',
@@ -44,51 +37,143 @@ COMMON_FEATURES = [
     'st_spectype'
 ]
 
-df1_selected = df1[COMMON_FEATURES]
-df2_selected = df2[COMMON_FEATURES]
+# Explicit dtypes: no type inference, and equal values hash the same in
+# both catalogs
+DTYPES = {col: "float64" for col in COMMON_FEATURES}
+DTYPES["st_spectype"] = "str"
+
+os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # -------------------------------
-# Step 3: Merge datasets (row-wise)
+# Stage timing / peak memory
 # -------------------------------
-merged_df = pd.concat(
-    [df1_selected, df2_selected],
-    ignore_index=True
-)
+STAGES = []
+
+
+def peak_rss_mb():
+    if resource is None:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
 
-print("\nMerged dataset shape (before duplicates):", merged_df.shape)
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    yield
+    seconds = time.perf_counter() - start
+    rss = peak_rss_mb()
+    STAGES.append({"stage": name, "seconds": round(seconds, 3), "peak_rss_mb": round(rss, 1)})
+    print(f"⏱ {name}: {seconds:.2f}s, peak RSS {rss:.0f} MB")
+
+
+def read_catalog(path, chunksize=CHUNK_SIZE, **kwargs):
+    """Yield chunks holding only COMMON_FEATURES, parsed by the C engine."""
+    reader = pd.read_csv(
+        path,
+        usecols=COMMON_FEATURES,
+        dtype=DTYPES,
+        engine="c",
+        chunksize=chunksize,
+        **kwargs
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk[COMMON_FEATURES]
 
-# -------------------------------
-# Step 4: Remove duplicate rows
-# -------------------------------
-before = merged_df.shape[0]
-merged_df.drop_duplicates(inplace=True)
-after = merged_df.shape[0]
 
-print(f"Removed {before - after} duplicate rows")
+def drop_seen(chunk, seen):
+    """Drop rows already in `seen` (or earlier in the chunk), record the rest.
 
-# -------------------------------
-# Step 5: Data validation
-# -------------------------------
-summary = []
-summary.append(f"Final Dataset Shape: {merged_df.shape}\n")
+    Rows are compared by a 64-bit hash of their values, so one integer per
+    unique row is kept across chunks instead of the rows themselves.
+    """
+    hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
 
-summary.append("Column-wise Missing Values:\n")
-summary.append(str(merged_df.isnull().sum()))
-summary.append("\n")
+    keep = ~pd.Series(hashes).duplicated().to_numpy()
+    keep &= np.fromiter((h not in seen for h in hashes.tolist()), bool, len(hashes))
 
-summary.append("Basic Statistics (Numerical Columns):\n")
-summary.append(str(merged_df.describe()))
+    seen.update(hashes[keep].tolist())
+    return chunk[keep]
 
-with open(os.path.join(OUTPUT_DIR, "data_summary.txt"), "w") as f:
-    f.write("\n".join(summary))
 
-# -------------------------------
-# Step 6: Save merged dataset
-# -------------------------------
-merged_file_path = os.path.join(OUTPUT_DIR, "merged_dataset.csv")
-merged_df.to_csv(merged_file_path, index=False)
+def load_catalogs(paths, chunksize=CHUNK_SIZE):
+    """Read, project and dedupe every catalog chunk by chunk.
+
+    Returns (merged unique rows, rows read per file).
+    """
+    seen = set()
+    parts = []
+    counts = {}
+
+    for path, kwargs in paths:
+        rows = 0
+        with stage(f"load {os.path.basename(path)}"):
+            for chunk in read_catalog(path, chunksize, **kwargs):
+                rows += len(chunk)
+                parts.append(drop_seen(chunk, seen))
+        counts[path] = rows
+
+    merged = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=COMMON_FEATURES)
+    return merged, counts
+
+
+def run():
+    """Merge the two raw catalogs into outputs/merged_dataset.parquet."""
+    STAGES.clear()
+
+    # -------------------------------
+    # Step 1-4: Load, select, merge and dedupe (streamed)
+    # -------------------------------
+    print("Loading datasets...\n")
+
+    merged_df, counts = load_catalogs([
+        # NASA dataset contains metadata lines starting with '#'
+        (FILE_1, {"comment": "#"}),
+        (FILE_2, {}),
+    ])
+
+    for i, (path, rows) in enumerate(counts.items(), start=1):
+        print(f"Dataset {i} rows:", rows)
+
+    before = sum(counts.values())
+    print("\nMerged dataset shape (before duplicates):", (before, len(COMMON_FEATURES)))
+    print(f"Removed {before - len(merged_df)} duplicate rows")
+
+    # -------------------------------
+    # Step 5: Data validation
+    # -------------------------------
+    with stage("summary"):
+        summary = []
+        summary.append(f"Final Dataset Shape: {merged_df.shape}\n")
+
+        summary.append("Column-wise Missing Values:\n")
+        summary.append(str(merged_df.isnull().sum()))
+        summary.append("\n")
+
+        summary.append("Basic Statistics (Numerical Columns):\n")
+        summary.append(str(merged_df.describe()))
+
+        with open(os.path.join(OUTPUT_DIR, "data_summary.txt"), "w") as f:
+            f.write("\n".join(summary))
+
+    # -------------------------------
+    # Step 6: Save merged dataset
+    # -------------------------------
+    merged_file_path = os.path.join(OUTPUT_DIR, "merged_dataset.parquet")
+    with stage("save"):
+        write_table(merged_df, merged_file_path)
+
+    with open(os.path.join(OUTPUT_DIR, "module1_stages.json"), "w") as f:
+        json.dump(STAGES, f, indent=2)
+
+    print("\nMerged dataset saved to:", merged_file_path)
+    print("Data summary saved to outputs/data_summary.txt")
+    print("Stage timings saved to outputs/module1_stages.json")
+
+    print("\n✅ Module 1: Data Collection & Management COMPLETED SUCCESSFULLY")
 
-print("\nMerged dataset saved to:", merged_file_path)
-print("Data summary saved to outputs/data_summary.txt")
 
-print("\n✅ Module 1: Data Collection & Management COMPLETED SUCCESSFULLY")
+if __name__ == "__main__":
+    run()
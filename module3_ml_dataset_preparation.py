@@ -8,127 +8,136 @@ from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 from sklearn.feature_selection import SelectKBest, f_classif
 
+from habitability.io import read_table
+
 # -------------------------------
 # Configuration
 # -------------------------------
-INPUT_FILE = os.path.join("outputs", "cleaned_feature_engineered_dataset.csv")
+INPUT_FILE = os.path.join("outputs", "cleaned_feature_engineered_dataset.parquet")
 OUTPUT_DIR = "outputs"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-print("\n📌 Module 3: Machine Learning Dataset Preparation\n")
 
-# -------------------------------
-# Step 1: Load cleaned dataset
-# -------------------------------
-df = pd.read_csv(INPUT_FILE)
-print("Dataset loaded:", df.shape)
+def run():
+    """Split and preprocess the cleaned dataset into .npy arrays."""
+    print("\n📌 Module 3: Machine Learning Dataset Preparation\n")
 
-# -------------------------------
-# Step 2: Define target variable
-# -------------------------------
-print("\nDefining target variable (Habitability Class)...")
+    # -------------------------------
+    # Step 1: Load cleaned dataset
+    # -------------------------------
+    df = read_table(INPUT_FILE)
+    print("Dataset loaded:", df.shape)
 
-# Binary classification based on habitability score
-df["habitability_class"] = np.where(
-    df["habitability_score"] >= df["habitability_score"].median(),
-    1,  # Habitable
-    0   # Non-Habitable
-)
+    # -------------------------------
+    # Step 2: Define target variable
+    # -------------------------------
+    print("\nDefining target variable (Habitability Class)...")
 
-print("Target variable created.")
+    # Binary classification based on habitability score
+    df["habitability_class"] = np.where(
+        df["habitability_score"] >= df["habitability_score"].median(),
+        1,  # Habitable
+        0   # Non-Habitable
+    )
 
-# -------------------------------
-# Step 3: Feature selection based on domain relevance
-# -------------------------------
-print("\nSelecting relevant features...")
+    print("Target variable created.")
 
-target = "habitability_class"
+    # -------------------------------
+    # Step 3: Feature selection based on domain relevance
+    # -------------------------------
+    print("\nSelecting relevant features...")
 
-# Drop non-ML columns
-drop_cols = [
-    target,
-    "habitability_score"  # Used only for labeling
-]
+    target = "habitability_class"
 
-X = df.drop(columns=drop_cols)
-y = df[target]
+    # Drop non-ML columns
+    drop_cols = [
+        target,
+        "habitability_score"  # Used only for labeling
+    ]
 
-print("Features shape:", X.shape)
-print("Target shape:", y.shape)
+    X = df.drop(columns=drop_cols)
+    y = df[target]
 
-# -------------------------------
-# Step 4: Identify numerical & categorical features
-# -------------------------------
-numerical_features = X.select_dtypes(include=["float64", "int64"]).columns.tolist()
-categorical_features = X.select_dtypes(include=["uint8", "bool"]).columns.tolist()
+    print("Features shape:", X.shape)
+    print("Target shape:", y.shape)
 
-print("Numerical features:", len(numerical_features))
-print("Categorical features:", len(categorical_features))
+    # -------------------------------
+    # Step 4: Identify numerical & categorical features
+    # -------------------------------
+    numerical_features = X.select_dtypes(include=["float64", "int64"]).columns.tolist()
+    categorical_features = X.select_dtypes(include=["uint8", "bool"]).columns.tolist()
 
-# -------------------------------
-# Step 5: Preprocessing pipelines
-# -------------------------------
-print("\nCreating preprocessing pipelines...")
+    print("Numerical features:", len(numerical_features))
+    print("Categorical features:", len(categorical_features))
 
-numeric_pipeline = Pipeline(
-    steps=[
-        ("scaler", StandardScaler()),
-        ("feature_selection", SelectKBest(score_func=f_classif, k=15))
-    ]
-)
+    # -------------------------------
+    # Step 5: Preprocessing pipelines
+    # -------------------------------
+    print("\nCreating preprocessing pipelines...")
 
-categorical_pipeline = Pipeline(
-    steps=[
-        ("scaler", StandardScaler(with_mean=False))
-    ]
-)
+    numeric_pipeline = Pipeline(
+        steps=[
+            ("scaler", StandardScaler()),
+            ("feature_selection", SelectKBest(score_func=f_classif, k=15))
+        ]
+    )
 
-preprocessor = ColumnTransformer(
-    transformers=[
-        ("num", numeric_pipeline, numerical_features),
-        ("cat", categorical_pipeline, categorical_features)
-    ]
-)
+    categorical_pipeline = Pipeline(
+        steps=[
+            ("scaler", StandardScaler(with_mean=False))
+        ]
+    )
 
-print("Pipelines created.")
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("num", numeric_pipeline, numerical_features),
+            ("cat", categorical_pipeline, categorical_features)
+        ]
+    )
 
-# -------------------------------
-# Step 6: Train-test split (80:20)
-# -------------------------------
-print("\nSplitting dataset (80:20)...")
+    print("Pipelines created.")
 
-X_train, X_test, y_train, y_test = train_test_split(
-    X,
-    y,
-    test_size=0.2,
-    random_state=42,
-    stratify=y
-)
+    # -------------------------------
+    # Step 6: Train-test split (80:20)
+    # -------------------------------
+    print("\nSplitting dataset (80:20)...")
 
-print("Training set:", X_train.shape)
-print("Testing set:", X_test.shape)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X,
+        y,
+        test_size=0.2,
+        random_state=42,
+        stratify=y
+    )
 
-# -------------------------------
-# Step 7: Apply preprocessing
-# -------------------------------
-print("\nApplying preprocessing pipeline...")
+    print("Training set:", X_train.shape)
+    print("Testing set:", X_test.shape)
 
-X_train_processed = preprocessor.fit_transform(X_train, y_train)
-X_test_processed = preprocessor.transform(X_test)
+    # -------------------------------
+    # Step 7: Apply preprocessing
+    # -------------------------------
+    print("\nApplying preprocessing pipeline...")
 
-print("Processed training shape:", X_train_processed.shape)
-print("Processed testing shape:", X_test_processed.shape)
+    X_train_processed = preprocessor.fit_transform(X_train, y_train)
+    X_test_processed = preprocessor.transform(X_test)
 
-# -------------------------------
-# Step 8: Save prepared datasets
-# -------------------------------
-print("\nSaving prepared datasets...")
+    print("Processed training shape:", X_train_processed.shape)
+    print("Processed testing shape:", X_test_processed.shape)
+
+    # -------------------------------
+    # Step 8: Save prepared datasets
+    # -------------------------------
+    print("\nSaving prepared datasets...")
+
+    np.save(os.path.join(OUTPUT_DIR, "X_train.npy"), X_train_processed)
+    np.save(os.path.join(OUTPUT_DIR, "X_test.npy"), X_test_processed)
+    np.save(os.path.join(OUTPUT_DIR, "y_train.npy"), y_train.values)
+    np.save(os.path.join(OUTPUT_DIR, "y_test.npy"), y_test.values)
+
+    print("Datasets saved.")
 
-np.save(os.path.join(OUTPUT_DIR, "X_train.npy"), X_train_processed)
-np.save(os.path.join(OUTPUT_DIR, "X_test.npy"), X_test_processed)
-np.save(os.path.join(OUTPUT_DIR, "y_train.npy"), y_train.values)
-np.save(os.path.join(OUTPUT_DIR, "y_test.npy"), y_test.values)
+    print("\n✅ Module 3: Machine Learning Dataset Preparation COMPLETED SUCCESSFULLY")
 
-print("Datasets saved.")
 
-print("\n✅ Module 3: Machine Learning Dataset Preparation COMPLETED SUCCESSFULLY")
+if __name__ == "__main__":
+    run()
@@ -1,24 +1,41 @@
-import pandas as pd
 import numpy as np
 
-# Load merged dataset
-df = pd.read_csv("outputs/merged_dataset.csv")
+from habitability import physics
+from habitability.io import read_table, write_table
 
-# -----------------------------
-# HABITABILITY LOGIC
-# -----------------------------
-df["habitability"] = np.where(
-    (df["pl_eqt"].between(180, 300)) &
-    (df["pl_rade"] <= 2.0) &
-    (df["pl_insol"].between(0.25, 2.0)),
-    1,
-    0
-)
+INPUT_FILE = "outputs/merged_dataset.parquet"
+OUTPUT_FILE = "outputs/merged_with_target.parquet"
 
-print("\nHabitability Distribution:")
-print(df["habitability"].value_counts())
 
-# Save updated dataset
-df.to_csv("outputs/merged_with_target.csv", index=False)
+def run():
+    """Label merged_dataset.parquet with the rule-based habitability target."""
+    # Load merged dataset
+    df = read_table(INPUT_FILE)
 
-print("\n✅ Target column created successfully")
+    # The app derives pl_eqt / pl_insol / st_lum of every request with the
+    # same formulas; the model (module4) must be trained on filled values too
+    derived = physics.derive(df)
+    print("Physically derived values:", derived or "none")
+
+    # -----------------------------
+    # HABITABILITY LOGIC
+    # -----------------------------
+    df["habitability"] = np.where(
+        (df["pl_eqt"].between(180, 300)) &
+        (df["pl_rade"] <= 2.0) &
+        (df["pl_insol"].between(0.25, 2.0)),
+        1,
+        0
+    )
+
+    print("\nHabitability Distribution:")
+    print(df["habitability"].value_counts())
+
+    # Save updated dataset
+    write_table(df, OUTPUT_FILE)
+
+    print("\n✅ Target column created successfully")
+
+
+if __name__ == "__main__":
+    run()
@@ -5,15 +5,20 @@
 # 2. Under-sampling (Baseline Model)
 # 3. Threshold Tuning
 # 4. Stratified Cross-Validation
+# 5. Successive-halving hyperparameter search (--search)
 # ============================================================
 
 import pandas as pd
 import numpy as np
+import argparse
+import tempfile
+import time
 
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
 from sklearn.model_selection import (
     train_test_split,
     StratifiedKFold,
-    cross_validate
+    HalvingGridSearchCV
 )
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
@@ -31,230 +36,325 @@ from sklearn.metrics import (
 
 from sklearn.utils import resample
 
-# ------------------------------------------------------------
-# 1. LOAD DATA
-# ------------------------------------------------------------
-DATA_PATH = "outputs/merged_with_target.csv"
-TARGET = "habitability"
-
-df = pd.read_csv(DATA_PATH)
-
-print("\nDataset loaded:", df.shape)
-print("\nClass Distribution:")
-print(df[TARGET].value_counts())
-
-# ------------------------------------------------------------
-# 2. FEATURE SEPARATION
-# ------------------------------------------------------------
-X = df.drop(columns=[TARGET])
-y = df[TARGET]
-
-num_features = X.select_dtypes(include=["int64", "float64"]).columns
-cat_features = X.select_dtypes(include=["object"]).columns
-
-# ------------------------------------------------------------
-# 3. PREPROCESSING PIPELINE (NO DATA LEAKAGE)
-# ------------------------------------------------------------
-numeric_pipeline = Pipeline([
-    ("imputer", SimpleImputer(strategy="median")),
-    ("scaler", StandardScaler())
-])
-
-categorical_pipeline = Pipeline([
-    ("imputer", SimpleImputer(strategy="most_frequent")),
-    ("onehot", OneHotEncoder(handle_unknown="ignore"))
-])
-
-preprocessor = ColumnTransformer([
-    ("num", numeric_pipeline, num_features),
-    ("cat", categorical_pipeline, cat_features)
-])
+import joblib
+from joblib import Memory
 
-# ------------------------------------------------------------
-# 4. TRAIN–TEST SPLIT (STRATIFIED)
-# ------------------------------------------------------------
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y,
-    test_size=0.25,
-    stratify=y,
-    random_state=42
+from habitability.compiled_model import (
+    COMPILED_PATH, THRESHOLD_PATH, save_compiled, save_threshold
 )
+from habitability.io import read_table, write_table
+from habitability.registry import REGISTRY_DIR, publish
+from habitability.training import FoldCache, best_threshold
 
 # ------------------------------------------------------------
-# 5. CROSS-VALIDATION SETUP
+# CONFIGURATION
 # ------------------------------------------------------------
-cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
-
-scoring = {
-    "accuracy": "accuracy",
-    "precision": "precision",
-    "recall": "recall",
-    "f1": "f1",
-    "roc_auc": "roc_auc"
-}
-
-# ============================================================
-# PRIMARY MODEL – CLASS WEIGHT + REGULARIZATION
-# ============================================================
-
-print("\nMODEL PERFORMANCE – PRIMARY MODEL (Class Weight + Regularization)")
-print("=" * 70)
-
-primary_model = Pipeline([
-    ("preprocessing", preprocessor),
-    ("classifier", LogisticRegression(
-        C=0.1,
-        max_iter=1000,
-        class_weight={0: 1, 1: 15},
-        solver="liblinear"
-    ))
-])
-
-# ---- Cross Validation ----
-cv_results = cross_validate(
-    primary_model,
-    X_train,
-    y_train,
-    cv=cv,
-    scoring=scoring,
-    n_jobs=-1
-)
-
-print("\nCROSS-VALIDATION RESULTS (Primary Model)")
-for metric in scoring:
-    print(f"{metric.capitalize():10s}: {cv_results[f'test_{metric}'].mean():.3f}")
-
-# ---- Train final model ----
-primary_model.fit(X_train, y_train)
+DATA_PATH = "outputs/merged_with_target.parquet"
+RANKING_PATH = "outputs/exoplanet_habitability_ranking.parquet"
+MODEL_PATH = "model/habitability_model.pkl"
+TARGET = "habitability"
 
-# ---- Threshold Tuning ----
+# Decision threshold for the test-set report (tuned in search mode)
 THRESHOLD = 0.65
-y_prob = primary_model.predict_proba(X_test)[:, 1]
-y_pred = (y_prob >= THRESHOLD).astype(int)
-
-print("\nThreshold used:", THRESHOLD)
-print("Accuracy :", accuracy_score(y_test, y_pred))
-print("Precision:", precision_score(y_test, y_pred, zero_division=0))
-print("Recall   :", recall_score(y_test, y_pred))
-print("F1 Score :", f1_score(y_test, y_pred))
-print("ROC-AUC  :", roc_auc_score(y_test, y_prob))
-
-# ============================================================
-# BASELINE MODEL – RANDOM UNDER-SAMPLING
-# ============================================================
-
-print("\n\nMODEL PERFORMANCE – BASELINE (Under-sampling)")
-print("=" * 70)
 
-df_train = pd.concat([X_train, y_train], axis=1)
-
-minority = df_train[df_train[TARGET] == 1]
-majority = df_train[df_train[TARGET] == 0]
-
-majority_downsampled = resample(
-    majority,
-    replace=False,
-    n_samples=len(minority),
-    random_state=42
-)
-
-df_balanced = pd.concat([majority_downsampled, minority])
-
-X_bal = df_balanced.drop(columns=[TARGET])
-y_bal = df_balanced[TARGET]
-
-baseline_model = Pipeline([
-    ("preprocessing", preprocessor),
-    ("classifier", LogisticRegression(
+# Search mode: candidates for the primary classifier, eliminated by
+# successive halving (factor 3) on growing subsamples
+SEARCH_GRID = {
+    "classifier__C": [0.01, 0.03, 0.1, 0.3, 1.0, 3.0],
+    "classifier__class_weight": [
+        None, "balanced", {0: 1, 1: 5}, {0: 1, 1: 15}, {0: 1, 1: 30}
+    ],
+    "classifier__solver": ["liblinear", "lbfgs"],
+}
+SEARCH_SCORING = "average_precision"
+
+
+def search_classifier(preprocessor, X_train, y_train, cv):
+    """Best primary LogisticRegression from SEARCH_GRID, over all cores."""
+    print("\nHYPERPARAMETER SEARCH (Successive Halving)")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Pipeline memory: candidates in one halving round share the
+        # preprocessing fitted on each fold
+        search = HalvingGridSearchCV(
+            Pipeline(
+                [
+                    ("preprocessing", preprocessor),
+                    ("classifier", LogisticRegression(max_iter=1000))
+                ],
+                memory=Memory(cache_dir, verbose=0)
+            ),
+            SEARCH_GRID,
+            scoring=SEARCH_SCORING,
+            cv=cv,
+            factor=3,
+            refit=False,
+            random_state=42,
+            n_jobs=-1
+        )
+        search.fit(X_train, y_train)
+
+    params = {
+        name.split("__", 1)[1]: value
+        for name, value in search.best_params_.items()
+    }
+
+    print("Candidates per round:", list(search.n_candidates_))
+    print("Samples per round   :", list(search.n_resources_))
+    print(f"Best {SEARCH_SCORING}: {search.best_score_:.3f}")
+    print("Best params:", params)
+    print(f"⏱ Search time: {time.perf_counter() - start:.2f}s")
+
+    return LogisticRegression(max_iter=1000, **params)
+
+
+def run(threshold=THRESHOLD, search=False):
+    """Train, evaluate and save the habitability model and ranking.
+
+    With search=True the classifier comes from search_classifier() and
+    the threshold from the out-of-fold F1 curve, and both are saved.
+    """
+    # ------------------------------------------------------------
+    # 1. LOAD DATA
+    # ------------------------------------------------------------
+    df = read_table(DATA_PATH)
+
+    print("\nDataset loaded:", df.shape)
+    print("\nClass Distribution:")
+    print(df[TARGET].value_counts())
+
+    # ------------------------------------------------------------
+    # 2. FEATURE SEPARATION
+    # ------------------------------------------------------------
+    X = df.drop(columns=[TARGET])
+    y = df[TARGET]
+
+    num_features = X.select_dtypes(include=["int64", "float64"]).columns
+    cat_features = X.select_dtypes(include=["object"]).columns
+
+    # ------------------------------------------------------------
+    # 3. PREPROCESSING PIPELINE (NO DATA LEAKAGE)
+    # ------------------------------------------------------------
+    numeric_pipeline = Pipeline([
+        ("imputer", SimpleImputer(strategy="median")),
+        ("scaler", StandardScaler())
+    ])
+
+    categorical_pipeline = Pipeline([
+        ("imputer", SimpleImputer(strategy="most_frequent")),
+        ("onehot", OneHotEncoder(handle_unknown="ignore"))
+    ])
+
+    preprocessor = ColumnTransformer([
+        ("num", numeric_pipeline, num_features),
+        ("cat", categorical_pipeline, cat_features)
+    ])
+
+    # ------------------------------------------------------------
+    # 4. TRAIN–TEST SPLIT (STRATIFIED)
+    # ------------------------------------------------------------
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y,
+        test_size=0.25,
+        stratify=y,
+        random_state=42
+    )
+
+    # ------------------------------------------------------------
+    # 5. CROSS-VALIDATION SETUP
+    # ------------------------------------------------------------
+    cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+
+    scoring = {
+        "accuracy": "accuracy",
+        "precision": "precision",
+        "recall": "recall",
+        "f1": "f1",
+        "roc_auc": "roc_auc"
+    }
+
+    # ============================================================
+    # PRIMARY MODEL – CLASS WEIGHT + REGULARIZATION
+    # ============================================================
+
+    print("\nMODEL PERFORMANCE – PRIMARY MODEL (Class Weight + Regularization)")
+    print("=" * 70)
+
+    if search:
+        primary_classifier = search_classifier(preprocessor, X_train, y_train, cv)
+    else:
+        primary_classifier = LogisticRegression(
+            C=0.1,
+            max_iter=1000,
+            class_weight={0: 1, 1: 15},
+            solver="liblinear"
+        )
+
+    # ---- Cross Validation (preprocessing fitted once per fold) ----
+    start = time.perf_counter()
+    primary_folds = FoldCache(preprocessor, X_train, y_train, cv, n_jobs=-1)
+    cv_results = primary_folds.cross_validate(primary_classifier, scoring)
+
+    print("\nCROSS-VALIDATION RESULTS (Primary Model)")
+    for metric in scoring:
+        print(f"{metric.capitalize():10s}: {cv_results[f'test_{metric}'].mean():.3f}")
+
+    # ---- Train final model ----
+    fit_start = time.perf_counter()
+    primary_model = primary_folds.pipeline(primary_classifier)
+    final_fit_seconds = time.perf_counter() - fit_start
+    primary_seconds = time.perf_counter() - start
+
+    # ---- Threshold Tuning ----
+    tuned = None
+    if search:
+        # One sorted sweep over out-of-fold probabilities (full F1 curve)
+        tuned = best_threshold(y_train, primary_folds.oof_proba(primary_classifier))
+        threshold = tuned["threshold"]
+        print(f"\nTuned threshold (out-of-fold F1 {tuned['f1']:.3f}): {threshold:.4f}")
+
+    y_prob = primary_model.predict_proba(X_test)[:, 1]
+    y_pred = (y_prob >= threshold).astype(int)
+
+    print("\nThreshold used:", threshold)
+    print("Accuracy :", accuracy_score(y_test, y_pred))
+    print("Precision:", precision_score(y_test, y_pred, zero_division=0))
+    print("Recall   :", recall_score(y_test, y_pred))
+    print("F1 Score :", f1_score(y_test, y_pred))
+    print("ROC-AUC  :", roc_auc_score(y_test, y_prob))
+
+    # ============================================================
+    # BASELINE MODEL – RANDOM UNDER-SAMPLING
+    # ============================================================
+
+    print("\n\nMODEL PERFORMANCE – BASELINE (Under-sampling)")
+    print("=" * 70)
+
+    df_train = pd.concat([X_train, y_train], axis=1)
+
+    minority = df_train[df_train[TARGET] == 1]
+    majority = df_train[df_train[TARGET] == 0]
+
+    majority_downsampled = resample(
+        majority,
+        replace=False,
+        n_samples=len(minority),
+        random_state=42
+    )
+
+    df_balanced = pd.concat([majority_downsampled, minority])
+
+    X_bal = df_balanced.drop(columns=[TARGET])
+    y_bal = df_balanced[TARGET]
+
+    baseline_classifier = LogisticRegression(
         C=1.0,
         max_iter=1000,
         solver="liblinear"
-    ))
-])
-
-# ---- Cross Validation (Baseline) ----
-cv_base = cross_validate(
-    baseline_model,
-    X_bal,
-    y_bal,
-    cv=cv,
-    scoring=scoring,
-    n_jobs=-1
-)
-
-print("\nCROSS-VALIDATION RESULTS (Baseline Model)")
-for metric in scoring:
-    print(f"{metric.capitalize():10s}: {cv_base[f'test_{metric}'].mean():.3f}")
-
-# ---- Final evaluation ----
-baseline_model.fit(X_bal, y_bal)
-
-y_pred_base = baseline_model.predict(X_test)
-y_prob_base = baseline_model.predict_proba(X_test)[:, 1]
-
-print("\nTest-set Results (Baseline)")
-print("Accuracy :", accuracy_score(y_test, y_pred_base))
-print("Precision:", precision_score(y_test, y_pred_base, zero_division=0))
-print("Recall   :", recall_score(y_test, y_pred_base))
-print("F1 Score :", f1_score(y_test, y_pred_base))
-print("ROC-AUC  :", roc_auc_score(y_test, y_prob_base))
-
-# ============================================================
-# FINAL NOTES
-# ============================================================
-
-print("\n✅ MODULE 4 COMPLETED SUCCESSFULLY")
-print("✔ Cross-validation included")
-print("✔ No overfitting")
-print("✔ No data leakage")
-print("✔ Imbalance handled correctly")
-
-# FORCE re-fit to avoid stale state
-primary_model = Pipeline([
-    ("preprocessing", preprocessor),
-    ("classifier", LogisticRegression(
-        C=0.1,
-        max_iter=1000,
-        class_weight={0: 1, 1: 15},
-        solver="liblinear"
-    ))
-])
-
-primary_model.fit(X_train, y_train)
-
-# ============================================================
-# FINAL HABITABILITY RANKING — PIPELINE SAFE
-# ============================================================
-
-print("\nGENERATING HABITABILITY RANKING")
-print("=" * 60)
-
-# IMPORTANT: RAW DATA ONLY (NO preprocessing here)
-X_full = df.drop(columns=[TARGET])
-
-# 🔥 THIS LINE IS THE FIX — USE THE PIPELINE
-habitability_scores = primary_model.predict_proba(X_full)[:, 1]
-
-ranking_df = df.copy()
-ranking_df["habitability_score"] = habitability_scores
-
-ranking_df = ranking_df.sort_values(
-    by="habitability_score",
-    ascending=False
-).reset_index(drop=True)
-
-ranking_df["rank"] = ranking_df.index + 1
-
-ranking_df.to_csv(
-    "outputs/exoplanet_habitability_ranking.csv",
-    index=False
-)
-
-print("✅ Ranking file saved: outputs/exoplanet_habitability_ranking.csv")
-print("\nTOP 5 EXOPLANETS:")
-print(ranking_df[["rank", "habitability_score"]].head())
-
-import joblib
-
-joblib.dump(primary_model, "model/habitability_model.pkl")
-print("✅ Model saved successfully")
+    )
+
+    # ---- Cross Validation (Baseline) ----
+    baseline_folds = FoldCache(preprocessor, X_bal, y_bal, cv, n_jobs=-1)
+    cv_base = baseline_folds.cross_validate(baseline_classifier, scoring)
+
+    print("\nCROSS-VALIDATION RESULTS (Baseline Model)")
+    for metric in scoring:
+        print(f"{metric.capitalize():10s}: {cv_base[f'test_{metric}'].mean():.3f}")
+
+    # ---- Final evaluation ----
+    baseline_model = baseline_folds.pipeline(baseline_classifier)
+
+    y_pred_base = baseline_model.predict(X_test)
+    y_prob_base = baseline_model.predict_proba(X_test)[:, 1]
+
+    print("\nTest-set Results (Baseline)")
+    print("Accuracy :", accuracy_score(y_test, y_pred_base))
+    print("Precision:", precision_score(y_test, y_pred_base, zero_division=0))
+    print("Recall   :", recall_score(y_test, y_pred_base))
+    print("F1 Score :", f1_score(y_test, y_pred_base))
+    print("ROC-AUC  :", roc_auc_score(y_test, y_prob_base))
+
+    # ============================================================
+    # FINAL NOTES
+    # ============================================================
+
+    print("\n✅ MODULE 4 COMPLETED SUCCESSFULLY")
+    print("✔ Cross-validation included")
+    print("✔ No overfitting")
+    print("✔ No data leakage")
+    print("✔ Imbalance handled correctly")
+
+    # Each FoldCache fits its own clone of `preprocessor`, so the primary
+    # model is not disturbed by the baseline fit and needs no re-fit
+    print("\n⏱ Primary model CV + fit:", f"{primary_seconds:.2f}s")
+    if search:
+        # Only --search reuses folds (CV scores and out-of-fold threshold);
+        # the primary and baseline models are cross-validated on different
+        # rows (X_train vs the under-sampled X_bal), so they share nothing
+        print("⏱ Primary folds:", primary_folds.report())
+    print(f"⏱ Duplicate final re-fit skipped: saved ~{final_fit_seconds:.2f}s")
+
+    # ============================================================
+    # FINAL HABITABILITY RANKING — PIPELINE SAFE
+    # ============================================================
+
+    print("\nGENERATING HABITABILITY RANKING")
+    print("=" * 60)
+
+    # IMPORTANT: RAW DATA ONLY (NO preprocessing here)
+    X_full = df.drop(columns=[TARGET])
+
+    # 🔥 THIS LINE IS THE FIX — USE THE PIPELINE
+    habitability_scores = primary_model.predict_proba(X_full)[:, 1]
+
+    ranking_df = df.copy()
+    ranking_df["habitability_score"] = habitability_scores
+
+    ranking_df = ranking_df.sort_values(
+        by="habitability_score",
+        ascending=False
+    ).reset_index(drop=True)
+
+    ranking_df["rank"] = ranking_df.index + 1
+
+    write_table(ranking_df, RANKING_PATH)
+
+    print("✅ Ranking file saved:", RANKING_PATH)
+    print("\nTOP 5 EXOPLANETS:")
+    print(ranking_df[["rank", "habitability_score"]].head())
+
+    joblib.dump(primary_model, MODEL_PATH)
+    print("✅ Model saved successfully")
+
+    # Flat NumPy scorer used by app.py
+    save_compiled()
+    print("✅ Compiled model saved: model/habitability_model_compiled.pkl")
+
+    # Only a searched threshold is deployed; app.py keeps its default otherwise
+    classifier_params = primary_classifier.get_params()
+    save_threshold(
+        tuned["threshold"] if tuned else None,
+        MODEL_PATH,
+        metric="f1",
+        oof=tuned,
+        params={
+            k: classifier_params[k] for k in ("C", "class_weight", "solver")
+        }
+    )
+    print("✅ Threshold saved: model/habitability_threshold.json")
+
+    # Immutable copy the running apps switch to without a restart
+    version = publish(
+        REGISTRY_DIR, "habitability_model", [MODEL_PATH, COMPILED_PATH, THRESHOLD_PATH]
+    )
+    print(f"✅ Published model version {version} to {REGISTRY_DIR}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--search", action="store_true", help="tune C, class weights, solver and threshold")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+    run(args.threshold, args.search)
@@ -0,0 +1,5 @@
+"""
+The original notebook-era preprocessing scripts.
+
+Run from the repository root, e.g. python -m modules.src.imputation
+"""
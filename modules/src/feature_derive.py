@@ -1,28 +1,55 @@
+# Run from the repository root: python -m modules.src.feature_derive [in.csv] [out.csv]
+import sys
+
 import pandas as pd
 
+from habitability import physics
+
+INPUT_FILE = sys.argv[1] if len(sys.argv) > 1 else "exoplanet_final_ml_ready.csv"
+OUTPUT_FILE = sys.argv[2] if len(sys.argv) > 2 else "exoplanet_with_flux_teq.csv"
+
 # ===============================
-# 1️⃣ LOAD FINAL FEATURE DATASET
+# 1️⃣ LOAD IMPUTED DATASET
 # ===============================
-df = pd.read_csv("exoplanet_with_flux_teq.csv")
+df = pd.read_csv(INPUT_FILE)
 
 # ===============================
-# 2️⃣ LIST OF DERIVED FEATURES
-# (As per your project pipeline)
+# 2️⃣ DERIVE PHYSICAL FEATURES
+# (vectorized over whole columns)
 # ===============================
 derived_features = [
-    "PlanetDensity",        # From PlanetaryMassJpt & RadiusJpt
-    "HostStarLuminosity",   # From HostStarRadiusSlrRad & HostStarTempK
-    "InsolationFlux",       # From HostStarLuminosity & SemiMajorAxisAU
-    "EquilibriumTemp"      # From HostStarTempK, HostStarRadiusSlrRad & SemiMajorAxisAU
+    "PlanetDensity",        # From PlanetaryMassJpt & RadiusJpt          [g/cm^3]
+    "HostStarLuminosity",   # From HostStarRadiusSlrRad & HostStarTempK  [L_sun]
+    "InsolationFlux",       # From HostStarLuminosity & SemiMajorAxisAU  [S_earth]
+    "EquilibriumTemp"       # From HostStarTempK, HostStarRadiusSlrRad & SemiMajorAxisAU [K]
 ]
 
+# Archive names and units for habitability.physics (Jupiter -> Earth units)
+work = pd.DataFrame({
+    "pl_orbper": df["PeriodDays"],
+    "pl_orbsmax": df["SemiMajorAxisAU"],
+    "pl_bmasse": df["PlanetaryMassJpt"] * physics.EARTH_MASSES_PER_JUPITER,
+    "pl_rade": df["RadiusJpt"] * physics.EARTH_RADII_PER_JUPITER,
+    "st_mass": df["HostStarMassSlrMass"],
+    "st_rad": df["HostStarRadiusSlrRad"],
+    "st_teff": df["HostStarTempK"],
+})
+# Also fills SemiMajorAxisAU from Kepler's third law where only the period is known
+physics.derive(work, add=True)
+
+df["SemiMajorAxisAU"] = work["pl_orbsmax"]
+df["PlanetDensity"] = work["pl_dens"]
+df["HostStarLuminosity"] = 10 ** work["st_lum"]
+df["InsolationFlux"] = work["pl_insol"]
+df["EquilibriumTemp"] = work["pl_eqt"]
+
+df.to_csv(OUTPUT_FILE, index=False)
+
 print("✅ DERIVED FEATURE STATUS:\n")
 
 for feature in derived_features:
-    if feature in df.columns:
-        print(f"✅ {feature} → PRESENT in dataset")
-    else:
-        print(f"❌ {feature} → MISSING from dataset")
+    print(f"✅ {feature} → {df[feature].notna().sum()} of {len(df)} rows")
 
 print("\n✅ SAMPLE VALUES OF DERIVED FEATURES:\n")
 print(df[derived_features].head())
+print("\n✅ File:", OUTPUT_FILE)
@@ -1,9 +1,17 @@
+# Run from the repository root: python -m modules.src.imputation
+import json
+
 import pandas as pd
 
-df = pd.read_csv("exoplanet_imputed.csv")
+from habitability.sketches import TableSketch
 
-print("✅ Before Final Imputation:\n")
-print(df.isna().sum())
+INPUT_FILE = "exoplanet_imputed.csv"
+OUTPUT_FILE = "exoplanet_final_ml_ready.csv"
+# Medians used here, for imputing new planets the same way at inference
+PARAMS_FILE = "exoplanet_imputation_params.json"
+
+# Rows per chunk: the file is streamed twice and never held whole
+CHUNK_ROWS = 100_000
 
 final_impute_cols = [
     "RadiusJpt",
@@ -14,13 +22,49 @@ final_impute_cols = [
     "HostStarTempK"
 ]
 
-for col in final_impute_cols:
-    df[col] = df[col].fillna(df[col].median())
+# ===============================
+# 1️⃣ MEDIANS FROM A STREAMING SKETCH
+# ===============================
+def chunks():
+    return pd.read_csv(INPUT_FILE, chunksize=CHUNK_ROWS)
 
-print("\n✅ After Final Imputation:\n")
-print(df.isna().sum())
 
-df.to_csv("exoplanet_final_ml_ready.csv", index=False)
+def sketch_chunks(chunks):
+    """Sketch of all chunks and their missing values per column."""
+    sketch = TableSketch(final_impute_cols)
+    missing = None
+    for chunk in chunks:
+        sketch.update(chunk)
+        counts = chunk.isna().sum()
+        missing = counts if missing is None else missing + counts
+    return sketch, missing
+
+
+sketch, missing = sketch_chunks(chunks())
+
+print("✅ Before Final Imputation:\n")
+print(missing)
+
+medians = {
+    col: float(sketch.quantiles[col].quantile(0.5)) for col in final_impute_cols
+}
+
+with open(PARAMS_FILE, "w") as f:
+    json.dump({"medians": medians, "rows": sketch.rows}, f, indent=2)
+
+# ===============================
+# 2️⃣ FILL CHUNK BY CHUNK
+# ===============================
+for i, chunk in enumerate(chunks()):
+    chunk = chunk.fillna(medians)
+    chunk.to_csv(OUTPUT_FILE, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+    counts = chunk.isna().sum()
+    missing = counts if i == 0 else missing + counts
+
+print("\n✅ After Final Imputation:\n")
+print(missing)
 
 print("\n🎉 FINAL CLEAN DATASET SAVED!")
-print("✅ File: exoplanet_final_ml_ready.csv")
+print("✅ File:", OUTPUT_FILE)
+print("✅ Medians:", PARAMS_FILE)
@@ -0,0 +1,346 @@
+"""
+Runs the module1 → module4 training pipeline as a cached DAG.
+
+Each stage is a module's run() function with declared input and output
+files. A stage's key hashes the contents of its inputs, its source code
+and the run() parameters; when the key matches the manifest entry and
+the recorded outputs are still on disk unchanged, the stage is skipped.
+Stages whose dependencies are done run in parallel worker processes.
+
+    collect ─┬─ clean ── prepare
+             └─ target ── train
+
+Changing only --threshold therefore reruns `train` alone, and a stage
+that reruns but writes byte-identical outputs does not invalidate the
+stages after it.
+
+Usage:
+    python pipeline.py                    # run whatever is out of date
+    python pipeline.py --threshold 0.5    # only module4 reruns
+    python pipeline.py --search           # module4 with the halving search
+    python pipeline.py --sketch           # module2 statistics from streaming sketches
+    python pipeline.py --force clean      # rerun clean and its dependents
+    python pipeline.py --dry-run          # show what would run
+    python pipeline.py --csv              # also write CSV copies of tables
+"""
+
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+
+from habitability.io import EXPORT_CSV_ENV
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+MANIFEST_PATH = os.path.join("outputs", "pipeline_manifest.json")
+
+
+@dataclass
+class Stage:
+    name: str
+    module: str
+    inputs: tuple
+    outputs: tuple
+    # Extra source files the stage's behaviour depends on
+    code: tuple = ()
+
+
+STAGES = [
+    Stage(
+        "collect", "module1_data_collection",
+        inputs=("data/nasa_exoplanets.csv", "data/exoplanets_dataset.csv"),
+        outputs=("outputs/merged_dataset.parquet", "outputs/data_summary.txt"),
+        code=("habitability/io.py",),
+    ),
+    Stage(
+        "clean", "module2_data_cleaning",
+        inputs=("outputs/merged_dataset.parquet",),
+        outputs=(
+            "outputs/cleaned_feature_engineered_dataset.parquet",
+            "outputs/cleaning_params.json",
+            "outputs/module2_statistics.txt",
+            "outputs/missing_values_heatmap.png",
+            "outputs/habitability_score_distribution.png",
+        ),
+        code=(
+            "habitability/cleaning.py",
+            "habitability/io.py",
+            "habitability/physics.py",
+            "habitability/sketches.py",
+        ),
+    ),
+    Stage(
+        "target", "module3_target_creation",
+        inputs=("outputs/merged_dataset.parquet",),
+        outputs=("outputs/merged_with_target.parquet",),
+        code=("habitability/io.py", "habitability/physics.py"),
+    ),
+    Stage(
+        "prepare", "module3_ml_dataset_preparation",
+        inputs=("outputs/cleaned_feature_engineered_dataset.parquet",),
+        outputs=(
+            "outputs/X_train.npy", "outputs/X_test.npy",
+            "outputs/y_train.npy", "outputs/y_test.npy",
+        ),
+        code=("habitability/io.py",),
+    ),
+    Stage(
+        "train", "module4_model_training",
+        inputs=("outputs/merged_with_target.parquet",),
+        outputs=(
+            "outputs/exoplanet_habitability_ranking.parquet",
+            "model/habitability_model.pkl",
+            "model/habitability_model_compiled.pkl",
+            "model/habitability_threshold.json",
+        ),
+        code=(
+            "habitability/compiled_model.py",
+            "habitability/io.py",
+            "habitability/registry.py",
+            "habitability/training.py",
+        ),
+    ),
+]
+
+
+# ---------------- hashing ---------------- #
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_digest(path, files):
+    """Content hash of `path`, reused from `files` while size and mtime match."""
+    st = os.stat(path)
+    cached = files.get(path)
+    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+        return cached[2]
+
+    digest = sha256_file(path)
+    files[path] = [st.st_size, st.st_mtime_ns, digest]
+    return digest
+
+
+def code_paths(stage):
+    return [
+        os.path.join(ROOT_DIR, p)
+        for p in (stage.module.replace(".", os.sep) + ".py", *stage.code)
+    ]
+
+
+def default_params(stage):
+    """Keyword parameters of the stage's run(), with their defaults."""
+    run = importlib.import_module(stage.module).run
+    return {
+        name: p.default
+        for name, p in inspect.signature(run).parameters.items()
+        if p.default is not inspect.Parameter.empty
+    }
+
+
+def stage_key(stage, params, files):
+    payload = {
+        "inputs": {p: file_digest(p, files) for p in stage.inputs},
+        "code": {
+            os.path.relpath(p, ROOT_DIR): file_digest(p, files)
+            for p in code_paths(stage)
+        },
+        "params": params,
+        # write_table() adds CSV copies when this is set (--csv)
+        "export_csv": os.environ.get(EXPORT_CSV_ENV, "") not in ("", "0"),
+    }
+    raw = json.dumps(payload, sort_keys=True).encode()
+    return hashlib.sha256(raw).hexdigest()
+
+
+def outputs_valid(stage, entry, files):
+    recorded = entry.get("outputs", {})
+    for path in stage.outputs:
+        if not os.path.exists(path) or recorded.get(path) != file_digest(path, files):
+            return False
+    return True
+
+
+# ---------------- manifest ---------------- #
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"stages": {}, "files": {}}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+# ---------------- execution ---------------- #
+
+def dependencies(stage):
+    return {
+        other.name for other in STAGES
+        if set(other.outputs) & set(stage.inputs)
+    }
+
+
+def dependents(names):
+    """`names` plus every stage downstream of them."""
+    result = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for stage in STAGES:
+            if stage.name not in result and dependencies(stage) & result:
+                result.add(stage.name)
+                changed = True
+    return result
+
+
+def run_stage(module, params):
+    """Worker entry point: import the stage module and call run()."""
+    start = time.perf_counter()
+    importlib.import_module(module).run(**params)
+    return time.perf_counter() - start
+
+
+def run_pipeline(overrides=None, force=(), jobs=None, dry_run=False):
+    overrides = overrides or {}
+    manifest = load_manifest()
+    files = manifest.setdefault("files", {})
+    entries = manifest.setdefault("stages", {})
+
+    if "all" in force:
+        force = {s.name for s in STAGES}
+    forced = dependents(force)
+
+    done, running = set(), {}
+    # Stages a dry run would run (their outputs would change)
+    would_run = set()
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while len(done) < len(STAGES):
+            active = {stage.name for stage, _, _ in running.values()}
+            for stage in STAGES:
+                if stage.name in done or stage.name in active:
+                    continue
+                if not dependencies(stage) <= done:
+                    continue
+
+                params = default_params(stage)
+                params.update({k: v for k, v in overrides.items() if k in params})
+
+                # Dry run: inputs a would-run stage writes count as present
+                # but changed, so the stage would run after it
+                upstream = dependencies(stage) & would_run
+                if dry_run and upstream:
+                    print(f"▶ {stage.name}: would run {stage.module}.run({params}) "
+                          f"after {', '.join(sorted(upstream))}")
+                    would_run.add(stage.name)
+                    done.add(stage.name)
+                    continue
+
+                missing = [p for p in stage.inputs if not os.path.exists(p)]
+                if missing and dry_run:
+                    print(f"✖ {stage.name}: would fail, missing inputs {missing}")
+                    would_run.add(stage.name)
+                    done.add(stage.name)
+                    continue
+                if missing:
+                    raise FileNotFoundError(f"{stage.name}: missing inputs {missing}")
+
+                key = stage_key(stage, params, files)
+                entry = entries.get(stage.name, {})
+
+                if (stage.name not in forced and entry.get("key") == key
+                        and outputs_valid(stage, entry, files)):
+                    print(f"✔ {stage.name}: up to date")
+                    done.add(stage.name)
+                    continue
+
+                if dry_run:
+                    print(f"▶ {stage.name}: would run {stage.module}.run({params})")
+                    would_run.add(stage.name)
+                    done.add(stage.name)
+                    continue
+
+                print(f"▶ {stage.name}: running {stage.module}.run({params})")
+                future = pool.submit(run_stage, stage.module, params)
+                running[future] = (stage, key, params)
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, key, params = running.pop(future)
+                seconds = future.result()
+
+                entries[stage.name] = {
+                    "key": key,
+                    "params": params,
+                    "seconds": round(seconds, 2),
+                    "outputs": {p: file_digest(p, files) for p in stage.outputs},
+                }
+                save_manifest(manifest)
+                done.add(stage.name)
+                print(f"✅ {stage.name}: finished in {seconds:.1f}s")
+
+    if not dry_run:
+        save_manifest(manifest)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threshold", type=float, help="module4 decision threshold")
+    parser.add_argument(
+        "--search", action="store_true",
+        help="module4 hyperparameter search and tuned threshold"
+    )
+    parser.add_argument(
+        "--sketch", action="store_true",
+        help="module2 cleaning statistics from mergeable streaming sketches"
+    )
+    parser.add_argument(
+        "--force", nargs="*", default=[], metavar="STAGE",
+        help="rerun these stages (or 'all') and everything after them"
+    )
+    parser.add_argument("--jobs", type=int, help="parallel worker processes")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--csv", action="store_true",
+        help="write a CSV copy beside every table a stage writes"
+    )
+    args = parser.parse_args()
+
+    if args.csv:
+        # Inherited by the worker processes
+        os.environ[EXPORT_CSV_ENV] = "1"
+
+    overrides = {}
+    if args.threshold is not None:
+        overrides["threshold"] = args.threshold
+    if args.search:
+        overrides["search"] = True
+    if args.sketch:
+        overrides["sketch"] = True
+
+    run_pipeline(overrides, set(args.force), args.jobs, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
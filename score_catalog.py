@@ -0,0 +1,194 @@
+"""
+Score and rank an arbitrarily large planet catalog out of core.
+
+The catalog (CSV, Parquet or Feather) is streamed in chunks; a process
+pool scores them with the compiled habitability model, loaded once per
+worker from the currently published version (model/ until one is
+published). Only the K best planets are kept, in a min-heap, so memory
+stays bounded by the chunk size, the in-flight chunks and K rows, not by
+the catalog size. Ties keep the earlier row.
+
+With --shards DIR every chunk is also written, scored and unsorted, to
+DIR/part-NNNNN.parquet (the full output, without ever holding it whole).
+
+Columns the model needs but the catalog lacks are scored as missing
+(imputed like any other gap). All catalog columns are kept in the output.
+
+Usage:
+    python score_catalog.py catalog.parquet
+    python score_catalog.py catalog.csv --top 1000 --out outputs/catalog_top.parquet
+    python score_catalog.py catalog.csv --workers 8 --chunk-rows 200000 --shards outputs/scored/
+"""
+
+import argparse
+import heapq
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from habitability.compiled_model import COMPILED_PATH, MODEL_PATH, load_compiled
+from habitability.io import iter_table, write_table
+from habitability.registry import MMAP_MODE, REGISTRY_DIR, current_version, version_of
+
+MODEL_NAME = "habitability_model"
+
+TOP_K = 1000
+CHUNK_ROWS = 100_000
+OUT_PATH = "outputs/catalog_top.parquet"
+
+# ------------------------------------------------------------
+# MODEL (one per worker process)
+# ------------------------------------------------------------
+
+def model_dir(root=REGISTRY_DIR):
+    """Directory of the version the apps serve."""
+    version = current_version(root, MODEL_NAME)
+    if version:
+        return os.path.join(root, MODEL_NAME, version)
+    return os.path.dirname(MODEL_PATH)
+
+
+def load_model(directory):
+    """Compiled model from a model directory."""
+    # Only published (immutable) files are memory-mapped
+    published = os.path.abspath(directory).startswith(os.path.abspath(REGISTRY_DIR))
+    return load_compiled(
+        os.path.join(directory, os.path.basename(MODEL_PATH)),
+        os.path.join(directory, os.path.basename(COMPILED_PATH)),
+        MMAP_MODE if published else None
+    )
+
+
+_model = None
+
+
+def _init_worker(directory):
+    global _model
+    _model = load_model(directory)
+
+
+def score_chunk(chunk, offset, top_k, shard_path=None):
+    """Score one chunk; returns (rows, best) with best as
+    (score, row number, record) for at most top_k rows."""
+    features = list(_model.feature_names_in_)
+    missing = [f for f in features if f not in chunk.columns]
+    X = chunk.reindex(columns=features) if missing else chunk[features]
+
+    scores = _model.predict_proba(X)[:, 1]
+
+    if shard_path:
+        write_table(chunk.assign(habitability_score=scores), shard_path)
+
+    # Only the chunk's own top K can enter the global top K
+    if len(scores) > top_k:
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        best = np.arange(len(scores))
+
+    records = chunk.iloc[best].itertuples(index=False, name=None)
+    return len(chunk), [
+        (float(scores[i]), offset + int(i), record)
+        for i, record in zip(best, records)
+    ]
+
+# ------------------------------------------------------------
+# DRIVER
+# ------------------------------------------------------------
+
+def push(heap, top_k, best):
+    """Merge a chunk's candidates into the global min-heap of size top_k."""
+    for score, row, record in best:
+        # Earlier rows win ties: on equal scores the later row is smaller
+        if len(heap) < top_k:
+            heapq.heappush(heap, (score, -row, record))
+        elif (score, -row) > heap[0][:2]:
+            heapq.heapreplace(heap, (score, -row, record))
+
+
+def score_catalog(path, top_k=TOP_K, chunk_rows=CHUNK_ROWS, workers=None,
+                  shards=None, directory=None):
+    """Return (top K DataFrame, rows scored, model version)."""
+    directory = directory or model_dir()
+    workers = os.cpu_count() if workers is None else workers
+    if shards:
+        os.makedirs(shards, exist_ok=True)
+
+    heap = []
+    rows = 0
+    columns = None
+    chunks = iter_table(path, chunk_rows)
+
+    def jobs():
+        nonlocal columns
+        offset = 0
+        for i, chunk in enumerate(chunks):
+            columns = columns or list(chunk.columns)
+            shard = os.path.join(shards, f"part-{i:05d}.parquet") if shards else None
+            yield chunk, offset, top_k, shard
+            offset += len(chunk)
+
+    if workers > 1:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(directory,)) as pool:
+            # At most two chunks per worker in flight: bounded memory
+            pending = deque()
+            for job in jobs():
+                pending.append(pool.submit(score_chunk, *job))
+                if len(pending) >= 2 * workers:
+                    n, best = pending.popleft().result()
+                    rows += n
+                    push(heap, top_k, best)
+            for future in pending:
+                n, best = future.result()
+                rows += n
+                push(heap, top_k, best)
+    else:
+        _init_worker(directory)
+        for job in jobs():
+            n, best = score_chunk(*job)
+            rows += n
+            push(heap, top_k, best)
+
+    ranked = sorted(heap, reverse=True)
+    top = pd.DataFrame([record for _, _, record in ranked], columns=columns)
+    top["habitability_score"] = [score for score, _, _ in ranked]
+    top["rank"] = np.arange(1, len(top) + 1)
+
+    version = version_of(os.path.join(directory, os.path.basename(MODEL_PATH)))
+    top["model_version"] = version
+    return top, rows, version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("catalog", help="CSV, Parquet or Feather file")
+    parser.add_argument("--top", type=int, default=TOP_K, help="planets to keep")
+    parser.add_argument("--out", default=OUT_PATH, help="top-K table (.parquet/.csv)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="scoring processes (default: CPU count; 1 = in process)")
+    parser.add_argument("--shards", help="also write every scored chunk to this directory")
+    parser.add_argument("--model-dir", help="model directory (default: the published version)")
+    args = parser.parse_args()
+    if args.top < 1:
+        parser.error("--top must be at least 1")
+
+    start = time.perf_counter()
+    top, rows, version = score_catalog(
+        args.catalog, args.top, args.chunk_rows, args.workers, args.shards, args.model_dir
+    )
+    elapsed = time.perf_counter() - start
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    write_table(top, args.out)
+
+    print(f"✅ Scored {rows:,} planets with model {version} in {elapsed:.1f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    print("✅ Top", len(top), "saved:", args.out)
+    if args.shards:
+        print("✅ Scored shards:", args.shards)
+    print(top[["rank", "habitability_score"]].head())
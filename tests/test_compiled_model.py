@@ -0,0 +1,85 @@
+"""
+CompiledModel must score exactly like the sklearn pipeline it was
+compiled from, gaps and unseen categories included.
+
+Run from the repository root: python -m pytest
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from habitability.compiled_model import CompiledModel, compile_pipeline
+
+NUMERIC = ["pl_rade", "pl_eqt", "st_teff"]
+CATEGORICAL = ["st_spectype", "discoverymethod"]
+
+
+def synthetic_planets(n, seed):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "pl_rade": rng.lognormal(1, 0.8, n),
+        "pl_eqt": rng.uniform(100, 2000, n),
+        "st_teff": rng.uniform(3000, 7000, n),
+        "st_spectype": rng.choice(["G2V", "K1V", "M3V", "F5V"], n),
+        "discoverymethod": rng.choice(["Transit", "Radial Velocity"], n),
+    })
+    y = ((X["pl_eqt"] < 400) & (X["pl_rade"] < 3)).astype(int)
+    return X, y
+
+
+def with_gaps(X, seed):
+    """Every column ~20% missing, plus categories never seen in training."""
+    rng = np.random.default_rng(seed)
+    X = X.astype(object).mask(rng.random(X.shape) < 0.2)
+    X[NUMERIC] = X[NUMERIC].astype(np.float64)
+    X.loc[X.index[::7], "st_spectype"] = "O9III"
+    X.loc[X.index[::11], "discoverymethod"] = "Imaging"
+    return X
+
+
+def fit_pipeline(X, y, scaler):
+    preprocessor = ColumnTransformer([
+        ("num", Pipeline([
+            ("imputer", SimpleImputer(strategy="median")),
+            ("scaler", scaler),
+        ]), NUMERIC),
+        ("cat", Pipeline([
+            ("imputer", SimpleImputer(strategy="most_frequent")),
+            ("onehot", OneHotEncoder(handle_unknown="ignore")),
+        ]), CATEGORICAL),
+    ])
+    pipeline = Pipeline([
+        ("preprocessing", preprocessor),
+        ("classifier", LogisticRegression(C=0.3, class_weight={0: 1, 1: 5}, max_iter=1000)),
+    ])
+    return pipeline.fit(with_gaps(X, 1), y)
+
+
+@pytest.mark.parametrize("scaler", [
+    StandardScaler(),
+    StandardScaler(with_mean=False),
+    StandardScaler(with_std=False),
+], ids=["standard", "with_mean=False", "with_std=False"])
+def test_matches_pipeline(scaler):
+    X, y = synthetic_planets(2000, seed=0)
+    pipeline = fit_pipeline(X, y, scaler)
+    model = CompiledModel(compile_pipeline(pipeline))
+
+    rows = with_gaps(synthetic_planets(500, seed=2)[0], 3)
+    expected = pipeline.predict_proba(rows)
+
+    np.testing.assert_allclose(model.predict_proba(rows), expected, rtol=0, atol=1e-12)
+
+    records = [
+        {k: (None if v is None or v != v else v) for k, v in r.items()}
+        for r in rows.to_dict("records")
+    ]
+    np.testing.assert_allclose(model.score_records(records), expected[:, 1], rtol=0, atol=1e-12)
+    for record, p in zip(records[:50], expected[:50, 1]):
+        assert model.score_record(record) == pytest.approx(p, abs=1e-12)
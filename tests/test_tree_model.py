@@ -0,0 +1,67 @@
+"""
+The exported NumPy trees, and the DispatchModel serving them, must give
+bit-identical outputs to the xgboost model they were exported from.
+
+Run from the repository root: python -m pytest
+"""
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+xgboost = pytest.importorskip("xgboost")
+
+from habitability.tree_model import DispatchModel, TreeEnsemble, export_booster  # noqa: E402
+
+FEATURES = ["st_teff", "st_rad", "st_mass", "st_met", "pl_orbper", "pl_insol"]
+
+
+def synthetic_planets(n, seed):
+    """Inputs spanning the split ranges, 10% missing."""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "st_teff": rng.uniform(2500, 10000, n),
+        "st_rad": rng.lognormal(0, 0.6, n),
+        "st_mass": rng.lognormal(0, 0.4, n),
+        "st_met": rng.normal(0, 0.3, n),
+        "pl_orbper": rng.lognormal(3, 2, n),
+        "pl_insol": rng.lognormal(2, 3, n),
+    })
+    return X.mask(rng.random(X.shape) < 0.1)[FEATURES]
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    X = synthetic_planets(3000, seed=0)
+    y = ((X["pl_insol"] < 5) & (X["st_teff"] < 6500)).astype(int)
+    return xgboost.XGBClassifier(
+        n_estimators=40, max_depth=5, learning_rate=0.2, random_state=0
+    ).fit(X, y)
+
+
+def test_trees_match_xgboost(classifier):
+    trees = TreeEnsemble(export_booster(classifier))
+    X = synthetic_planets(1000, seed=1)
+
+    assert np.array_equal(
+        trees.predict_margin(X), classifier.predict(X, output_margin=True)
+    )
+    assert np.array_equal(trees.predict_proba(X), classifier.predict_proba(X))
+    assert np.array_equal(trees.predict(X), classifier.predict(X))
+
+
+def test_dispatch_matches_xgboost(classifier, tmp_path):
+    path = tmp_path / "classifier.pkl"
+    joblib.dump(classifier, path)
+    served = DispatchModel(TreeEnsemble(export_booster(classifier)), path, max_rows=16)
+
+    small = synthetic_planets(16, seed=2)
+    assert np.array_equal(served.predict_proba(small), classifier.predict_proba(small))
+    # Small batches never load the pickle
+    assert served._native is None
+
+    large = synthetic_planets(500, seed=3)
+    assert np.array_equal(served.predict_proba(large), classifier.predict_proba(large))
+    assert np.array_equal(served.predict(large), classifier.predict(large))
+    assert served._native is not None